@@ -12,16 +12,36 @@ load_dotenv()
 
 USER_ID = os.environ.get("USER_ID") # equal to the user id in the calendar
 TOOL_NAME = "GoogleCalendar.ListEvents"
+BACKEND_URL = os.environ.get("BACKEND_URL", "https://enabling-chamois-unique.ngrok-free.app")
 
 def call_backend(description):
     # url encode the description
     description = urllib.parse.quote(description)
     link = extract_meet_link(description)
 
-    requests.get(f"https://enabling-chamois-unique.ngrok-free.app/call/?description={description}")
+    requests.get(f"{BACKEND_URL}/call/?description={description}")
     print(f"Called backend with link: {link}")
 
 
+def prepare_meetings(events):
+    # Prepare every event's call in one backend request: the invites are parsed
+    # (one Gemini call at most for the whole sweep), the numbers validated and
+    # the calls built, so joining any of them later dials immediately
+    meetings = [
+        {"id": event.get("id"), "raw_invite": event.get("description")}
+        for event in events if event.get("description")
+    ]
+    if not meetings:
+        return
+
+    try:
+        response = requests.post(f"{BACKEND_URL}/meetings/prepare", json={"meetings": meetings}, timeout=90)
+        response.raise_for_status()
+        print(f"Prepared {response.json().get('prepared')}/{len(meetings)} meetings")
+    except (requests.RequestException, ValueError) as e:
+        print(f"Failed to prepare meetings: {e}")
+
+
 def get_now():
     helsinki = pytz.timezone("Europe/Helsinki")
     return datetime.datetime.now(helsinki).replace(microsecond=0, second=0)
@@ -115,8 +135,14 @@ def main():
         user_id=USER_ID,
     )
 
-    # Validate events happening now
-    check_events(response.output.value['events'], now)
+    events = response.output.value['events']
+
+    # Validate events happening now; joining comes first so a meeting that
+    # has already started never waits on the sweep's batched parse
+    check_events(events, now)
+
+    # Then prepare the upcoming ones so their joins dial immediately
+    prepare_meetings(events)
 
 
 if __name__ == "__main__":
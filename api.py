@@ -1,18 +1,26 @@
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Set
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient
-import requests
 import time
 import json
 import asyncio
 from dotenv import load_dotenv
 
-from elevenlabs import call_elevenlabs
-from parse_meeting_info import parse_meeting_info
+from elevenlabs import build_call_payload, call_elevenlabs, place_call, check_connection as check_elevenlabs_connection
+from parse_meeting_info import parse_meeting_info_async, parse_meeting_info_batch_async, get_gemini_model, gemini_stats, check_connection as check_gemini_connection
+from websocket_hub import ALL_CALLS, SubscriptionRegistry
+from event_bus import create_event_bus
+import v7
+import http_client
+from question_cache import QuestionAnswerCache, normalize_question
+from invite_cache import InviteParseCache, invite_key
+from meeting_prep import MeetingPreparer, validate_dial_in
+import call_history
+from write_behind import WriteBehindBuffer
+from health_monitor import HealthMonitor
 
 # Load environment variables from .env file
 load_dotenv()
@@ -21,54 +29,283 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Store all active websocket connections
-websocket_connections: List[WebSocket] = []
+# Fast start: accept traffic first, then create indexes, probe integrations
+# and load heavy SDKs in the background (set to false to do it all up front)
+FAST_START = os.getenv("FAST_START", "true").lower() == "true"
 
+# Active websocket connections, indexed by the call_id they subscribed to
+websocket_connections = SubscriptionRegistry()
 
-async def process_meeting_blurb(meeting_blurb: str, call_id: str):
+# Delivers events to this worker's subscribers and, with EVENT_BUS=mongo,
+# to the other workers' (each worker only holds its own /ws connections)
+event_bus = create_event_bus(websocket_connections)
+
+# Answers to repeated questions and in-flight V7 jobs, keyed by call_id + normalized text
+answer_cache = QuestionAnswerCache()
+
+# Parsed invites keyed by a hash of the normalized text (memory + MongoDB)
+invite_cache = InviteParseCache()
+MAX_INVITES_PER_REQUEST = 100
+
+# Meetings parsed, validated and with their call built ahead of join_call
+meeting_preparer = MeetingPreparer(invite_cache)
+
+# Optional micro-batching of task/insight inserts (WRITE_BEHIND_ENABLED)
+write_buffer = WriteBehindBuffer()
+
+
+async def insert_document(collection, document: Dict):
+    """
+    Insert a task or insight document, through the write-behind buffer when
+    it is enabled.
+
+    Documents carrying an idempotency key always take the direct
+    `insert_once` path, so a retry still gets the original id back.
+
+    Returns:
+        (document id, created) as from call_history.insert_once
+    """
+    if write_buffer.enabled and not document.get("idempotency_key"):
+        return await write_buffer.insert(collection, document), True
+    return await call_history.insert_once(collection, document)
+
+
+async def process_meeting_blurb(meeting_blurb: str, call_id: str, meeting_id: Optional[str] = None):
     """
     Fire and forget function to parse meeting info and make ElevenLabs call.
-    
+
+    If the meeting was prepared ahead of time (prepare_call, /meetings/prepare)
+    the stored call is dialed straight away.
+
     Args:
         meeting_blurb: Raw meeting information text
         call_id: Call ID for the call
+        meeting_id: Id the meeting was prepared under, if any
     """
     try:
         logger.info(f"Processing meeting blurb for call_id: {call_id}")
-        
-        # Parse meeting info
-        logger.info("Parsing meeting info with Gemini...")
-        parse_result = await asyncio.to_thread(parse_meeting_info, meeting_blurb)
-        
-        if not parse_result.get("success"):
-            logger.error(f"Failed to parse meeting info for call_id {call_id}: {parse_result.get('error')}")
-            return
-        
-        phone_number = parse_result.get("phone_number")
-        meeting_credentials = parse_result.get("meeting_credentials")
-        
-        if not phone_number:
-            logger.error(f"No phone number extracted from meeting blurb for call_id {call_id}")
-            return
-        
-        logger.info(f"Successfully parsed meeting info for call_id {call_id}")
-        logger.info(f"Phone Number: {phone_number}")
-        logger.info(f"Meeting Credentials: {meeting_credentials}")
-        
+        started = time.perf_counter()
+
+        payload = await meeting_preparer.payload_for_join(meeting_blurb, call_id, meeting_id)
+        prepared = payload is not None
+        if prepared:
+            logger.info(f"Using prepared meeting for call_id {call_id}")
+        else:
+            # Parse meeting info
+            logger.info("Parsing meeting info...")
+            parse_result = await invite_cache.parse_once(
+                meeting_blurb,
+                lambda: parse_meeting_info_async(meeting_blurb),
+                spawn=start_background_task
+            )
+
+            error = validate_dial_in(parse_result)
+            if error:
+                logger.error(f"Cannot dial meeting for call_id {call_id}: {error}")
+                return
+
+            phone_number = parse_result.get("phone_number")
+            meeting_credentials = parse_result.get("meeting_credentials")
+            logger.info(f"Successfully parsed meeting info for call_id {call_id} (source: {parse_result.get('source')}, cached: {parse_result.get('cached', 'no')})")
+            logger.info(f"Phone Number: {phone_number}")
+            logger.info(f"Meeting Credentials: {meeting_credentials}")
+            payload = build_call_payload(phone_number, meeting_credentials, call_id)
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        meeting_preparer.record_join(prepared, latency_ms)
+
         # Make the ElevenLabs call (fire and forget)
-        logger.info(f"Initiating ElevenLabs call for call_id {call_id}...")
-        result = await asyncio.to_thread(call_elevenlabs, phone_number, meeting_credentials, call_id)
-        
+        logger.info(f"Initiating ElevenLabs call for call_id {call_id} ({latency_ms:.1f} ms after join, prepared: {prepared})...")
+        result = await place_call(payload)
+
         if result.get("success"):
             logger.info(f"Call initiated successfully for call_id {call_id}")
             logger.info(f"ElevenLabs Call ID: {result.get('call_id')}")
             logger.info(f"Conversation ID: {result.get('conversation_id')}")
         else:
             logger.error(f"Call failed for call_id {call_id}: {result.get('error')}")
-            
+
     except Exception as e:
         logger.error(f"Exception processing meeting blurb for call_id {call_id}: {str(e)}", exc_info=True)
 
+
+async def prepare_meeting_call(connection, raw_invite: str, meeting_id: Optional[str], call_id: str):
+    """
+    Answer a websocket `prepare_call` command: prepare the meeting and
+    report the outcome as a `call_prepared` event.
+    """
+    try:
+        record = await meeting_preparer.prepare(raw_invite, meeting_id, call_id)
+    except Exception as e:
+        logger.error(f"Exception preparing meeting for call_id {call_id}: {str(e)}", exc_info=True)
+        record = {"success": False, "meeting_key": None, "error": str(e)}
+    connection.enqueue({"type": "call_prepared", **prepared_summary(record)})
+
+
+def prepared_summary(record: Dict) -> Dict:
+    """The client-facing part of a prepared-meeting record."""
+    if not record["success"]:
+        return {"success": False, "meeting_key": record["meeting_key"], "error": record["error"]}
+    return {
+        "success": True,
+        "meeting_key": record["meeting_key"],
+        "phone_number": record["phone_number"],
+        "source": record["source"],
+        "expires_at": record["expires_at"].isoformat()
+    }
+
+
+async def fetch_v7_answer(call_id: str, question: str) -> Optional[str]:
+    """
+    Create a V7 entity for a question and wait for its answer.
+
+    Args:
+        call_id: Call ID the question belongs to
+        question: The question text
+
+    Returns:
+        The answer text, or None if V7 produced none
+    """
+    create_data = await v7.create_question_entity(call_id, question)
+    logger.info(f"V7 entity created with id: {create_data.get('id')}")
+
+    # Extract necessary IDs from the response
+    entity_id = create_data.get('id')
+    project_id_from_response = create_data.get('project_id')
+    if not entity_id or not project_id_from_response:
+        logger.warning(f"V7 entity response for call_id {call_id} is missing id/project_id")
+        return None
+
+    return await v7.wait_for_answer(project_id_from_response, entity_id)
+
+
+def broadcast_answer(question_id, call_id: str, question: str, answer: str):
+    """Push an answer_ready event for a question to the call's websocket subscribers."""
+    answer_message = {
+        "type": "answer_ready",
+        "answerId": f"ans_{question_id}",
+        "commandId": f"cmd_{question_id}",
+        "ts": int(time.time() * 1000),  # milliseconds timestamp
+        "text": answer,
+        "question_text": question,  # Keep for reference
+        "question_id": str(question_id),
+        "taskId": f"task_{question_id}"  # Link answer to task
+    }
+    event_bus.publish(call_id, answer_message)
+
+
+async def process_question_with_v7(question_id, call_id: str, question: str):
+    """
+    Background job that gets a V7 answer for a stored question.
+
+    Duplicate questions that are already being answered join the in-flight
+    V7 job instead of creating a new entity. The answer is stored on the
+    question document and pushed to the call's websocket subscribers as
+    `answer_ready`. V7 failures are logged and non-fatal.
+
+    Args:
+        question_id: MongoDB id of the stored question
+        call_id: Call ID the question belongs to
+        question: The question text
+    """
+    try:
+        v7_answer = await answer_cache.fetch_once(
+            call_id,
+            question,
+            lambda: fetch_v7_answer(call_id, question),
+            spawn=start_background_task
+        )
+        if not v7_answer:
+            return
+
+        # Update MongoDB document with answer
+        await db.questions.update_one(
+            {"_id": question_id},
+            {"$set": {"answer": v7_answer}}
+        )
+        logger.info(f"Updated question {question_id} with V7 answer")
+
+        broadcast_answer(question_id, call_id, question, v7_answer)
+
+    except asyncio.CancelledError:
+        logger.info(f"V7 processing cancelled for question {question_id}")
+        raise
+    except Exception as e:
+        logger.error(f"V7 processing failed (non-fatal): {str(e)}")
+
+
+async def find_cached_answer(call_id: str, question: str) -> Optional[str]:
+    """
+    Look up an answer for a repeated question, first in memory and then in
+    previously answered questions of the same call within the cache TTL.
+    """
+    answer = answer_cache.get(call_id, question)
+    if answer is not None:
+        return answer
+
+    not_before = (datetime.now() - timedelta(seconds=answer_cache.ttl)).isoformat()
+    previous = await db.questions.find_one(
+        {
+            "call_id": call_id,
+            "question_normalized": normalize_question(question),
+            "answer": {"$ne": None},
+            "created_at": {"$gte": not_before}
+        },
+        sort=[("created_at", -1)]
+    )
+    if previous:
+        answer_cache.record_db_hit(call_id, question, previous["answer"])
+        return previous["answer"]
+    return None
+
+
+async def send_history(connection, call_id: str, limit: int, cursor: Optional[str] = None):
+    """
+    Answer a websocket `request_history` command with one page of history.
+
+    Args:
+        connection: The requesting client's ClientConnection
+        call_id: Call ID to read history for
+        limit: Page size
+        cursor: Cursor from the previous page, if any
+    """
+    if call_id == ALL_CALLS:
+        connection.enqueue({
+            "type": "error",
+            "code": "INVALID_COMMAND",
+            "message": "request_history needs a call_id",
+            "recoverable": True
+        })
+        return
+
+    try:
+        page = await call_history.fetch_history(db, call_id, limit=int(limit), cursor=cursor)
+        connection.enqueue({
+            "type": "history",
+            "callId": call_id,
+            "items": page["items"],
+            "nextCursor": page["next_cursor"]
+        })
+    except ValueError as e:
+        connection.enqueue({"type": "error", "code": "INVALID_COMMAND", "message": str(e), "recoverable": True})
+    except Exception as e:
+        logger.error(f"Failed to load history for call_id {call_id}: {str(e)}")
+        connection.enqueue({"type": "error", "code": "BACKEND_BUSY", "message": "Failed to load history", "recoverable": True})
+
+
+# Keep references to fire-and-forget tasks so they are not garbage collected
+# mid-flight and can be cancelled on shutdown
+background_tasks: Set[asyncio.Task] = set()
+
+
+def start_background_task(coro) -> asyncio.Task:
+    """Run a coroutine in the background, tracked until it finishes."""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+
 app = FastAPI(
     title="Meeting Enjoyer API",
     description="API that provides tools for V7, Eleven Labs, etc",
@@ -79,47 +316,109 @@ app = FastAPI(
 mongodb_client = None
 db = None
 
+# Dependency status, refreshed in the background and served from cache by /health
+health_monitor = HealthMonitor()
+
+
+async def probe_v7() -> str:
+    if v7.missing_env_vars():
+        return "not_configured"
+    return await v7.check_connection(timeout=health_monitor.timeout)
+
+
+async def probe_mongodb() -> str:
+    if mongodb_client is None:
+        return "not_configured"
+    await mongodb_client.admin.command("ping")
+    return "connected"
+
+
+async def probe_elevenlabs() -> str:
+    return await check_elevenlabs_connection(timeout=health_monitor.timeout)
+
+
+async def probe_gemini() -> str:
+    return await check_gemini_connection(timeout=health_monitor.timeout)
+
+
+health_monitor.register("mongodb", probe_mongodb)
+health_monitor.register("v7", probe_v7)
+health_monitor.register("elevenlabs", probe_elevenlabs)
+health_monitor.register("gemini", probe_gemini)
+
+
+async def ensure_indexes():
+    try:
+        await call_history.ensure_indexes(db)
+    except Exception as e:
+        logger.warning(f"Failed to create MongoDB indexes: {str(e)}")
+    await invite_cache.start(db)
+    await meeting_preparer.start(db)
+
+
+async def warm_up():
+    """Load the Gemini SDK and model off the event loop so the first invite parse doesn't pay for it."""
+    try:
+        await asyncio.to_thread(get_gemini_model)
+    except Exception as e:
+        logger.warning(f"Failed to preload the Gemini SDK: {str(e)}")
+
+
 @app.on_event("startup")
 async def startup_db_client():
-    """Initialize MongoDB connection on startup"""
+    """Initialize MongoDB connection and the shared HTTP client on startup"""
     global mongodb_client, db
+    # Imported here rather than at module level; motor pulls in all of pymongo
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    await http_client.start_http_client()
+
     mongodb_uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
     mongodb_client = AsyncIOMotorClient(mongodb_uri)
     db = mongodb_client.vikings
     logger.info("Connected to MongoDB database: vikings")
 
-    # Check V7 API configuration
-    v7_workspace_id = os.getenv("V7_WORKSPACE_ID")
-    v7_project_id = os.getenv("V7_PROJECT_ID")
-    v7_api_key = os.getenv("V7_API_KEY")
+    await event_bus.start(db)
 
-    if v7_workspace_id and v7_project_id and v7_api_key:
+    if v7.missing_env_vars():
+        logger.info("V7 integration not configured (optional feature)")
+    else:
         logger.info("V7 integration is configured")
-        try:
-            # Test V7 API connection
-            test_url = f"https://go.v7labs.com/api/workspaces/{v7_workspace_id}/projects/{v7_project_id}"
-            headers = {"X-API-KEY": v7_api_key}
-            response = requests.get(test_url, headers=headers, timeout=5)
 
-            if response.status_code == 200:
-                logger.info("✓ V7 API connection successful")
-            else:
-                logger.warning(f"V7 API returned status {response.status_code}")
-        except requests.exceptions.Timeout:
-            logger.warning("V7 API connection timeout")
-        except Exception as e:
-            logger.warning(f"V7 API connection failed: {str(e)}")
+    if FAST_START:
+        # The first round of health checks (including the V7 probe) runs
+        # in the background once the app is serving
+        start_background_task(ensure_indexes())
+        start_background_task(warm_up())
     else:
-        logger.info("V7 integration not configured (optional feature)")
+        await ensure_indexes()
+        await health_monitor.check_all()
+
+    health_monitor.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    """Close MongoDB connection on shutdown"""
+    """Close MongoDB connection and the shared HTTP client on shutdown"""
     global mongodb_client
+    # Stop in-flight background jobs before the database goes away
+    for task in list(background_tasks):
+        task.cancel()
+    if background_tasks:
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+    await v7.stop_poll_scheduler()
+    await health_monitor.stop()
+    await event_bus.stop()
+
+    # Write out anything still sitting in the write-behind buffer
+    await write_buffer.close()
+
     if mongodb_client:
         mongodb_client.close()
         logger.info("Closed MongoDB connection")
 
+    await http_client.close_http_client()
+
 
 class CallRequest(BaseModel):
     phone_number: str
@@ -141,16 +440,50 @@ class CallResponse(BaseModel):
 class TaskRequest(BaseModel):
     call_id: str
     task: str
+    idempotency_key: Optional[str] = None
 
 
 class QuestionRequest(BaseModel):
     call_id: str
     question: str
+    idempotency_key: Optional[str] = None
 
 
 class InsightRequest(BaseModel):
     call_id: str
     insight: str
+    idempotency_key: Optional[str] = None
+
+
+class TranscriptRequest(BaseModel):
+    call_id: str
+    id: str
+    text: str
+    partial: bool = False
+    speaker: Optional[str] = None
+    ts: Optional[int] = None
+    wake: bool = False
+    wake_phrase: Optional[str] = None
+
+
+class PrepareMeeting(BaseModel):
+    raw_invite: str
+    id: Optional[str] = None
+    call_id: Optional[str] = None
+
+
+class PrepareMeetingsRequest(BaseModel):
+    meetings: List[PrepareMeeting]
+
+
+class InviteParseRequest(BaseModel):
+    invites: List[str]
+
+
+class InviteCacheInvalidateRequest(BaseModel):
+    raw_invite: Optional[str] = None
+    key: Optional[str] = None
+    all: bool = False
 
 
 class DataResponse(BaseModel):
@@ -163,10 +496,11 @@ class DataResponse(BaseModel):
 
 @app.get("/")
 async def root():
-    """Health check endpoint"""
+    """Health check endpoint (served from cached dependency status)"""
     return {
         "status": "healthy",
         "service": "Health check",
+        "dependencies": {name: check["status"] for name, check in health_monitor.snapshot().items()},
         "timestamp": datetime.now().isoformat()
     }
 
@@ -179,6 +513,7 @@ async def websocket_endpoint(websocket: WebSocket):
     try:
         # Wait for call_id as the first message
         data = await websocket.receive_text()
+        message = None
         try:
             message = json.loads(data)
             call_id = message.get("call_id")
@@ -191,11 +526,23 @@ async def websocket_endpoint(websocket: WebSocket):
             await websocket.close()
             return
 
-        # Add this websocket connection to the list of all connections
-        websocket_connections.append(websocket)
+        # Subscribing to every call is reserved for admin clients
+        if call_id == ALL_CALLS:
+            admin_token = os.getenv("WS_ADMIN_TOKEN")
+            provided_token = message.get("admin_token") if isinstance(message, dict) else None
+            if not admin_token or provided_token != admin_token:
+                logger.warning("Rejected all-calls websocket subscription: invalid admin token")
+                await websocket.send_text(json.dumps({"error": "admin_token is required to subscribe to all calls"}))
+                await websocket.close()
+                return
+
+        # Subscribe this websocket connection to events for its call_id.
+        # From here on all sends go through the connection's queue so they
+        # never interleave with broadcasts.
+        connection = websocket_connections.subscribe(call_id, websocket)
         logger.info(f"WebSocket connected for call_id: {call_id}. Total connections: {len(websocket_connections)}")
 
-        await websocket.send_text(json.dumps({"status": "connected", "call_id": call_id}))
+        connection.enqueue({"status": "connected", "call_id": call_id})
 
         # Keep connection alive and listen for messages
         while True:
@@ -204,11 +551,11 @@ async def websocket_endpoint(websocket: WebSocket):
                 try:
                     message = json.loads(data)
                     if message.get("type") == "ping":
-                        await websocket.send_text(json.dumps({
+                        connection.enqueue({
                             "type": "pong",
                             "ts": message.get("ts"),
                             "serverTs": int(time.time() * 1000)
-                        }))
+                        })
                     elif message.get("type") == "join_call":
                         # Handle join_call command - fire and forget
                         meeting_info = message.get("meeting", {})
@@ -217,13 +564,33 @@ async def websocket_endpoint(websocket: WebSocket):
                         if raw_invite:
                             logger.info(f"Received join_call command with rawInvite for call_id: {call_id}")
                             # Start background task to process meeting blurb and make call
-                            asyncio.create_task(process_meeting_blurb(raw_invite, call_id))
+                            start_background_task(process_meeting_blurb(raw_invite, call_id, meeting_info.get("id")))
                         else:
                             logger.warning(f"Received join_call command without rawInvite for call_id: {call_id}")
+                    elif message.get("type") == "prepare_call":
+                        # Parse and validate the invite and build the call now, so join_call dials at once
+                        meeting_info = message.get("meeting", {})
+                        raw_invite = meeting_info.get("rawInvite")
+
+                        if raw_invite:
+                            logger.info(f"Received prepare_call command for call_id: {call_id}")
+                            start_background_task(prepare_meeting_call(connection, raw_invite, meeting_info.get("id"), call_id))
+                        else:
+                            connection.enqueue({"type": "call_prepared", "success": False, "meeting_key": None, "error": "rawInvite is required"})
+                    elif message.get("type") == "request_history":
+                        # Only admin (all-calls) clients may name a call; everyone
+                        # else gets the history of the call they subscribed to
+                        history_call_id = (message.get("call_id") or ALL_CALLS) if call_id == ALL_CALLS else call_id
+                        start_background_task(send_history(
+                            connection,
+                            history_call_id,
+                            message.get("limit") or call_history.HISTORY_DEFAULT_LIMIT,
+                            message.get("cursor")
+                        ))
                     else:
-                        await websocket.send_text(json.dumps({"echo": data}))
+                        connection.enqueue({"echo": data})
                 except json.JSONDecodeError:
-                    await websocket.send_text(json.dumps({"echo": data}))
+                    connection.enqueue({"echo": data})
             except WebSocketDisconnect:
                 break
 
@@ -233,11 +600,20 @@ async def websocket_endpoint(websocket: WebSocket):
         logger.error(f"WebSocket error: {str(e)}")
     finally:
         # Clean up the connection
-        if websocket in websocket_connections:
-            websocket_connections.remove(websocket)
+        if call_id and websocket_connections.unsubscribe(call_id, websocket):
             logger.info(f"Removed websocket connection for call_id: {call_id}. Remaining connections: {len(websocket_connections)}")
 
 
+@app.get("/ws/stats")
+async def websocket_stats():
+    """Outbound websocket queue depth and drop counters"""
+    return {
+        **websocket_connections.stats(),
+        "event_bus": event_bus.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @app.get("/health")
 async def health_check():
     """Detailed health check with environment validation"""
@@ -263,40 +639,139 @@ async def health_check():
         env_status["V7_API_KEY"]
     ])
 
-    # Test V7 API connection if configured
-    v7_status = "not_configured"
-    if v7_configured:
-        try:
-            workspace_id = os.getenv('V7_WORKSPACE_ID')
-            project_id = os.getenv('V7_PROJECT_ID')
-            api_key = os.getenv('V7_API_KEY')
-
-            # Test API connection with a simple GET request
-            test_url = f"https://go.v7labs.com/api/workspaces/{workspace_id}/projects/{project_id}"
-            headers = {"X-API-KEY": api_key}
-            response = requests.get(test_url, headers=headers, timeout=5)
-
-            if response.status_code == 200:
-                v7_status = "connected"
-            else:
-                v7_status = f"error_{response.status_code}"
-        except requests.exceptions.Timeout:
-            v7_status = "timeout"
-        except Exception as e:
-            v7_status = f"error: {str(e)[:50]}"
+    # Dependency reachability comes from the background prober, never a live request
+    dependencies = health_monitor.snapshot()
 
     return {
         "status": "healthy" if elevenlabs_configured else "partial",
         "environment": env_status,
         "ready": elevenlabs_configured,
+        "dependencies": dependencies,
         "v7_integration": {
             "configured": v7_configured,
-            "status": v7_status
+            "status": dependencies["v7"]["status"],
+            "polling": v7.get_poll_scheduler().stats(),
+            "answer_cache": answer_cache.stats()
         },
+        "write_behind": write_buffer.stats(),
+        "invite_cache": invite_cache.stats(),
+        "gemini": gemini_stats(),
+        "meeting_prep": meeting_preparer.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
 
+@app.post("/invites/parse")
+async def parse_invites(request: InviteParseRequest):
+    """
+    Parse a batch of meeting invites (e.g. a calendar sweep).
+
+    Duplicates are parsed once, cached and rule-parsed invites are answered
+    locally and the rest share as few Gemini requests as possible. Each
+    invite gets its own result; one failing doesn't affect the others.
+    """
+    if not request.invites:
+        raise HTTPException(status_code=400, detail="invites must not be empty")
+    if len(request.invites) > MAX_INVITES_PER_REQUEST:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_INVITES_PER_REQUEST} invites per request")
+
+    requests_before = gemini_stats()["requests"]
+    results = await invite_cache.parse_many(request.invites, parse_meeting_info_batch_async)
+    summary = {"cached": 0, "rules": 0, "gemini": 0, "failed": 0}
+    for result in results:
+        if not result.get("success"):
+            summary["failed"] += 1
+        elif result.get("cached"):
+            summary["cached"] += 1
+        else:
+            summary[result.get("source", "gemini")] += 1
+
+    return {
+        "success": True,
+        "results": [{k: v for k, v in result.items() if k != "raw_response"} for result in results],
+        "summary": summary,
+        # Includes requests made concurrently by other joins
+        "gemini_requests": gemini_stats()["requests"] - requests_before,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.post("/meetings/prepare")
+async def prepare_meetings(request: PrepareMeetingsRequest):
+    """
+    Prepare meetings ahead of time (e.g. from the calendar sweep): parse
+    the invites in one batch, validate the dial-in numbers and build the
+    calls, so a later join_call for any of them dials immediately.
+    """
+    if not request.meetings:
+        raise HTTPException(status_code=400, detail="meetings must not be empty")
+    if len(request.meetings) > MAX_INVITES_PER_REQUEST:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_INVITES_PER_REQUEST} meetings per request")
+
+    records = await meeting_preparer.prepare_many([meeting.model_dump() for meeting in request.meetings])
+    return {
+        "success": True,
+        "results": [prepared_summary(record) for record in records],
+        "prepared": sum(record["success"] for record in records),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.post("/invite-cache/invalidate")
+async def invalidate_invite_cache(request: InviteCacheInvalidateRequest):
+    """
+    Drop a cached invite parse, and any meeting prepared from it, so the
+    next join parses it again.
+
+    Give the invite text (`raw_invite`) or its cache `key`, or `all: true`
+    to clear the whole cache.
+    """
+    if request.raw_invite is None and request.key is None and not request.all:
+        raise HTTPException(status_code=400, detail="Provide raw_invite, key or all=true")
+
+    key = invite_key(request.raw_invite) if request.raw_invite is not None else request.key
+    removed = await invite_cache.invalidate(key=key)
+    prepared_removed = await meeting_preparer.invalidate(key)
+    return {
+        "success": True,
+        "removed": removed,
+        "prepared_removed": prepared_removed,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/calls/{call_id}/history")
+async def get_call_history(
+    call_id: str,
+    limit: int = call_history.HISTORY_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    kinds: Optional[str] = None
+):
+    """
+    Page through a call's tasks, questions and insights, newest first.
+
+    Args:
+        call_id: Call ID to read history for
+        limit: Page size (max 200)
+        cursor: `next_cursor` from the previous page
+        kinds: Comma-separated subset of tasks,questions,insights
+
+    Returns:
+        Dictionary with `items` and `next_cursor` (null on the last page)
+    """
+    try:
+        kind_list = [kind.strip() for kind in kinds.split(",") if kind.strip()] if kinds else None
+        return await call_history.fetch_history(db, call_id, limit=limit, cursor=cursor, kinds=kind_list)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to load history for call_id {call_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to load history: {str(e)}"
+        )
+
+
 @app.post("/call", response_model=CallResponse)
 async def make_call(request: CallRequest):
     """
@@ -326,7 +801,7 @@ async def make_call(request: CallRequest):
             )
         
         # Make the call
-        result = call_elevenlabs(
+        result = await call_elevenlabs(
             phone_number=request.phone_number,
             system_prompt=request.system_prompt,
             call_id=request.call_id
@@ -385,44 +860,35 @@ async def create_task(request: TaskRequest):
             "created_at": datetime.now().isoformat()
         }
 
-        # Insert into MongoDB
-        result = await db.tasks.insert_one(task_document)
-        task_id = result.inserted_id
+        if request.idempotency_key:
+            task_document["idempotency_key"] = request.idempotency_key
+
+        # Insert into MongoDB (a retried request returns the original task)
+        task_id, created = await insert_document(db.tasks, task_document)
+        if not created:
+            logger.info(f"Task with idempotency key {request.idempotency_key} already exists: {task_id}")
+            return DataResponse(
+                success=True,
+                id=str(task_id),
+                message="Task already exists",
+                timestamp=datetime.now().isoformat()
+            )
 
         logger.info(f"Task created with id: {task_id}")
 
-        # Broadcast task to all connected websockets
-        if websocket_connections:
-            task_message = {
-                "type": "task_proposed",
-                "taskId": f"task_{task_id}",
-                "ts": int(time.time() * 1000),  # milliseconds timestamp
-                "summary": request.task,
-                "payload": {
-                    "task_id": str(task_id),
-                    "call_id": request.call_id,
-                    "task": request.task
-                }
+        # Broadcast task to websockets subscribed to this call
+        task_message = {
+            "type": "task_proposed",
+            "taskId": f"task_{task_id}",
+            "ts": int(time.time() * 1000),  # milliseconds timestamp
+            "summary": request.task,
+            "payload": {
+                "task_id": str(task_id),
+                "call_id": request.call_id,
+                "task": request.task
             }
-            message_json = json.dumps(task_message)
-            logger.info(f"Broadcasting task_proposed message to {len(websocket_connections)} websocket(s)")
-
-            # Send to all connected clients (use copy to avoid modification during iteration)
-            disconnected_sockets = []
-            for websocket in websocket_connections[:]:
-                try:
-                    await websocket.send_text(message_json)
-                except Exception as e:
-                    logger.error(f"Failed to send task to websocket: {str(e)}", exc_info=True)
-                    disconnected_sockets.append(websocket)
-
-            # Clean up any disconnected sockets
-            for ws in disconnected_sockets:
-                if ws in websocket_connections:
-                    websocket_connections.remove(ws)
-                    logger.info(f"Removed disconnected websocket. Remaining connections: {len(websocket_connections)}")
-        else:
-            logger.warning(f"No websocket connections available to send task")
+        }
+        event_bus.publish(request.call_id, task_message)
 
         return DataResponse(
             success=True,
@@ -444,201 +910,84 @@ async def create_question(request: QuestionRequest):
     """
     Store a question for a given call_id in MongoDB and send to V7 for processing.
 
+    Returns as soon as the question is stored; the V7 answer is generated in
+    the background and delivered over the websocket as `answer_ready`.
+    Repeats of an already answered question on the same call are answered
+    immediately from the cache.
+
     Args:
         request: QuestionRequest containing call_id and question
 
     Returns:
-        DataResponse with the created question information and V7 answer
+        DataResponse with the created question information (and the answer
+        when it was cached)
     """
     try:
         logger.info(f"Creating question for call_id: {request.call_id}")
 
-        # Create question document (initially without answer)
+        # Repeated questions are answered without a V7 round trip
+        cached_answer = await find_cached_answer(request.call_id, request.question)
+
+        # Create question document (without answer unless it was cached)
         question_document = {
             "call_id": request.call_id,
             "question": request.question,
+            "question_normalized": normalize_question(request.question),
             "created_at": datetime.now().isoformat(),
-            "answer": None
+            "answer": cached_answer
         }
 
-        # Insert into MongoDB
-        result = await db.questions.insert_one(question_document)
-        question_id = result.inserted_id
+        if request.idempotency_key:
+            question_document["idempotency_key"] = request.idempotency_key
+
+        # Insert into MongoDB (a retried request returns the original question)
+        question_id, created = await call_history.insert_once(db.questions, question_document)
+        if not created:
+            logger.info(f"Question with idempotency key {request.idempotency_key} already exists: {question_id}")
+            existing = await db.questions.find_one({"_id": question_id}, {"answer": 1})
+            return DataResponse(
+                success=True,
+                id=str(question_id),
+                message="Question already exists",
+                timestamp=datetime.now().isoformat(),
+                answer=(existing or {}).get("answer")
+            )
 
         logger.info(f"Question created with id: {question_id}")
 
-        # Broadcast question to all connected websockets
-        if websocket_connections:
-            task_id = f"task_{question_id}"
-            task_message = {
-                "type": "task_proposed",
-                "taskId": task_id,
-                "ts": int(time.time() * 1000),  # milliseconds timestamp
-                "summary": request.question,
-                "payload": {
-                    "question_id": str(question_id),
-                    "call_id": request.call_id,
-                    "question": request.question
-                }
+        # Broadcast question to websockets subscribed to this call
+        task_id = f"task_{question_id}"
+        task_message = {
+            "type": "task_proposed",
+            "taskId": task_id,
+            "ts": int(time.time() * 1000),  # milliseconds timestamp
+            "summary": request.question,
+            "payload": {
+                "question_id": str(question_id),
+                "call_id": request.call_id,
+                "question": request.question
             }
-            message_json = json.dumps(task_message)
-            logger.info(f"Broadcasting task_proposed message to {len(websocket_connections)} websocket(s)")
+        }
+        event_bus.publish(request.call_id, task_message)
 
-            # Send to all connected clients (use copy to avoid modification during iteration)
-            disconnected_sockets = []
-            for websocket in websocket_connections[:]:
-                try:
-                    await websocket.send_text(message_json)
-                except Exception as e:
-                    logger.error(f"Failed to send question to websocket: {str(e)}", exc_info=True)
-                    disconnected_sockets.append(websocket)
-
-            # Clean up any disconnected sockets
-            for ws in disconnected_sockets:
-                if ws in websocket_connections:
-                    websocket_connections.remove(ws)
-                    logger.info(f"Removed disconnected websocket. Remaining connections: {len(websocket_connections)}")
+        if cached_answer:
+            logger.info(f"Answered question {question_id} from cache")
+            broadcast_answer(question_id, request.call_id, request.question, cached_answer)
         else:
-            logger.warning(f"No websocket connections available to send question")
-
-        # Send to V7 for processing
-        v7_answer = None
-        try:
-            # Validate V7 environment variables
-            required_env_vars = [
-                "V7_WORKSPACE_ID",
-                "V7_PROJECT_ID",
-                "V7_API_KEY"
-            ]
-
-            missing_vars = [var for var in required_env_vars if not os.getenv(var)]
+            # Hand the question to V7 in the background; the answer is pushed
+            # to websocket subscribers as an answer_ready event when it is ready
+            missing_vars = v7.missing_env_vars()
             if not missing_vars:
-                workspace_id = os.getenv('V7_WORKSPACE_ID')
-                project_id = os.getenv('V7_PROJECT_ID')
-                api_key = os.getenv('V7_API_KEY')
-
-                # Create the V7 entity
-                create_url = f"https://go.v7labs.com/api/workspaces/{workspace_id}/projects/{project_id}/entities"
-                headers = {"X-API-KEY": api_key}
-                payload = {
-                    "fields": {
-                        "call_id": request.call_id,
-                        "question_text": request.question
-                    }
-                }
-
-                create_response = requests.post(create_url, json=payload, headers=headers)
-                create_response.raise_for_status()
-                create_data = create_response.json()
-
-                logger.info(f"V7 entity created with id: {create_data.get('id')}")
-
-                # Extract necessary IDs from the response
-                entity_id = create_data.get('id')
-                project_id_from_response = create_data.get('project_id')
-
-                if entity_id and project_id_from_response:
-                    # Poll for the entity until answer is ready
-                    get_url = f"https://go.v7labs.com/api/workspaces/{workspace_id}/projects/{project_id_from_response}/entities/{entity_id}"
-                    get_headers = {
-                        "accept": "application/json",
-                        "X-API-KEY": api_key
-                    }
-
-                    # Polling configuration
-                    max_poll_time = int(os.getenv("V7_MAX_POLL_TIME", 300))  # 5 minutes
-                    poll_interval = int(os.getenv("V7_POLL_INTERVAL", 2))  # 2 seconds
-                    start_time = time.time()
-
-                    logger.info(f"Starting to poll for entity {entity_id} (max {max_poll_time}s, interval {poll_interval}s)")
-
-                    while True:
-                        # Check timeout
-                        elapsed_time = time.time() - start_time
-                        if elapsed_time > max_poll_time:
-                            logger.warning(f"Polling timeout after {max_poll_time} seconds")
-                            break
-
-                        get_response = requests.get(get_url, headers=get_headers)
-                        get_response.raise_for_status()
-                        get_data = get_response.json()
-
-                        # Check if answer is ready
-                        fields = get_data.get('fields', {})
-                        answer_field = fields.get('answer', {})
-                        answer_status = answer_field.get('status', 'idle')
-
-                        logger.info(f"Polling: answer status is '{answer_status}' (elapsed: {elapsed_time:.1f}s)")
-
-                        # Check if answer is complete
-                        if answer_status == 'complete':
-                            logger.info("Answer is ready, extracting answer value")
-
-                            tool_value = answer_field.get('tool_value', {})
-                            v7_answer = tool_value.get('value')
-
-                            if v7_answer:
-                                # Update MongoDB document with answer
-                                await db.questions.update_one(
-                                    {"_id": question_id},
-                                    {"$set": {"answer": v7_answer}}
-                                )
-                                logger.info(f"Updated question {question_id} with V7 answer")
-
-                                # Broadcast answer to all connected websockets
-                                if websocket_connections:
-                                    answer_id = f"ans_{question_id}"
-                                    command_id = f"cmd_{question_id}"
-                                    task_id = f"task_{question_id}"  # Link to the task
-                                    answer_message = {
-                                        "type": "answer_ready",
-                                        "answerId": answer_id,
-                                        "commandId": command_id,
-                                        "ts": int(time.time() * 1000),  # milliseconds timestamp
-                                        "text": v7_answer,
-                                        "question_text": request.question,  # Keep for reference
-                                        "question_id": str(question_id),
-                                        "taskId": task_id  # Link answer to task
-                                    }
-                                    answer_json = json.dumps(answer_message)
-                                    logger.info(f"Broadcasting answer_ready message to {len(websocket_connections)} websocket(s)")
-
-                                    disconnected_sockets = []
-                                    for websocket in websocket_connections[:]:
-                                        try:
-                                            await websocket.send_text(answer_json)
-                                        except Exception as e:
-                                            logger.error(f"Failed to send answer to websocket: {str(e)}")
-                                            disconnected_sockets.append(websocket)
-
-                                    # Clean up any disconnected sockets
-                                    for ws in disconnected_sockets:
-                                        if ws in websocket_connections:
-                                            websocket_connections.remove(ws)
-                                            logger.info(f"Removed disconnected websocket. Remaining connections: {len(websocket_connections)}")
-
-                            break
-
-                        if answer_field.get('error_message'):
-                            error_msg = answer_field.get('error_message')
-                            logger.error(f"Answer field has error: {error_msg}")
-                            break
-
-                        # Wait before next poll
-                        time.sleep(poll_interval)
+                start_background_task(process_question_with_v7(question_id, request.call_id, request.question))
             else:
                 logger.warning(f"V7 integration disabled. Missing env vars: {', '.join(missing_vars)}")
 
-        except Exception as e:
-            logger.error(f"V7 processing failed (non-fatal): {str(e)}")
-            # V7 failure is non-fatal, we still return the stored question
-
         return DataResponse(
             success=True,
             id=str(question_id),
             message="Question created successfully",
             timestamp=datetime.now().isoformat(),
-            answer=v7_answer
+            answer=cached_answer
         )
 
     except Exception as e:
@@ -670,42 +1019,33 @@ async def create_insight(request: InsightRequest):
             "created_at": datetime.now().isoformat()
         }
 
-        # Insert into MongoDB
-        result = await db.insights.insert_one(insight_document)
-        insight_id = result.inserted_id
+        if request.idempotency_key:
+            insight_document["idempotency_key"] = request.idempotency_key
+
+        # Insert into MongoDB (a retried request returns the original insight)
+        insight_id, created = await insert_document(db.insights, insight_document)
+        if not created:
+            logger.info(f"Insight with idempotency key {request.idempotency_key} already exists: {insight_id}")
+            return DataResponse(
+                success=True,
+                id=str(insight_id),
+                message="Insight already exists",
+                timestamp=datetime.now().isoformat()
+            )
 
         logger.info(f"Insight created with id: {insight_id}")
 
-        # Broadcast insight to all connected websockets (as transcript message)
-        if websocket_connections:
-            insight_message = {
-                "type": "transcript",
-                "id": f"insight_{insight_id}",
-                "ts": int(time.time() * 1000),  # milliseconds timestamp
-                "text": request.insight,
-                "partial": False,
-                "speaker": "Insight",  # Label as insight so it's distinguishable
-                "wake": False
-            }
-            message_json = json.dumps(insight_message)
-            logger.info(f"Broadcasting insight transcript to {len(websocket_connections)} websocket(s)")
-
-            # Send to all connected clients (use copy to avoid modification during iteration)
-            disconnected_sockets = []
-            for websocket in websocket_connections[:]:
-                try:
-                    await websocket.send_text(message_json)
-                except Exception as e:
-                    logger.error(f"Failed to send insight to websocket: {str(e)}", exc_info=True)
-                    disconnected_sockets.append(websocket)
-
-            # Clean up any disconnected sockets
-            for ws in disconnected_sockets:
-                if ws in websocket_connections:
-                    websocket_connections.remove(ws)
-                    logger.info(f"Removed disconnected websocket. Remaining connections: {len(websocket_connections)}")
-        else:
-            logger.warning(f"No websocket connections available to send insight")
+        # Broadcast insight to websockets subscribed to this call (as transcript message)
+        insight_message = {
+            "type": "transcript",
+            "id": f"insight_{insight_id}",
+            "ts": int(time.time() * 1000),  # milliseconds timestamp
+            "text": request.insight,
+            "partial": False,
+            "speaker": "Insight",  # Label as insight so it's distinguishable
+            "wake": False
+        }
+        event_bus.publish(request.call_id, insight_message)
 
         return DataResponse(
             success=True,
@@ -722,6 +1062,49 @@ async def create_insight(request: InsightRequest):
         )
 
 
+@app.post("/transcripts", response_model=DataResponse)
+async def publish_transcript(request: TranscriptRequest):
+    """
+    Broadcast a live transcript segment from the media-stream service to
+    the call's websocket subscribers. Partials are throttled by the
+    publisher; a committed segment reuses its partials' id so clients
+    replace the caption in place. A segment in which the media service just
+    detected a wake phrase is preceded by a `wake_detected` event. Nothing
+    is stored here (see transcript_sink).
+
+    Args:
+        request: TranscriptRequest with call_id, segment id, text and partial flag
+
+    Returns:
+        DataResponse with the segment id
+    """
+    transcript_message = {
+        "type": "transcript",
+        "id": request.id,
+        "ts": request.ts or int(time.time() * 1000),
+        "text": request.text,
+        "partial": request.partial,
+        "speaker": request.speaker,
+        "wake": request.wake or bool(request.wake_phrase)
+    }
+    if request.wake_phrase:
+        # Sent ahead of the transcript line so the client can react right away
+        event_bus.publish(request.call_id, {
+            "type": "wake_detected",
+            "ts": transcript_message["ts"],
+            "phrase": request.wake_phrase,
+            "by": request.speaker or "Meeting"
+        })
+    delivered = event_bus.publish(request.call_id, transcript_message)
+
+    return DataResponse(
+        success=True,
+        id=request.id,
+        message=f"Transcript delivered to {delivered} websocket(s) on this worker",
+        timestamp=datetime.now().isoformat()
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8080))
@@ -21,6 +21,15 @@ export interface MeetingInfo {
   rawInvite?: string  // Raw Google Calendar invite text
 }
 
+export interface HistoryItem {
+  kind: 'task' | 'question' | 'insight'
+  id: string
+  call_id: string
+  text: string
+  created_at: string
+  answer?: string | null
+}
+
 // Server → Client Events
 export type ServerEvent =
   | { type: 'session_info'; sessionId: string; callSid?: string; agentName: string; meetingLabel?: string }
@@ -36,6 +45,7 @@ export type ServerEvent =
   | { type: 'task_status'; taskId: string; status: TaskStatus; detail?: string }
   | { type: 'call_status'; status: CallStatus; callSid?: string; reason?: string }
   | { type: 'pong'; ts: number; serverTs: number }
+  | { type: 'history'; callId: string; items: HistoryItem[]; nextCursor: string | null }
   | { type: 'error'; code: string; message: string; recoverable: boolean }
 
 // Client → Server Commands
@@ -58,7 +68,7 @@ export type ClientCommand =
   | { type: 'approve_task'; taskId: string }
   | { type: 'reject_task'; taskId: string; reason?: string }
   | { type: 'set_settings'; settings: ClientSettings }
-  | { type: 'request_history'; limit?: number }
+  | { type: 'request_history'; limit?: number; cursor?: string }
   | { type: 'ping'; ts: number }
 
 // Error Codes
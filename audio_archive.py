@@ -0,0 +1,345 @@
+"""
+Optional per-call archive of the raw μ-law audio Twilio streams to us.
+
+Each call gets two files in AUDIO_ARCHIVE_DIR:
+- <call_sid>.ulaw: 8 kHz μ-law samples back to back, written through a
+  memory map into a preallocated file (grown in AUDIO_ARCHIVE_PREALLOC_SECONDS
+  steps and truncated to the audio length when the call ends)
+- <call_sid>.idx: (stream timestamp ms, byte offset) pairs, one every
+  AUDIO_ARCHIVE_INDEX_MS and at every gap in Twilio's media timestamps, so
+  time ranges map to byte ranges even when frames were lost
+
+The media loop only appends base64 payloads to an in-memory list; decoding
+and file I/O happen on one writer thread shared by all calls. Reads map the
+file and copy only the requested range, so long recordings are never loaded
+whole.
+"""
+import binascii
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from media_stream import MULAW_BYTES_PER_MS, TWILIO_FRAME_MS
+
+logger = logging.getLogger(__name__)
+
+AUDIO_ARCHIVE_ENABLED = os.getenv("AUDIO_ARCHIVE_ENABLED", "false").lower() == "true"
+AUDIO_ARCHIVE_DIR = Path(os.getenv("AUDIO_ARCHIVE_DIR", "recordings"))
+AUDIO_ARCHIVE_PREALLOC_SECONDS = int(os.getenv("AUDIO_ARCHIVE_PREALLOC_SECONDS", 600))
+AUDIO_ARCHIVE_INDEX_MS = int(os.getenv("AUDIO_ARCHIVE_INDEX_MS", 1000))
+AUDIO_ARCHIVE_FLUSH_INTERVAL = float(os.getenv("AUDIO_ARCHIVE_FLUSH_INTERVAL", 0.5))  # seconds
+
+SAMPLE_RATE = 8000
+INDEX_ENTRY = struct.Struct("<QQ")  # timestamp ms, byte offset
+WAV_CHUNK_BYTES = 64 * 1024
+
+# Call SIDs become file names; refuse anything that could leave the directory
+_CALL_SID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def archive_paths(call_sid: str, directory: Path = AUDIO_ARCHIVE_DIR) -> Tuple[Path, Path]:
+    """
+    Audio and index file paths for a call.
+
+    Raises:
+        ValueError: If the call SID isn't a plain identifier
+    """
+    if not _CALL_SID_PATTERN.match(call_sid):
+        raise ValueError(f"Invalid call SID {call_sid!r}")
+    return directory / f"{call_sid}.ulaw", directory / f"{call_sid}.idx"
+
+
+class AudioRecorder:
+    """
+    Archive for one call. `append` is safe to call from the event loop; all
+    decoding and I/O happen on the archiver thread (or in `close`).
+    """
+
+    def __init__(self, call_sid: str, archiver: "AudioArchiver"):
+        self.call_sid = call_sid
+        self.audio_path, self.index_path = archive_paths(call_sid, archiver.directory)
+        self._archiver = archiver
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._pending: List[Tuple[str, Optional[int]]] = []
+
+        self._file: Optional[BinaryIO] = None
+        self._index_file: Optional[BinaryIO] = None
+        self._map: Optional[mmap.mmap] = None
+        self._capacity = 0
+        self._next_ts: Optional[int] = None
+        self._last_index_ts: Optional[int] = None
+        self.closed = False
+
+        # Bytes of audio on disk; readers of an in-progress call stop here
+        self.length = 0
+        self.frames = 0
+        self.index_entries = 0
+        self.gaps = 0
+
+    def append(self, payload: str, timestamp_ms: Optional[int] = None) -> None:
+        """
+        Queue one Twilio media payload for the archive.
+
+        Args:
+            payload: Base64 μ-law audio from a `media` event
+            timestamp_ms: The event's media.timestamp (ms since the stream
+                started); None to assume it follows the previous frame
+        """
+        with self._lock:
+            self._pending.append((payload, timestamp_ms))
+
+    def _open(self) -> None:
+        self.audio_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.audio_path, "w+b")
+        self._index_file = open(self.index_path, "wb")
+        self._grow(AUDIO_ARCHIVE_PREALLOC_SECONDS * SAMPLE_RATE)
+
+    def _grow(self, capacity: int) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.truncate(capacity)
+        self._map = mmap.mmap(self._file.fileno(), capacity)
+        self._capacity = capacity
+
+    def _index(self, timestamp_ms: int) -> None:
+        self._index_file.write(INDEX_ENTRY.pack(timestamp_ms, self.length))
+        self._last_index_ts = timestamp_ms
+        self.index_entries += 1
+
+    def flush(self) -> None:
+        """Decode queued frames into the memory-mapped file (blocking)."""
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending or self.closed:
+                return
+
+            try:
+                if self._file is None:
+                    self._open()
+
+                for payload, timestamp_ms in pending:
+                    audio = binascii.a2b_base64(payload)
+                    if timestamp_ms is None:
+                        timestamp_ms = self._next_ts if self._next_ts is not None else 0
+
+                    if self._next_ts is None or abs(timestamp_ms - self._next_ts) >= TWILIO_FRAME_MS:
+                        if self._next_ts is not None:
+                            self.gaps += 1
+                        self._index(timestamp_ms)
+                    elif timestamp_ms - self._last_index_ts >= AUDIO_ARCHIVE_INDEX_MS:
+                        self._index(timestamp_ms)
+
+                    end = self.length + len(audio)
+                    if end > self._capacity:
+                        self._grow(self._capacity + AUDIO_ARCHIVE_PREALLOC_SECONDS * SAMPLE_RATE)
+                    self._map[self.length:end] = audio
+                    self.length = end
+                    self._next_ts = timestamp_ms + len(audio) // MULAW_BYTES_PER_MS
+                    self.frames += 1
+
+                self._index_file.flush()
+            except Exception as e:
+                logger.error(f"Failed to archive {len(pending)} audio frame(s) for {self.call_sid}: {str(e)}")
+
+    def close(self) -> None:
+        """Write what's left and trim the file to the audio length (blocking; run it off the event loop)."""
+        self._archiver.unregister(self)
+        self.flush()
+        with self._io_lock:
+            self.closed = True
+            if self._file is None:
+                return
+            try:
+                self._map.flush()
+                self._map.close()
+                self._file.truncate(self.length)
+            finally:
+                self._file.close()
+                self._index_file.close()
+        logger.info(f"Archived {self.length / SAMPLE_RATE:.1f}s of audio for {self.call_sid} ({self.frames} frames, {self.gaps} gaps)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "call_sid": self.call_sid,
+            "seconds": round(self.length / SAMPLE_RATE, 1),
+            "frames": self.frames,
+            "gaps": self.gaps,
+            "pending": len(self._pending)
+        }
+
+
+class AudioArchiver:
+    """
+    One daemon thread that writes every open AudioRecorder's queued frames.
+    """
+
+    def __init__(self, directory: Path = AUDIO_ARCHIVE_DIR, flush_interval: float = AUDIO_ARCHIVE_FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._recorders: Dict[str, AudioRecorder] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def open(self, call_sid: str) -> AudioRecorder:
+        """
+        Start archiving a call's audio.
+
+        Raises:
+            ValueError: If the call SID isn't a plain identifier
+        """
+        recorder = AudioRecorder(call_sid, self)
+        with self._lock:
+            self._recorders[call_sid] = recorder
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audio-archiver", daemon=True)
+                self._thread.start()
+        return recorder
+
+    def unregister(self, recorder: AudioRecorder) -> None:
+        with self._lock:
+            if self._recorders.get(recorder.call_sid) is recorder:
+                del self._recorders[recorder.call_sid]
+
+    def recording(self, call_sid: str) -> Optional[AudioRecorder]:
+        """The recorder of a call that is still in progress, if any."""
+        with self._lock:
+            return self._recorders.get(call_sid)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            with self._lock:
+                recorders = list(self._recorders.values())
+            for recorder in recorders:
+                recorder.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            recorders = list(self._recorders.values())
+        return {
+            "directory": str(self.directory),
+            "recording": [recorder.stats() for recorder in recorders]
+        }
+
+
+class AudioArchiveReader:
+    """
+    Time-ranged reads from a call's archive through a read-only memory map.
+
+    Use as a context manager. For a call that is still being recorded, pass
+    the recorder's `length` so the unwritten preallocated tail is ignored.
+    """
+
+    def __init__(self, call_sid: str, directory: Path = AUDIO_ARCHIVE_DIR, length: Optional[int] = None):
+        self.call_sid = call_sid
+        audio_path, index_path = archive_paths(call_sid, directory)
+        if not audio_path.exists():
+            raise FileNotFoundError(f"No audio archived for {call_sid}")
+
+        self._file = open(audio_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self.length = size if length is None else min(length, size)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+        entries = []
+        if index_path.exists():
+            raw = index_path.read_bytes()
+            entries = [INDEX_ENTRY.unpack_from(raw, i) for i in range(0, len(raw) - len(raw) % INDEX_ENTRY.size, INDEX_ENTRY.size)]
+        entries = [(ts, offset) for ts, offset in entries if offset <= self.length] or [(0, 0)]
+        self._timestamps = [ts for ts, _ in entries]
+        self._offsets = [offset for _, offset in entries]
+
+    def __enter__(self) -> "AudioArchiveReader":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    @property
+    def duration_ms(self) -> int:
+        """Stream time at the end of the archived audio (gaps included)."""
+        return self._timestamps[-1] + (self.length - self._offsets[-1]) // MULAW_BYTES_PER_MS
+
+    def offset_at(self, timestamp_ms: int) -> int:
+        """
+        Byte offset of a stream timestamp. Times inside a gap map to the
+        first audio after it.
+        """
+        i = bisect_right(self._timestamps, timestamp_ms) - 1
+        if i < 0:
+            return 0
+        offset = self._offsets[i] + (timestamp_ms - self._timestamps[i]) * MULAW_BYTES_PER_MS
+        segment_end = self._offsets[i + 1] if i + 1 < len(self._offsets) else self.length
+        return min(offset, segment_end)
+
+    def byte_range(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Tuple[int, int]:
+        start = self.offset_at(start_ms) if start_ms is not None else 0
+        end = self.offset_at(end_ms) if end_ms is not None else self.length
+        return start, max(start, end)
+
+    def read(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> bytes:
+        """Raw μ-law bytes between two stream timestamps."""
+        start, end = self.byte_range(start_ms, end_ms)
+        return self._map[start:end] if self._map is not None else b""
+
+    def iter_wav(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Iterator[bytes]:
+        """
+        A μ-law WAV file of a time range, yielded in chunks straight from
+        the memory map.
+        """
+        start, end = self.byte_range(start_ms, end_ms)
+        yield wav_header(end - start)
+        for chunk_start in range(start, end, WAV_CHUNK_BYTES):
+            yield self._map[chunk_start:min(end, chunk_start + WAV_CHUNK_BYTES)]
+
+    def export_wav(self, path: Path, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> int:
+        """
+        Write a time range to a WAV file.
+
+        Returns:
+            Number of audio bytes (= samples) written
+        """
+        start, end = self.byte_range(start_ms, end_ms)
+        with open(path, "wb") as f:
+            for chunk in self.iter_wav(start_ms, end_ms):
+                f.write(chunk)
+        return end - start
+
+
+def wav_header(data_bytes: int) -> bytes:
+    """RIFF header for 8 kHz mono μ-law (WAVE_FORMAT_MULAW) with `data_bytes` samples."""
+    fmt = struct.pack("<HHIIHHH", 7, 1, SAMPLE_RATE, SAMPLE_RATE, 1, 8, 0)
+    fact = struct.pack("<I", data_bytes)
+    riff_size = 4 + (8 + len(fmt)) + (8 + len(fact)) + (8 + data_bytes)
+    return b"".join([
+        b"RIFF", struct.pack("<I", riff_size), b"WAVE",
+        b"fmt ", struct.pack("<I", len(fmt)), fmt,
+        b"fact", struct.pack("<I", len(fact)), fact,
+        b"data", struct.pack("<I", data_bytes)
+    ])
+
+
+_archiver: Optional[AudioArchiver] = None
+
+
+def get_archiver() -> AudioArchiver:
+    """Return the process-wide audio archiver."""
+    global _archiver
+    if _archiver is None:
+        _archiver = AudioArchiver()
+    return _archiver
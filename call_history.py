@@ -0,0 +1,181 @@
+"""
+MongoDB indexes and call-history reads for tasks, questions and insights.
+
+History is read newest-first with keyset (cursor) pagination over the
+`(call_id, created_at, _id)` indexes, so every page is an index range scan
+no matter how deep the client pages.
+"""
+import base64
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# collection name -> (history kind, text field)
+HISTORY_COLLECTIONS = {
+    "tasks": ("task", "task"),
+    "questions": ("question", "question"),
+    "insights": ("insight", "insight"),
+}
+
+# pymongo.DESCENDING; pymongo/bson are imported where used, so importing
+# this module at startup doesn't load them (see api.startup_db_client)
+HISTORY_SORT = [("created_at", -1), ("_id", -1)]
+HISTORY_DEFAULT_LIMIT = 50
+HISTORY_MAX_LIMIT = 200
+
+
+async def ensure_indexes(db) -> None:
+    """
+    Create the indexes the API relies on. Safe to call on every startup;
+    existing indexes are left untouched.
+    """
+    from pymongo import ASCENDING, DESCENDING
+
+    for collection in HISTORY_COLLECTIONS:
+        await db[collection].create_index(
+            [("call_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="call_id_created_at"
+        )
+        # Only documents written with an idempotency key take part in the unique index
+        await db[collection].create_index(
+            "idempotency_key",
+            unique=True,
+            partialFilterExpression={"idempotency_key": {"$type": "string"}},
+            name="idempotency_key_unique"
+        )
+
+    # Lookup of previously answered duplicate questions
+    await db.questions.create_index(
+        [("call_id", ASCENDING), ("question_normalized", ASCENDING), ("created_at", DESCENDING)],
+        name="call_id_question_normalized"
+    )
+    logger.info("MongoDB indexes are in place")
+
+
+async def insert_once(collection, document: Dict[str, Any]) -> Tuple[Any, bool]:
+    """
+    Insert a document, honouring its optional `idempotency_key`.
+
+    Returns:
+        (document id, created): created is False when a document with the
+        same idempotency key already existed and its id is returned instead
+    """
+    from pymongo.errors import DuplicateKeyError
+
+    try:
+        result = await collection.insert_one(document)
+        return result.inserted_id, True
+    except DuplicateKeyError:
+        idempotency_key = document.get("idempotency_key")
+        if not idempotency_key:
+            raise
+        existing = await collection.find_one({"idempotency_key": idempotency_key}, {"_id": 1})
+        if existing is None:
+            raise
+        return existing["_id"], False
+
+
+def encode_cursor(created_at: str, document_id: Any) -> str:
+    raw = json.dumps([created_at, str(document_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Any]:
+    """
+    Decode a cursor returned by a previous history page.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, document_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid history cursor")
+    from bson import ObjectId
+    if ObjectId.is_valid(document_id):
+        document_id = ObjectId(document_id)
+    return created_at, document_id
+
+
+def history_query(call_id: str, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the filter for one history page: the call's documents strictly
+    older than the cursor position in (created_at, _id) order.
+    """
+    query: Dict[str, Any] = {"call_id": call_id}
+    if cursor:
+        created_at, document_id = decode_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": document_id}}
+        ]
+    return query
+
+
+def _history_item(collection: str, document: Dict[str, Any]) -> Dict[str, Any]:
+    kind, text_field = HISTORY_COLLECTIONS[collection]
+    item = {
+        "kind": kind,
+        "id": str(document["_id"]),
+        "call_id": document.get("call_id"),
+        "text": document.get(text_field),
+        "created_at": document.get("created_at")
+    }
+    if kind == "question":
+        item["answer"] = document.get("answer")
+    return item
+
+
+async def fetch_history(
+    db,
+    call_id: str,
+    limit: int = HISTORY_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    kinds: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Read one page of a call's tasks, questions and insights, newest first.
+
+    Args:
+        db: Motor database
+        call_id: Call ID to read history for
+        limit: Page size (capped at HISTORY_MAX_LIMIT)
+        cursor: `next_cursor` from the previous page, if any
+        kinds: Collections to include (tasks, questions, insights); all by default
+
+    Returns:
+        Dictionary with `items` and `next_cursor` (None on the last page)
+
+    Raises:
+        ValueError: If the cursor or kinds are invalid
+    """
+    limit = max(1, min(limit, HISTORY_MAX_LIMIT))
+    collections = kinds or list(HISTORY_COLLECTIONS)
+    unknown = [name for name in collections if name not in HISTORY_COLLECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown history kinds: {', '.join(unknown)}")
+
+    query = history_query(call_id, cursor)
+
+    # Each collection contributes at most `limit + 1` documents; merging them
+    # and keeping the newest `limit` gives the page without skipping anything
+    candidates = []
+    for collection in collections:
+        documents = await db[collection].find(query).sort(HISTORY_SORT).limit(limit + 1).to_list(length=limit + 1)
+        candidates.extend((doc.get("created_at") or "", doc["_id"], collection, doc) for doc in documents)
+
+    candidates.sort(key=lambda c: (c[0], str(c[1])), reverse=True)
+    page = candidates[:limit]
+
+    next_cursor = None
+    if len(candidates) > limit and page:
+        last_created_at, last_id, _, _ = page[-1]
+        next_cursor = encode_cursor(last_created_at, last_id)
+
+    return {
+        "call_id": call_id,
+        "items": [_history_item(collection, doc) for _, _, collection, doc in page],
+        "next_cursor": next_cursor
+    }
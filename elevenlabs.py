@@ -2,12 +2,108 @@
 ElevenLabs ConvAI API integration for making outbound phone calls.
 """
 import os
-import requests
-from typing import Dict, Any
+from typing import Dict, Any, List
 from datetime import datetime
 
+import httpx
 
-def call_elevenlabs(
+import http_client
+
+OUTBOUND_CALL_URL = "https://api.elevenlabs.io/v1/convai/twilio/outbound-call"
+REQUIRED_ENV_VARS = ["ELEVENLABS_API_KEY", "ELEVENLABS_AGENT_ID", "ELEVENLABS_PHONE_NUMBER_ID"]
+
+MEETING_JOIN_PROMPT = """You are joining a meeting. You are speaking with the google-meet phone robot until you have joined the meeting.
+use your play keypad touch tool to join the call. Keep entering the code until you are let into the meeting. Wait for 20 seconds after calling the tool before responding. First enter the meeting ID as instructed (if present). then when prompted to do so enter the passcode.
+{meeting_details}
+Use individual tool calls for each character. Each dtmf tool call should only have one character. use many tool calls to input."""
+
+
+async def check_connection(timeout: float = 5) -> str:
+    """
+    Probe ElevenLabs by reading the configured agent, which validates both
+    the API key and the agent id without placing a call.
+
+    Args:
+        timeout: Seconds to wait for ElevenLabs to respond
+
+    Returns:
+        "connected", "not_configured", "error_<status>", "timeout" or "error: <reason>"
+    """
+    api_key = os.getenv("ELEVENLABS_API_KEY")
+    agent_id = os.getenv("ELEVENLABS_AGENT_ID")
+    if not api_key or not agent_id:
+        return "not_configured"
+
+    url = f"https://api.elevenlabs.io/v1/convai/agents/{agent_id}"
+    try:
+        response = await http_client.request("GET", url, headers={"xi-api-key": api_key}, timeout=timeout)
+        if response.status_code == 200:
+            return "connected"
+        return f"error_{response.status_code}"
+    except httpx.TimeoutException:
+        return "timeout"
+    except Exception as e:
+        return f"error: {str(e)[:50]}"
+
+
+def missing_env_vars() -> List[str]:
+    """Return the ElevenLabs environment variables needed for outbound calls that are not set."""
+    return [var for var in REQUIRED_ENV_VARS if not os.getenv(var)]
+
+
+def build_call_payload(
+    phone_number: str,
+    system_prompt: str = "",
+    call_id: str = None
+) -> Dict[str, Any]:
+    """
+    Build the request body of an ElevenLabs outbound call.
+
+    Args:
+        phone_number: The phone number to call (international format, e.g., 447874943523)
+        system_prompt: Meeting details to include in the system prompt (meeting_id, passcode, etc)
+        call_id: Optional call ID to include in the system prompt
+
+    Returns:
+        The JSON payload for the outbound-call endpoint
+    """
+    payload = {
+        "agent_id": os.getenv("ELEVENLABS_AGENT_ID"),
+        "agent_phone_number_id": os.getenv("ELEVENLABS_PHONE_NUMBER_ID"),
+        "to_number": phone_number
+    }
+
+    dynamic_variables = {
+        "call_id": call_id if call_id else ""
+    }
+    # Build the system prompt with meeting join instructions
+    meeting_join_prompt = MEETING_JOIN_PROMPT
+
+    # Replace meeting_details placeholder with actual meeting details
+    if system_prompt:
+        meeting_join_prompt = meeting_join_prompt.replace("{meeting_details}", system_prompt)
+    else:
+        meeting_join_prompt = meeting_join_prompt.replace("{meeting_details}", "")
+
+    # Add call_id to system prompt if provided
+    if call_id:
+        meeting_join_prompt = f"{meeting_join_prompt}\n\nCALL ID: {call_id}"
+
+    # Always override the system prompt with meeting join instructions
+    payload["conversation_initiation_client_data"] = {
+        "conversation_config_override": {
+            "agent": {
+                "prompt": {
+                    "prompt": meeting_join_prompt
+                }
+            },
+            "dynamic_variables": dynamic_variables
+        }
+    }
+    return payload
+
+
+async def call_elevenlabs(
     phone_number: str,
     system_prompt: str = "",
     call_id: str = None
@@ -23,48 +119,21 @@ def call_elevenlabs(
     Returns:
         Dictionary containing call result information
     """
-    try:
-        # ElevenLabs ConvAI outbound call endpoint
-        endpoint_url = "https://api.elevenlabs.io/v1/convai/twilio/outbound-call"
-
-        # Prepare payload for ElevenLabs API
-        payload = {
-            "agent_id": os.getenv("ELEVENLABS_AGENT_ID"),
-            "agent_phone_number_id": os.getenv("ELEVENLABS_PHONE_NUMBER_ID"),
-            "to_number": phone_number
-        }
+    return await place_call(build_call_payload(phone_number, system_prompt, call_id))
 
-        dynamic_variables = {
-            "call_id": call_id if call_id else ""
-        }
-        # Build the system prompt with meeting join instructions
-        meeting_join_prompt = """You are joining a meeting. You are speaking with the google-meet phone robot until you have joined the meeting.
-use your play keypad touch tool to join the call. Keep entering the code until you are let into the meeting. Wait for 20 seconds after calling the tool before responding. First enter the meeting ID as instructed (if present). then when prompted to do so enter the passcode.
-{meeting_details}
-Use individual tool calls for each character. Each dtmf tool call should only have one character. use many tool calls to input."""
 
-        # Replace meeting_details placeholder with actual meeting details
-        if system_prompt:
-            meeting_join_prompt = meeting_join_prompt.replace("{meeting_details}", system_prompt)
-        else:
-            meeting_join_prompt = meeting_join_prompt.replace("{meeting_details}", "")
-
-        # Add call_id to system prompt if provided
-        if call_id:
-            meeting_join_prompt = f"{meeting_join_prompt}\n\nCALL ID: {call_id}"
-
-        # Always override the system prompt with meeting join instructions
-        payload["conversation_initiation_client_data"] = {
-            "conversation_config_override": {
-                "agent": {
-                    "prompt": {
-                        "prompt": meeting_join_prompt
-                    }
-                },
-                "dynamic_variables": dynamic_variables
-            }
-        }
+async def place_call(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Start an outbound call from a payload built by build_call_payload.
+
+    Args:
+        payload: The outbound-call request body
 
+    Returns:
+        Dictionary containing call result information
+    """
+    phone_number = payload.get("to_number")
+    try:
         # Set required headers
         headers = {
             "Xi-Api-Key": os.getenv("ELEVENLABS_API_KEY"),
@@ -73,8 +142,8 @@ Use individual tool calls for each character. Each dtmf tool call should only ha
             "User-Agent": "ElevenLabs-Caller/1.0"
         }
         
-        # Make the API call
-        response = requests.post(endpoint_url, json=payload, headers=headers, timeout=30)
+        # Make the API call over the shared pooled client
+        response = await http_client.request("POST", OUTBOUND_CALL_URL, json=payload, headers=headers, timeout=30)
         
         if response.status_code == 200:
             result = response.json()
@@ -0,0 +1,248 @@
+"""
+Event bus that fans websocket events out across API workers.
+
+Each worker only holds the /ws connections that were opened against it, so
+an event produced on one worker (e.g. a /tasks POST) must also reach the
+workers holding that call's subscribers. Every event is delivered to the
+local SubscriptionRegistry right away and, with a network backend, also
+published for the other workers, which deliver it to their own subscribers
+of that call_id.
+
+Backends (EVENT_BUS):
+- local (default): in-process only; correct for a single worker
+- mongo: events are inserted into a TTL'd `events` collection and every
+  worker follows it with a change stream (needs a replica set, e.g. Atlas)
+"""
+import asyncio
+import logging
+import os
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+from uuid import uuid4
+
+from websocket_hub import SubscriptionRegistry
+
+logger = logging.getLogger(__name__)
+
+EVENT_BUS = os.getenv("EVENT_BUS", "local")
+EVENT_BUS_COLLECTION = os.getenv("EVENT_BUS_COLLECTION", "events")
+EVENT_BUS_TTL = int(os.getenv("EVENT_BUS_TTL", 300))  # seconds events are kept in MongoDB
+EVENT_BUS_QUEUE_SIZE = int(os.getenv("EVENT_BUS_QUEUE_SIZE", 1000))  # events waiting to be published
+EVENT_BUS_MAX_BATCH = 100
+EVENT_BUS_MAX_BACKOFF = 30.0
+
+
+class EventBus:
+    """
+    In-process event bus: publishing delivers to this worker's subscribers.
+
+    Network backends override `_start`, `_stop` and `_publish_batch`;
+    events from other workers are handed to `_receive`.
+    """
+
+    backend = "local"
+
+    def __init__(self, registry: SubscriptionRegistry, max_queue: int = EVENT_BUS_QUEUE_SIZE):
+        self.registry = registry
+        self.worker_id = uuid4().hex
+        self.max_queue = max(1, max_queue)
+
+        self._outbox: Deque[Dict[str, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+        self.published = 0
+        self.publish_dropped = 0
+        self.publish_failures = 0
+        self.received = 0
+        self.delivered_remote = 0
+
+    @property
+    def distributed(self) -> bool:
+        return self.backend != "local"
+
+    def publish(self, call_id: str, message: Dict[str, Any]) -> int:
+        """
+        Deliver an event to the call's subscribers on every worker.
+
+        Never waits on the network: local subscribers are queued directly
+        and the event is handed to a background publisher for the others.
+
+        Args:
+            call_id: Call ID the event belongs to
+            message: JSON-serializable event payload
+
+        Returns:
+            Number of websockets on this worker the message was queued for
+        """
+        if not self.distributed:
+            return self.registry.broadcast(call_id, message)
+
+        # The call's subscribers may all be on other workers; don't warn about it here
+        delivered = self.registry.broadcast(call_id, message) if self.registry.subscribers(call_id) else 0
+
+        if len(self._outbox) >= self.max_queue:
+            if not self.publish_dropped:
+                logger.warning(f"Event bus outbox is full ({self.max_queue}); dropping events for other workers")
+            self.publish_dropped += 1
+            return delivered
+
+        self._outbox.append({
+            "call_id": call_id,
+            "origin": self.worker_id,
+            "message": message,
+            "created_at": datetime.now(timezone.utc)
+        })
+        self._wakeup.set()
+        return delivered
+
+    def _receive(self, event: Dict[str, Any]) -> None:
+        """Deliver an event published by another worker to this worker's subscribers."""
+        if event.get("origin") == self.worker_id:
+            return
+        self.received += 1
+
+        call_id = event.get("call_id")
+        if not call_id or not self.registry.subscribers(call_id):
+            # Most workers hold no subscribers for a given call; that's expected
+            return
+        self.delivered_remote += self.registry.broadcast(call_id, event["message"])
+
+    async def start(self, db=None) -> None:
+        """Connect the backend and start the publisher/listener tasks."""
+        if self.distributed:
+            await self._start(db)
+            self._tasks.append(asyncio.create_task(self._publisher()))
+            logger.info(f"Event bus started ({self.backend}, worker {self.worker_id})")
+
+    async def stop(self) -> None:
+        """Publish what's still queued (best effort) and stop the background tasks."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._flush(), timeout=2)
+        except Exception as e:
+            logger.warning(f"Failed to publish {len(self._outbox)} queued event(s) on shutdown: {str(e)}")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        await self._stop()
+
+    async def _publisher(self) -> None:
+        while True:
+            while not self._outbox:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            try:
+                await self._flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.publish_failures += 1
+                logger.error(f"Failed to publish events ({self.backend}): {str(e)}")
+                await asyncio.sleep(1)
+
+    async def _flush(self) -> None:
+        while self._outbox:
+            batch = [self._outbox.popleft() for _ in range(min(EVENT_BUS_MAX_BATCH, len(self._outbox)))]
+            try:
+                await self._publish_batch(batch)
+            except BaseException:
+                # Put the batch back so it is retried (or reported on shutdown)
+                self._outbox.extendleft(reversed(batch))
+                raise
+            self.published += len(batch)
+
+    async def _start(self, db) -> None:
+        pass
+
+    async def _stop(self) -> None:
+        pass
+
+    async def _publish_batch(self, events: List[Dict[str, Any]]) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "worker_id": self.worker_id,
+            "outbox": len(self._outbox),
+            "published": self.published,
+            "publish_dropped": self.publish_dropped,
+            "publish_failures": self.publish_failures,
+            "received": self.received,
+            "delivered_remote": self.delivered_remote
+        }
+
+
+class MongoEventBus(EventBus):
+    """
+    Shares events through a MongoDB collection followed with a change stream.
+
+    Inserts are batched with `insert_many`; a TTL index removes old events.
+    The change stream filters out this worker's own events on the server and
+    resumes from the last seen event after a dropped connection.
+    """
+
+    backend = "mongo"
+
+    def __init__(
+        self,
+        registry: SubscriptionRegistry,
+        collection_name: str = EVENT_BUS_COLLECTION,
+        ttl: int = EVENT_BUS_TTL,
+        max_queue: int = EVENT_BUS_QUEUE_SIZE
+    ):
+        super().__init__(registry, max_queue=max_queue)
+        self.collection_name = collection_name
+        self.ttl = ttl
+        self.collection = None
+        self._resume_token = None
+
+    async def _start(self, db) -> None:
+        if db is None:
+            raise ValueError("MongoEventBus needs a database")
+        self.collection = db[self.collection_name]
+        try:
+            await self.collection.create_index("created_at", expireAfterSeconds=self.ttl)
+        except Exception as e:
+            logger.warning(f"Failed to create TTL index on {self.collection_name}: {str(e)}")
+        self._tasks.append(asyncio.create_task(self._listen()))
+
+    async def _publish_batch(self, events: List[Dict[str, Any]]) -> None:
+        # insert_many adds _id to the dicts; copies keep retries clean
+        await self.collection.insert_many([dict(event) for event in events], ordered=True)
+
+    async def _listen(self) -> None:
+        pipeline = [{"$match": {"operationType": "insert", "fullDocument.origin": {"$ne": self.worker_id}}}]
+        backoff = 0.0
+        while True:
+            try:
+                async with self.collection.watch(pipeline, resume_after=self._resume_token) as stream:
+                    backoff = 0.0
+                    async for change in stream:
+                        self._resume_token = change["_id"]
+                        self._receive(change["fullDocument"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                backoff = min(EVENT_BUS_MAX_BACKOFF, max(1.0, backoff * 2))
+                logger.error(f"Event bus change stream failed (retrying in {backoff:.0f}s): {str(e)}")
+                await asyncio.sleep(backoff)
+
+
+def create_event_bus(registry: SubscriptionRegistry, kind: Optional[str] = None) -> EventBus:
+    """
+    Build the event bus for the EVENT_BUS backend.
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    kind = (kind or EVENT_BUS).lower()
+    if kind == "local":
+        return EventBus(registry)
+    if kind == "mongo":
+        return MongoEventBus(registry)
+    raise ValueError(f"Unknown event bus backend {kind!r}; expected 'local' or 'mongo'")
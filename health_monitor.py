@@ -0,0 +1,133 @@
+"""
+Background dependency prober for the health endpoints.
+
+Load balancers and the Docker HEALTHCHECK hit /health far more often than
+V7, Mongo, ElevenLabs or Gemini need checking. Each registered check runs
+in its own loop on a fixed schedule and stores its latest result, so the
+health endpoints only read cached state and never wait on the network.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", 30))  # seconds between probes
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", 5))  # seconds per probe
+
+# Probe results that count as healthy; "not_configured" is reported but not a failure
+OK_STATUSES = {"connected", "not_configured"}
+
+Probe = Callable[[], Awaitable[str]]
+
+
+class HealthMonitor:
+    """
+    Runs registered dependency probes periodically and caches their results.
+    """
+
+    def __init__(self, interval: float = HEALTH_CHECK_INTERVAL, timeout: float = HEALTH_CHECK_TIMEOUT):
+        self.interval = interval
+        self.timeout = timeout
+        self._probes: Dict[str, Probe] = {}
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def register(self, name: str, probe: Probe) -> None:
+        """
+        Add a dependency check.
+
+        Args:
+            name: Dependency name used in the health response
+            probe: Coroutine factory returning "connected", "not_configured"
+                or an error status string
+        """
+        self._probes[name] = probe
+        self._results[name] = {
+            "status": "pending",
+            "ok": None,
+            "checked_at": None,
+            "latency_ms": None,
+            "_checked": None
+        }
+
+    async def check(self, name: str) -> str:
+        """Run one probe now and store its result."""
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(self.timeout):
+                status = await self._probes[name]()
+        except TimeoutError:
+            status = "timeout"
+        except Exception as e:
+            status = f"error: {str(e)[:50]}"
+        latency = time.monotonic() - start
+
+        previous = self._results[name]["status"]
+        if status != previous:
+            if status in OK_STATUSES:
+                logger.info(f"Dependency {name} is {status}")
+            else:
+                logger.warning(f"Dependency {name} check failed: {status}")
+
+        self._results[name] = {
+            "status": status,
+            "ok": status in OK_STATUSES,
+            "checked_at": datetime.now().isoformat(),
+            "latency_ms": round(latency * 1000, 1),
+            "_checked": time.monotonic()
+        }
+        return status
+
+    async def check_all(self) -> None:
+        """Run every probe once, concurrently."""
+        await asyncio.gather(*(self.check(name) for name in self._probes))
+
+    async def _run(self, name: str) -> None:
+        # Don't repeat a check that was just run up front (see check_all)
+        if self._results[name]["_checked"] is not None:
+            await asyncio.sleep(self.interval)
+        while True:
+            await self.check(name)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start one probe loop per registered check; the first round runs immediately."""
+        for name in self._probes:
+            task = self._tasks.get(name)
+            if task is None or task.done():
+                self._tasks[name] = asyncio.create_task(self._run(name))
+
+    async def stop(self) -> None:
+        """Cancel the probe loops."""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def status(self, name: str) -> Optional[str]:
+        """Latest cached status of a check, or None if it isn't registered."""
+        result = self._results.get(name)
+        return result["status"] if result else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Cached results of every check.
+
+        Returns:
+            Dictionary of check name -> status, ok, checked_at, age_seconds
+            and latency_ms (age and latency are None until the first probe)
+        """
+        now = time.monotonic()
+        snapshot = {}
+        for name, result in self._results.items():
+            entry = {key: value for key, value in result.items() if not key.startswith("_")}
+            checked = result["_checked"]
+            entry["age_seconds"] = round(now - checked, 1) if checked is not None else None
+            snapshot[name] = entry
+        return snapshot
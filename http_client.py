@@ -0,0 +1,100 @@
+"""
+App-lifetime async HTTP client shared by all outbound integrations
+(V7, ElevenLabs, health probes).
+
+One pooled client keeps connections alive between calls so repeated
+requests to the same host skip DNS, TCP and TLS setup. HTTP/2 is used when
+the `h2` package is installed.
+"""
+import asyncio
+import importlib.util
+import logging
+import os
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 30))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", 20))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 60))
+
+# httpx only needs the h2 package to be installed for HTTP/2
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_client: Optional[httpx.AsyncClient] = None
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(
+            HTTP_READ_TIMEOUT,
+            connect=HTTP_CONNECT_TIMEOUT,
+            pool=HTTP_CONNECT_TIMEOUT
+        )
+    )
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Create the shared client; called on application startup."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+        logger.info(f"HTTP client started (http2={HTTP2_AVAILABLE}, max {HTTP_MAX_CONNECTIONS_PER_HOST} connections per host)")
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections; called on shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _host_limits.clear()
+        logger.info("Closed HTTP client")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared client, creating it on first use (e.g. from scripts
+    that run outside the FastAPI lifecycle).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+def _host_limit(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    semaphore = _host_limits.get(host)
+    if semaphore is None:
+        semaphore = _host_limits[host] = asyncio.Semaphore(HTTP_MAX_CONNECTIONS_PER_HOST)
+    return semaphore
+
+
+async def request(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Send a request through the shared client, limited per host.
+
+    Args:
+        method: HTTP method
+        url: Absolute URL
+        **kwargs: Passed through to httpx (json, headers, params, timeout...)
+
+    Returns:
+        The httpx response (the body is fully read)
+    """
+    async with _host_limit(url):
+        return await get_http_client().request(method, url, **kwargs)
@@ -0,0 +1,396 @@
+"""
+Content-addressed cache of parsed meeting invites.
+
+The same invite is parsed again every time a user clicks join or a join is
+retried, and each parse that reaches Gemini is a paid request. Results are
+keyed by a SHA-256 of the normalized invite text (Unicode NFKC, whitespace
+collapsed) and kept in two tiers:
+
+- an in-process LRU with a TTL (INVITE_CACHE_MEMORY_TTL), checked first
+- the `invite_cache` MongoDB collection, shared by every API instance and
+  expired by a TTL index on `expires_at`
+
+Successful parses with a phone number are kept for INVITE_CACHE_TTL.
+Invites that parsed fine but have no dial-in number (most calendar events)
+are kept for the shorter INVITE_CACHE_NEGATIVE_TTL, so repeat calendar
+sweeps don't send them to Gemini again. Failed parses are not cached.
+Concurrent parses of the same invite share a single call to the parser.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INVITE_CACHE_ENABLED = os.getenv("INVITE_CACHE_ENABLED", "true").lower() == "true"
+INVITE_CACHE_TTL = float(os.getenv("INVITE_CACHE_TTL", 7 * 24 * 3600))  # 1 week
+# Invites without a dial-in number; short, in case the parser missed one
+INVITE_CACHE_NEGATIVE_TTL = float(os.getenv("INVITE_CACHE_NEGATIVE_TTL", 3600))
+# Other instances' memory tiers don't hear about invalidations, so they keep
+# entries for a shorter time than MongoDB does
+INVITE_CACHE_MEMORY_TTL = float(os.getenv("INVITE_CACHE_MEMORY_TTL", 600))
+INVITE_CACHE_MAX_ENTRIES = int(os.getenv("INVITE_CACHE_MAX_ENTRIES", 1000))
+INVITE_CACHE_COLLECTION = os.getenv("INVITE_CACHE_COLLECTION", "invite_cache")
+
+# Bump when the parsers change what they return, so old entries stop matching
+CACHE_VERSION = 1
+
+# Fields of a parse result worth keeping; raw_response is Gemini's debug output
+_CACHED_FIELDS = ("success", "phone_number", "meeting_credentials", "source", "confidence")
+
+
+def normalize_invite(meeting_blurb: str) -> str:
+    """Invite text with Unicode compatibility forms folded and whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFKC", meeting_blurb).split())
+
+
+def invite_key(meeting_blurb: str) -> str:
+    """Cache key of an invite: hex SHA-256 of its normalized text."""
+    data = f"v{CACHE_VERSION}\n{normalize_invite(meeting_blurb)}".encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class InviteParseCache:
+    """
+    Two-tier (memory LRU + MongoDB) cache of parse_meeting_info results,
+    with in-flight coalescing of identical parses.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = INVITE_CACHE_MAX_ENTRIES,
+        ttl: float = INVITE_CACHE_TTL,
+        negative_ttl: float = INVITE_CACHE_NEGATIVE_TTL,
+        memory_ttl: float = INVITE_CACHE_MEMORY_TTL,
+        collection_name: str = INVITE_CACHE_COLLECTION,
+        enabled: bool = INVITE_CACHE_ENABLED
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.negative_ttl = min(negative_ttl, ttl)
+        self.memory_ttl = min(memory_ttl, ttl)
+        self.collection_name = collection_name
+        self.enabled = enabled
+        self.collection = None
+
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.inflight_joins = 0
+        self.parses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.db_errors = 0
+
+    async def start(self, db) -> None:
+        """Attach the MongoDB tier and make sure its TTL index exists."""
+        if not self.enabled:
+            return
+        self.collection = db[self.collection_name]
+        try:
+            await self.collection.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            logger.warning(f"Failed to create TTL index on {self.collection_name}: {str(e)}")
+
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if time.monotonic() > expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def _put_local(self, key: str, result: Dict[str, Any], ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + min(ttl, self.memory_ttl), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, meeting_blurb: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached parse, in memory and then in MongoDB, counting a
+        hit, a db hit or a miss.
+
+        Returns:
+            The cached result (with "cached": "memory" or "mongo"), or None
+        """
+        if not self.enabled:
+            return None
+        key = invite_key(meeting_blurb)
+        result = self._get_local(key)
+        if result is not None:
+            self.hits += 1
+            return {**result, "cached": "memory"}
+
+        if self.collection is not None:
+            try:
+                document = await self.collection.find_one({"_id": key})
+            except Exception as e:
+                self.db_errors += 1
+                logger.warning(f"Invite cache lookup failed: {str(e)}")
+                document = None
+            result = self._from_document(document) if document else None
+            if result is not None:
+                self.db_hits += 1
+                return {**result, "cached": "mongo"}
+
+        self.misses += 1
+        return None
+
+    def _from_document(self, document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The result stored in a MongoDB entry (also cached in memory), or None if expired."""
+        expires_at = document["expires_at"]
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+        # The TTL monitor only runs once a minute, so expiry is checked here too
+        if remaining <= 0:
+            return None
+        self._put_local(document["_id"], document["result"], remaining)
+        return document["result"]
+
+    async def get_many(self, meeting_blurbs: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up several invites with at most one MongoDB query.
+
+        Returns:
+            Cached results by invite_key; invites that aren't cached are absent
+        """
+        if not self.enabled:
+            return {}
+        found: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for key in dict.fromkeys(invite_key(blurb) for blurb in meeting_blurbs):
+            result = self._get_local(key)
+            if result is not None:
+                self.hits += 1
+                found[key] = {**result, "cached": "memory"}
+            else:
+                missing.append(key)
+
+        if missing and self.collection is not None:
+            try:
+                async for document in self.collection.find({"_id": {"$in": missing}}):
+                    result = self._from_document(document)
+                    if result is not None:
+                        self.db_hits += 1
+                        found[document["_id"]] = {**result, "cached": "mongo"}
+            except Exception as e:
+                self.db_errors += 1
+                logger.warning(f"Invite cache lookup failed: {str(e)}")
+
+        self.misses += sum(1 for key in missing if key not in found)
+        return found
+
+    def _entry(self, meeting_blurb: str, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Cache a parse result in memory and return its MongoDB document, or
+        None if the result isn't cacheable (a failed parse).
+        """
+        if not self.enabled or not result.get("success"):
+            return None
+        key = invite_key(meeting_blurb)
+        stored = {field: result[field] for field in _CACHED_FIELDS if field in result}
+        ttl = self.ttl if result.get("phone_number") else self.negative_ttl
+        self._put_local(key, stored, ttl)
+        now = datetime.now(timezone.utc)
+        return {"_id": key, "result": stored, "created_at": now, "expires_at": now + timedelta(seconds=ttl)}
+
+    async def put(self, meeting_blurb: str, result: Dict[str, Any]) -> bool:
+        """
+        Store a parse result in both tiers, unless it failed. Results without
+        a phone number are kept for the shorter negative TTL.
+
+        Returns:
+            True if the result was cached
+        """
+        return await self.put_many([(meeting_blurb, result)]) > 0
+
+    async def put_many(self, items: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Store several (invite, parse result) pairs, with one MongoDB bulk
+        write for all of them.
+
+        Returns:
+            Number of results cached
+        """
+        documents = [document for document in (self._entry(blurb, result) for blurb, result in items) if document]
+        if documents and self.collection is not None:
+            from pymongo import ReplaceOne
+            try:
+                await self.collection.bulk_write(
+                    [ReplaceOne({"_id": document["_id"]}, document, upsert=True) for document in documents],
+                    ordered=False
+                )
+            except Exception as e:
+                self.db_errors += 1
+                logger.warning(f"Invite cache write failed: {str(e)}")
+        return len(documents)
+
+    async def invalidate(self, meeting_blurb: Optional[str] = None, key: Optional[str] = None) -> int:
+        """
+        Drop one cached invite (by text or by key), or every cached invite
+        if neither is given.
+
+        Returns:
+            Number of entries removed (the larger of the two tiers' counts)
+        """
+        if meeting_blurb is not None:
+            key = invite_key(meeting_blurb)
+
+        if key is not None:
+            removed = 1 if self._entries.pop(key, None) is not None else 0
+            query: Dict[str, Any] = {"_id": key}
+        else:
+            removed = len(self._entries)
+            self._entries.clear()
+            query = {}
+
+        if self.collection is not None:
+            try:
+                result = await self.collection.delete_many(query)
+                removed = max(removed, result.deleted_count)
+            except Exception as e:
+                self.db_errors += 1
+                logger.warning(f"Invite cache invalidation failed: {str(e)}")
+
+        self.invalidations += removed
+        logger.info(f"Invalidated {removed} cached invite parse(s)")
+        return removed
+
+    async def parse_once(
+        self,
+        meeting_blurb: str,
+        parse: Callable[[], Awaitable[Dict[str, Any]]],
+        spawn: Callable[[Awaitable[Dict[str, Any]]], "asyncio.Future"] = asyncio.ensure_future
+    ) -> Dict[str, Any]:
+        """
+        Return the cached parse of an invite, or run `parse` and cache its
+        result. A parse of the same invite that is already running is
+        awaited instead of starting another.
+
+        Args:
+            meeting_blurb: Raw meeting information text
+            parse: Coroutine factory producing a parse_meeting_info result
+            spawn: Starts the parse as a task; pass the app's tracked task
+                starter so the shared parse is cancelled on shutdown
+
+        Returns:
+            The parse result
+        """
+        cached = await self.get(meeting_blurb)
+        if cached is not None:
+            return cached
+
+        key = invite_key(meeting_blurb)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.inflight_joins += 1
+            logger.info("Joining in-flight parse of the same invite")
+            return await asyncio.shield(future)
+
+        self.parses += 1
+        future = spawn(parse())
+        self._inflight[key] = future
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        await self.put(meeting_blurb, result)
+        return result
+
+    async def parse_many(
+        self,
+        meeting_blurbs: List[str],
+        parse_batch: Callable[[List[str]], Awaitable[List[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Batch version of parse_once: identical invites are looked up and
+        parsed once, cached ones are answered from the cache, ones already
+        being parsed are awaited, and all the others go to a single
+        `parse_batch` call.
+
+        Args:
+            meeting_blurbs: Raw meeting information texts
+            parse_batch: Coroutine function parsing a list of invites into
+                one result per invite, in order
+
+        Returns:
+            One parse result per input, in order
+        """
+        keys = [invite_key(blurb) for blurb in meeting_blurbs]
+        unique: Dict[str, str] = {}
+        for key, blurb in zip(keys, meeting_blurbs):
+            unique.setdefault(key, blurb)
+        results = await self.get_many(list(unique.values()))
+
+        joined = [key for key in unique if key not in results and key in self._inflight]
+        if joined:
+            self.inflight_joins += len(joined)
+            outcomes = await asyncio.gather(*(asyncio.shield(self._inflight[key]) for key in joined), return_exceptions=True)
+            for key, outcome in zip(joined, outcomes):
+                # Another caller's failed (or cancelled) parse is retried in this batch
+                if isinstance(outcome, BaseException):
+                    logger.warning(f"Joined parse of an invite failed, parsing it again: {outcome!r}")
+                else:
+                    results[key] = outcome
+
+        missing = [key for key in unique if key not in results]
+        if missing:
+            self.parses += len(missing)
+            # One future per invite, so parse_once calls for the same invites can join
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in missing}
+            self._inflight.update(futures)
+            try:
+                parsed = await parse_batch([unique[key] for key in missing])
+            except BaseException as e:
+                for future in futures.values():
+                    if isinstance(e, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        future.set_exception(e)
+                        future.exception()  # Mark retrieved; nobody may have joined
+                raise
+            finally:
+                for key, future in futures.items():
+                    if self._inflight.get(key) is future:
+                        del self._inflight[key]
+            for key, result in zip(missing, parsed):
+                futures[key].set_result(result)
+                results[key] = result
+            await self.put_many([(unique[key], results[key]) for key in missing])
+
+        return [results[key] for key in keys]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.db_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "persistent": self.collection is not None,
+            "entries": len(self._entries),
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.db_hits) / lookups, 3) if lookups else 0.0,
+            "inflight_joins": self.inflight_joins,
+            "parses": self.parses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "db_errors": self.db_errors
+        }
@@ -0,0 +1,153 @@
+"""
+Rule-based extraction of dial-in details from meeting invites.
+
+Google Meet, Zoom, Teams and Webex invites print their dial-in section in
+a handful of fixed layouts, e.g.
+
+    (GB) +44 20 3956 3891 PIN: 485 709 205#                      Google Meet
+    +44 203 481 5237 United Kingdom / Meeting ID: ... Passcode:  Zoom
+    +44 20 3443 8823,,123456789# / Phone conference ID: ...#     Teams
+
+so regular expressions find the phone number and credentials in
+microseconds. The result carries a confidence; parse_meeting_info only
+asks Gemini when the rules are unsure (no UK number, no credentials, or
+conflicting credentials).
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# International numbers as printed in invites: "+44 20 3956 3891", "+44-20-7660-8149", "+442034815237"
+_PHONE_PATTERN = re.compile(r"\+\d[\d \t().-]{6,20}\d")
+
+# Credential labels and the digits after them, found in one scan; the kind
+# is looked up from the label. Phone-only credentials (PIN, conference ID,
+# access code) make the web meeting ID / passcode irrelevant for dial-in.
+# The leading lookahead lets the scan skip positions that can't start a label.
+_CREDENTIAL_PATTERN = re.compile(
+    r"(?=[ACMP])\b(PIN|(?:Phone[ \t]+)?Conference[ \t]+ID|Access[ \t]+code|Participant[ \t]+(?:code|PIN)"
+    r"|Meeting[ \t]+ID|Passcode|Password)[ \t]*:?[ \t]*(\d[\d \t]*\d#?)(?![\w])",
+    re.IGNORECASE
+)
+_CREDENTIAL_KINDS = [
+    ("pin", "pin"),
+    ("phone", "conference_id"),
+    ("conference", "conference_id"),
+    ("access", "access_code"),
+    ("participant", "access_code"),
+    ("meeting", "meeting_id"),
+    ("pass", "passcode"),
+]
+_PHONE_ONLY_KINDS = ("pin", "conference_id", "access_code")
+_MIN_MEETING_ID_DIGITS = 8
+
+# Words on the line of a conference bridge number, as opposed to e.g. the organiser's mobile in a signature
+_DIAL_IN_CONTEXT = re.compile(r"\(GB\)|United Kingdom|,,|\bPIN\b|dial|call in|by phone|toll", re.IGNORECASE)
+
+_PROVIDERS = [
+    ("google_meet", re.compile(r"meet\.google\.com", re.IGNORECASE)),
+    ("zoom", re.compile(r"zoom\.us", re.IGNORECASE)),
+    ("teams", re.compile(r"teams\.microsoft\.com|Microsoft Teams", re.IGNORECASE)),
+    ("webex", re.compile(r"webex\.com", re.IGNORECASE)),
+]
+
+UK_PREFIX = "+44"
+UK_MOBILE_PREFIX = "+447"
+
+
+def _digits(value: str) -> str:
+    return "".join(ch for ch in value if ch.isdigit())
+
+
+def _phone_numbers(text: str) -> List[str]:
+    """
+    Distinct phone numbers in E.164 form (+ and 8-15 digits), most likely
+    dial-in first: numbers on a dial-in line, then other landlines, then
+    mobiles, each in order of appearance.
+    """
+    ranked = {}
+    for match in _PHONE_PATTERN.finditer(text):
+        digits = _digits(match.group())
+        if not 8 <= len(digits) <= 15:
+            continue
+        number = "+" + digits
+        line_start = text.rfind("\n", 0, match.start()) + 1
+        line_end = text.find("\n", match.end())
+        line = text[line_start:line_end if line_end != -1 else len(text)]
+        rank = (not _DIAL_IN_CONTEXT.search(line), number.startswith(UK_MOBILE_PREFIX), len(ranked))
+        ranked[number] = min(rank, ranked.get(number, rank))
+    return sorted(ranked, key=ranked.get)
+
+
+def _credentials(text: str) -> Tuple[List[str], bool]:
+    """
+    Dial-in credentials as printed ("PIN: 485 709 205#"), and whether the
+    invite contains conflicting values for the same credential.
+    """
+    found: Dict[str, Dict[str, str]] = {}
+    for match in _CREDENTIAL_PATTERN.finditer(text):
+        label, value = match.group(1), match.group(2).strip()
+        lowered = label.lower()
+        kind = next(kind for prefix, kind in _CREDENTIAL_KINDS if lowered.startswith(prefix))
+        digits = _digits(value)
+        if kind == "meeting_id" and len(digits) < _MIN_MEETING_ID_DIGITS:
+            continue
+        found.setdefault(kind, {})[digits] = f"{label}: {value}"
+
+    if any(kind in found for kind in _PHONE_ONLY_KINDS):
+        found = {kind: values for kind, values in found.items() if kind in _PHONE_ONLY_KINDS}
+    conflicting = any(len(values) > 1 for values in found.values())
+    credentials = [line for values in found.values() for line in values.values()]
+    return credentials, conflicting
+
+
+def parse_invite_rules(meeting_blurb: str) -> Dict[str, Any]:
+    """
+    Extract the dial-in number and credentials from an invite with rules.
+
+    Args:
+        meeting_blurb: Raw meeting information text
+
+    Returns:
+        Dictionary with:
+        - phone_number: Preferred dial-in number (+44 if any), or ""
+        - meeting_credentials: Credential lines joined with ", ", or ""
+        - provider: google_meet, zoom, teams, webex or None
+        - confidence: 0-1; below INVITE_RULES_MIN_CONFIDENCE the caller
+          should fall back to Gemini
+        - reasons: What lowered the confidence
+    """
+    numbers = _phone_numbers(meeting_blurb)
+    uk_numbers = [number for number in numbers if number.startswith(UK_PREFIX)]
+    credentials, conflicting = _credentials(meeting_blurb)
+    provider: Optional[str] = next((name for name, pattern in _PROVIDERS if pattern.search(meeting_blurb)), None)
+
+    confidence = 0.0
+    reasons = []
+    if uk_numbers:
+        confidence += 0.5
+    elif numbers:
+        confidence += 0.3
+        reasons.append("no UK number")
+    else:
+        reasons.append("no phone number")
+
+    if credentials and not conflicting:
+        confidence += 0.4
+    elif conflicting:
+        confidence += 0.1
+        reasons.append("conflicting credentials")
+    else:
+        reasons.append("no credentials")
+
+    if provider:
+        confidence += 0.1
+    else:
+        reasons.append("unknown provider")
+
+    return {
+        "phone_number": (uk_numbers or numbers or [""])[0],
+        "meeting_credentials": ", ".join(credentials),
+        "provider": provider,
+        "confidence": round(confidence, 2),
+        "reasons": reasons
+    }
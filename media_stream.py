@@ -0,0 +1,303 @@
+"""
+Twilio Media Stream audio handling for the Scribe transcription bridge.
+
+Twilio sends one `media` event per 20 ms of 8 kHz μ-law audio, already
+base64-encoded. Scribe accepts the same encoding, so frames are forwarded
+without decoding them, or batched into larger chunks to cut the number of
+messages sent per call.
+
+Reading from Twilio and sending to Scribe are decoupled by a bounded audio
+queue per call, so a slow Scribe connection never stalls the Twilio reads.
+"""
+import asyncio
+import binascii
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+try:
+    import orjson
+    json_loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    json_loads = json.loads
+    JSON_BACKEND = "json"
+
+logger = logging.getLogger(__name__)
+
+# μ-law at 8 kHz is one byte per sample
+MULAW_BYTES_PER_MS = 8
+TWILIO_FRAME_MS = 20
+
+# Audio per message sent to Scribe; 0 (or anything up to one frame) forwards each frame as-is
+SCRIBE_CHUNK_MS = int(os.getenv("SCRIBE_CHUNK_MS", 100))
+
+# What to do once Scribe is SCRIBE_MAX_LAG_MS of audio behind
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+LAG_POLICIES = (DROP_OLDEST, DROP_NEWEST)
+
+SCRIBE_MAX_LAG_MS = int(os.getenv("SCRIBE_MAX_LAG_MS", 5000))
+SCRIBE_LAG_POLICY = os.getenv("SCRIBE_LAG_POLICY", DROP_OLDEST)
+
+
+_MEDIA_MARKER = '"event":"media"'
+_PAYLOAD_MARKER = '"payload":"'
+_PAYLOAD_OFFSET = len(_PAYLOAD_MARKER)
+
+
+def media_payload(raw: str) -> Optional[str]:
+    """
+    Pull the audio out of a Twilio `media` event without decoding the JSON.
+
+    Media events arrive 50 times a second per call, so they are recognised
+    by scanning the raw text and slicing out the payload; no dicts or
+    intermediate strings are built. Base64 never contains quotes, and any
+    message with a backslash (JSON escapes) is left to the full parser.
+
+    Returns:
+        The base64 payload, or None if the message isn't a media event in
+        Twilio's compact form (use parse_twilio_event for those)
+    """
+    if _MEDIA_MARKER in raw and "\\" not in raw:
+        start = raw.find(_PAYLOAD_MARKER)
+        if start != -1:
+            start += _PAYLOAD_OFFSET
+            end = raw.find('"', start)
+            if end != -1:
+                return raw[start:end]
+    return None
+
+
+_TIMESTAMP_MARKER = '"timestamp":"'
+
+
+def media_timestamp(raw: str) -> Optional[int]:
+    """
+    The media.timestamp (ms since the stream started) of a raw Twilio
+    `media` event, found the same way as media_payload.
+
+    Returns:
+        The timestamp, or None if it can't be found
+    """
+    start = raw.find(_TIMESTAMP_MARKER)
+    if start == -1:
+        return None
+    start += len(_TIMESTAMP_MARKER)
+    end = raw.find('"', start)
+    try:
+        return int(raw[start:end])
+    except ValueError:
+        return None
+
+
+def parse_twilio_event(raw: str) -> Dict[str, Any]:
+    """Decode a Twilio event with the fastest JSON backend available (orjson, else stdlib)."""
+    return json_loads(raw)
+
+
+def audio_duration_ms(audio_base64: str) -> float:
+    """Duration of base64 μ-law audio, without decoding it."""
+    padding = 2 if audio_base64.endswith("==") else 1 if audio_base64.endswith("=") else 0
+    return (len(audio_base64) * 3 // 4 - padding) / MULAW_BYTES_PER_MS
+
+
+class MediaAggregator:
+    """
+    Batches consecutive base64 μ-law frames into chunks of `chunk_ms`.
+
+    Base64 strings of 160-byte frames end in padding, so they can't simply be
+    concatenated; frames are decoded into one buffer and the chunk is encoded
+    once when it's full. With aggregation disabled, payloads pass straight
+    through untouched.
+
+    An optional `suppressor` (see silence_suppression) gates each chunk
+    before it is encoded; chunks that are all silence are not sent at all.
+    """
+
+    def __init__(self, chunk_ms: int = SCRIBE_CHUNK_MS, suppressor=None):
+        self.chunk_ms = chunk_ms
+        self.suppressor = suppressor
+        self.passthrough = chunk_ms <= TWILIO_FRAME_MS and suppressor is None
+        self.chunk_bytes = max(chunk_ms, TWILIO_FRAME_MS) * MULAW_BYTES_PER_MS
+        self._buffer = bytearray()
+
+        self.frames = 0
+        self.chunks = 0
+
+    def add(self, payload: str) -> Optional[str]:
+        """
+        Add one Twilio media payload.
+
+        Args:
+            payload: Base64 μ-law audio from a `media` event
+
+        Returns:
+            Base64 audio to send now, or None while a chunk is still filling
+        """
+        self.frames += 1
+        if self.passthrough:
+            self.chunks += 1
+            return payload
+
+        self._buffer += binascii.a2b_base64(payload)
+        if len(self._buffer) < self.chunk_bytes:
+            return None
+        return self.flush()
+
+    def flush(self) -> Optional[str]:
+        """
+        Encode whatever is buffered (e.g. when the stream stops).
+
+        Returns:
+            Base64 audio, or None if nothing is buffered
+        """
+        if not self._buffer:
+            return None
+        audio = self._buffer
+        if self.suppressor is not None:
+            audio = self.suppressor.process(audio)
+        chunk = binascii.b2a_base64(audio, newline=False).decode("ascii") if audio else None
+        self._buffer = bytearray()
+        if chunk is None:
+            return None
+        self.chunks += 1
+        return chunk
+
+    @property
+    def buffered_ms(self) -> float:
+        return len(self._buffer) / MULAW_BYTES_PER_MS
+
+
+class ScribeAudioSender:
+    """
+    Bounded audio queue between the Twilio reader and Scribe, drained by its
+    own sender task.
+
+    The queue holds at most `max_lag_ms` of audio. Past that, the lag policy
+    drops either the oldest queued audio (keeping captions current) or the
+    incoming chunk, and the loss is counted.
+    """
+
+    def __init__(
+        self,
+        call_id: str,
+        send: Callable[[str], Awaitable[None]],
+        max_lag_ms: int = SCRIBE_MAX_LAG_MS,
+        lag_policy: str = SCRIBE_LAG_POLICY
+    ):
+        if lag_policy not in LAG_POLICIES:
+            raise ValueError(f"Unknown lag policy {lag_policy!r}; expected one of {LAG_POLICIES}")
+
+        self.call_id = call_id
+        self._send = send
+        self.max_lag_ms = max_lag_ms
+        self.lag_policy = lag_policy
+
+        # (audio, duration ms, enqueued at)
+        self._queue: Deque[Tuple[str, float, float]] = deque()
+        self._queued_ms = 0.0
+        self._wakeup = asyncio.Event()
+        self._sender_task: Optional[asyncio.Task] = None
+        self._sending = False
+
+        self.sent_chunks = 0
+        self.sent_ms = 0.0
+        self.dropped_chunks = 0
+        self.dropped_ms = 0.0
+        self.max_queued_ms = 0.0
+        self.last_lag_ms = 0.0
+        self.max_lag_seen_ms = 0.0
+        self._total_lag_ms = 0.0
+
+    def start(self) -> None:
+        """Start the sender task on the running event loop."""
+        if self._sender_task is None:
+            self._sender_task = asyncio.create_task(self._sender())
+
+    def enqueue(self, audio_base64: str) -> bool:
+        """
+        Queue a chunk of audio for Scribe without waiting for it to be sent.
+
+        Returns:
+            True if queued, False if the lag policy dropped it
+        """
+        duration = audio_duration_ms(audio_base64)
+        if self._queued_ms + duration > self.max_lag_ms and self._queue:
+            if self.lag_policy == DROP_NEWEST:
+                self._drop(duration)
+                return False
+            while self._queue and self._queued_ms + duration > self.max_lag_ms:
+                _, dropped, _ = self._queue.popleft()
+                self._queued_ms -= dropped
+                self._drop(dropped)
+
+        self._queue.append((audio_base64, duration, time.monotonic()))
+        self._queued_ms += duration
+        self.max_queued_ms = max(self.max_queued_ms, self._queued_ms)
+        self._wakeup.set()
+        return True
+
+    def _drop(self, duration: float) -> None:
+        if not self.dropped_chunks:
+            logger.warning(f"Scribe is more than {self.max_lag_ms}ms behind for {self.call_id}; dropping audio ({self.lag_policy})")
+        self.dropped_chunks += 1
+        self.dropped_ms += duration
+
+    async def _sender(self) -> None:
+        while True:
+            while not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            audio_base64, duration, enqueued_at = self._queue.popleft()
+            self._queued_ms -= duration
+
+            lag = (time.monotonic() - enqueued_at) * 1000
+            self.last_lag_ms = lag
+            self.max_lag_seen_ms = max(self.max_lag_seen_ms, lag)
+            self._total_lag_ms += lag
+
+            self._sending = True
+            try:
+                await self._send(audio_base64)
+            finally:
+                self._sending = False
+            self.sent_chunks += 1
+            self.sent_ms += duration
+
+    async def drain(self, timeout: float = 5) -> None:
+        """Wait (up to `timeout` seconds) for queued audio to be sent, then stop."""
+        try:
+            async with asyncio.timeout(timeout):
+                while self._queue or self._sending:
+                    await asyncio.sleep(0.01)
+        except TimeoutError:
+            logger.warning(f"Gave up sending {self._queued_ms:.0f}ms of queued audio to Scribe for {self.call_id}")
+            self.dropped_chunks += len(self._queue)
+            self.dropped_ms += self._queued_ms
+        self.stop()
+
+    def stop(self) -> None:
+        self._queue.clear()
+        self._queued_ms = 0.0
+        if self._sender_task:
+            self._sender_task.cancel()
+            self._sender_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "call_id": self.call_id,
+            "queued_ms": round(self._queued_ms),
+            "max_queued_ms": round(self.max_queued_ms),
+            "lag_ms": round(self.last_lag_ms, 1),
+            "max_lag_ms": round(self.max_lag_seen_ms, 1),
+            "avg_lag_ms": round(self._total_lag_ms / self.sent_chunks, 1) if self.sent_chunks else 0.0,
+            "sent_chunks": self.sent_chunks,
+            "sent_ms": round(self.sent_ms),
+            "dropped_chunks": self.dropped_chunks,
+            "dropped_ms": round(self.dropped_ms)
+        }
@@ -0,0 +1,293 @@
+"""
+Ahead-of-time preparation of meeting calls.
+
+Joining a meeting used to do everything at join time: parse the invite
+(possibly a multi-second Gemini request), then build the ElevenLabs call.
+Preparing a meeting does that work in advance, from the calendar sweep or
+a `prepare_call` command:
+
+1. parse the invite (through the invite cache)
+2. validate the dial-in number and that ElevenLabs is configured
+3. build the outbound-call payload
+
+and stores the result keyed by meeting, both in memory and in the
+`prepared_meetings` MongoDB collection (so any instance can use it). A
+later join_call for the same meeting goes straight to dialing.
+
+A meeting is identified by the id the caller gives it (e.g. the calendar
+event id) or, failing that, by the invite's content key.
+"""
+import logging
+import os
+import re
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from elevenlabs import build_call_payload, missing_env_vars as missing_elevenlabs_env_vars
+from invite_cache import InviteParseCache, invite_key
+from parse_meeting_info import parse_meeting_info_async, parse_meeting_info_batch_async
+
+logger = logging.getLogger(__name__)
+
+PREPARED_MEETING_TTL = float(os.getenv("PREPARED_MEETING_TTL", 24 * 3600))  # 1 day
+PREPARED_MEETING_COLLECTION = os.getenv("PREPARED_MEETING_COLLECTION", "prepared_meetings")
+
+# E.164: + and up to 15 digits, no leading zero
+_DIAL_NUMBER = re.compile(r"^\+[1-9]\d{7,14}$")
+
+# Join latencies kept for the stats percentiles
+_LATENCY_SAMPLES = 200
+# Expired records are swept from memory once there are more than this many
+_PRUNE_ABOVE = 1000
+
+
+def meeting_key(raw_invite: str, meeting_id: Optional[str] = None) -> str:
+    """Key a meeting is prepared under: its id if known, else the invite's content key."""
+    return f"id:{meeting_id}" if meeting_id else f"invite:{invite_key(raw_invite)}"
+
+
+def validate_dial_in(parse_result: Dict[str, Any]) -> Optional[str]:
+    """
+    Check that a parsed invite can be dialed.
+
+    Returns:
+        An error message, or None if the call can be placed
+    """
+    if not parse_result.get("success"):
+        return parse_result.get("error") or "Failed to parse meeting info"
+    phone_number = parse_result.get("phone_number") or ""
+    if not phone_number:
+        return "No phone number in the invite"
+    if not _DIAL_NUMBER.match(phone_number):
+        return f"Invalid dial-in number: {phone_number}"
+    missing = missing_elevenlabs_env_vars()
+    if missing:
+        return f"ElevenLabs not configured: {', '.join(missing)}"
+    return None
+
+
+class MeetingPreparer:
+    """
+    Prepared meeting calls (parsed, validated, payload built), stored in
+    memory and MongoDB, plus join latency stats for prepared and
+    unprepared joins.
+    """
+
+    def __init__(
+        self,
+        invite_cache: InviteParseCache,
+        ttl: float = PREPARED_MEETING_TTL,
+        collection_name: str = PREPARED_MEETING_COLLECTION
+    ):
+        self.invite_cache = invite_cache
+        self.ttl = ttl
+        self.collection_name = collection_name
+        self.collection = None
+
+        self._prepared: Dict[str, Dict[str, Any]] = {}
+
+        self.prepared = 0
+        self.failed = 0
+        self.db_errors = 0
+        self._latencies: Dict[str, Deque[float]] = {
+            "prepared": deque(maxlen=_LATENCY_SAMPLES),
+            "unprepared": deque(maxlen=_LATENCY_SAMPLES)
+        }
+        self._joins = {"prepared": 0, "unprepared": 0}
+
+    async def start(self, db) -> None:
+        """Attach the MongoDB store and make sure its TTL index exists."""
+        self.collection = db[self.collection_name]
+        try:
+            await self.collection.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            logger.warning(f"Failed to create TTL index on {self.collection_name}: {str(e)}")
+
+    def _record(self, key: str, raw_invite: str, parse_result: Dict[str, Any], call_id: Optional[str]) -> Dict[str, Any]:
+        """A prepared-meeting record, or a failure result if the invite can't be dialed."""
+        error = validate_dial_in(parse_result)
+        if error:
+            self.failed += 1
+            return {"success": False, "meeting_key": key, "error": error}
+
+        now = datetime.now(timezone.utc)
+        self.prepared += 1
+        return {
+            "success": True,
+            "meeting_key": key,
+            "invite_key": invite_key(raw_invite),
+            "phone_number": parse_result["phone_number"],
+            "meeting_credentials": parse_result.get("meeting_credentials", ""),
+            "source": parse_result.get("source"),
+            "call_id": call_id,
+            "payload": build_call_payload(parse_result["phone_number"], parse_result.get("meeting_credentials", ""), call_id),
+            "prepared_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl)
+        }
+
+    async def _store(self, record: Dict[str, Any]) -> None:
+        """Store a record under its meeting key and, if that is an id, its invite key too."""
+        keys = dict.fromkeys([record["meeting_key"], f"invite:{record['invite_key']}"])
+        if len(self._prepared) > _PRUNE_ABOVE:
+            now = datetime.now(timezone.utc)
+            self._prepared = {key: kept for key, kept in self._prepared.items() if kept["expires_at"] > now}
+        for key in keys:
+            self._prepared[key] = record
+        if self.collection is None:
+            return
+        try:
+            for key in keys:
+                await self.collection.replace_one({"_id": key}, {**record, "_id": key}, upsert=True)
+        except Exception as e:
+            self.db_errors += 1
+            logger.warning(f"Failed to store prepared meeting {record['meeting_key']}: {str(e)}")
+
+    async def prepare(self, raw_invite: str, meeting_id: Optional[str] = None, call_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Parse, validate and build the call for one meeting, and store it.
+
+        Args:
+            raw_invite: Raw meeting invite text
+            meeting_id: Stable id of the meeting (e.g. calendar event id), if any
+            call_id: Call ID the meeting will be joined with, if already known
+
+        Returns:
+            The prepared record ("success", "meeting_key", "phone_number", ...)
+            or {"success": False, "meeting_key", "error"}
+        """
+        key = meeting_key(raw_invite, meeting_id)
+        parse_result = await self.invite_cache.parse_once(raw_invite, lambda: parse_meeting_info_async(raw_invite))
+        record = self._record(key, raw_invite, parse_result, call_id)
+        if record["success"]:
+            await self._store(record)
+            logger.info(f"Prepared meeting {key}: {record['phone_number']} (source: {record['source']})")
+        else:
+            logger.warning(f"Could not prepare meeting {key}: {record['error']}")
+        return record
+
+    async def prepare_many(self, meetings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Prepare several meetings (a calendar sweep) with one batched parse.
+
+        Args:
+            meetings: Dicts with "raw_invite" and optionally "id" and "call_id"
+
+        Returns:
+            One prepared record or failure per meeting, in order
+        """
+        invites = [meeting["raw_invite"] for meeting in meetings]
+        parse_results = await self.invite_cache.parse_many(invites, parse_meeting_info_batch_async)
+        records = []
+        for meeting, parse_result in zip(meetings, parse_results):
+            key = meeting_key(meeting["raw_invite"], meeting.get("id"))
+            record = self._record(key, meeting["raw_invite"], parse_result, meeting.get("call_id"))
+            if record["success"]:
+                await self._store(record)
+            records.append(record)
+        logger.info(f"Prepared {sum(record['success'] for record in records)}/{len(records)} meetings")
+        return records
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """A prepared meeting that hasn't expired, from memory or MongoDB."""
+        record = self._prepared.get(key)
+        if record is None and self.collection is not None:
+            try:
+                record = await self.collection.find_one({"_id": key})
+            except Exception as e:
+                self.db_errors += 1
+                logger.warning(f"Failed to read prepared meeting {key}: {str(e)}")
+            if record is not None:
+                record.pop("_id", None)
+                self._prepared[key] = record
+
+        if record is None:
+            return None
+        expires_at = record["expires_at"]
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at <= datetime.now(timezone.utc):
+            self._prepared.pop(key, None)
+            return None
+        return record
+
+    async def payload_for_join(
+        self,
+        raw_invite: Optional[str],
+        call_id: Optional[str],
+        meeting_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        The outbound-call payload of a prepared meeting, for joining it as
+        `call_id`.
+
+        A meeting prepared by id is also found by its invite, and vice
+        versa. The invite must match what was prepared, so an edited
+        invite is parsed again.
+
+        Returns:
+            The payload, or None if the meeting wasn't prepared
+        """
+        keys = []
+        if meeting_id:
+            keys.append(meeting_key("", meeting_id))
+        if raw_invite:
+            keys.append(meeting_key(raw_invite))
+        for key in keys:
+            record = await self.get(key)
+            if record is None or (raw_invite and record["invite_key"] != invite_key(raw_invite)):
+                continue
+            if record.get("call_id") == call_id:
+                return record["payload"]
+            # Prepared before the call id was known; the prompt carries it, so rebuild (microseconds)
+            return build_call_payload(record["phone_number"], record["meeting_credentials"], call_id)
+        return None
+
+    async def invalidate(self, key: Optional[str] = None) -> int:
+        """
+        Drop the prepared meetings of one invite (by its invite_key), under
+        both their id and invite keys, or every prepared meeting if no key
+        is given.
+
+        Returns:
+            Number of stored entries removed (the larger of the two tiers' counts)
+        """
+        stale = [stored for stored, record in self._prepared.items() if key is None or record["invite_key"] == key]
+        for stored in stale:
+            del self._prepared[stored]
+        removed = len(stale)
+
+        if self.collection is not None:
+            try:
+                result = await self.collection.delete_many({} if key is None else {"invite_key": key})
+                removed = max(removed, result.deleted_count)
+            except Exception as e:
+                self.db_errors += 1
+                logger.warning(f"Failed to invalidate prepared meetings: {str(e)}")
+
+        logger.info(f"Invalidated {removed} prepared meeting entr{'y' if removed == 1 else 'ies'}")
+        return removed
+
+    def record_join(self, prepared: bool, latency_ms: float) -> None:
+        """Record the time from a join_call to the dial request for the stats."""
+        kind = "prepared" if prepared else "unprepared"
+        self._joins[kind] += 1
+        self._latencies[kind].append(latency_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        joins = {}
+        for kind, samples in self._latencies.items():
+            ordered = sorted(samples)
+            joins[kind] = {
+                "count": self._joins[kind],
+                "p50_ms": round(ordered[len(ordered) // 2], 2) if ordered else None,
+                "max_ms": round(ordered[-1], 2) if ordered else None
+            }
+        return {
+            "stored": len(self._prepared),
+            "persistent": self.collection is not None,
+            "prepared": self.prepared,
+            "failed": self.failed,
+            "db_errors": self.db_errors,
+            "join_to_dial": joins
+        }
@@ -1,14 +1,188 @@
 """
-Parse meeting information using Google Gemini Flash 2.5 to extract phone number and credentials.
+Parse meeting information to extract phone number and credentials.
+
+Invites are first run through the rule-based extractor in invite_parser,
+which handles the regular Google Meet / Zoom / Teams / Webex layouts in
+microseconds. Only when it isn't confident is the invite sent to Google
+Gemini Flash 2.5, through one shared model in JSON mode. The async path
+(used by the API) is limited to GEMINI_MAX_CONCURRENCY requests at a time
+and GEMINI_TIMEOUT seconds per invite. parse_meeting_info_batch_async packs
+many invites into a few Gemini requests for calendar sweeps.
 """
+import asyncio
+import logging
 import os
 import json
-import google.generativeai as genai
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
+import httpx
+
+import http_client
+from invite_parser import parse_invite_rules
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL = "gemini-2.5-flash"
+INVITE_RULES_ENABLED = os.getenv("INVITE_RULES_ENABLED", "true").lower() == "true"
+INVITE_RULES_MIN_CONFIDENCE = float(os.getenv("INVITE_RULES_MIN_CONFIDENCE", 0.9))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", 20))  # Seconds per invite parse
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 4))
+GEMINI_BATCH_MAX_INVITES = int(os.getenv("GEMINI_BATCH_MAX_INVITES", 25))  # Invites per batch request
+GEMINI_BATCH_MAX_CHARS = int(os.getenv("GEMINI_BATCH_MAX_CHARS", 100000))  # Invite text per batch request
+GEMINI_BATCH_TIMEOUT = float(os.getenv("GEMINI_BATCH_TIMEOUT", 60))  # Seconds per batch request
+
+
+def load_gemini_sdk():
+    """
+    Import the Gemini SDK on first use. It takes most of a second to import,
+    so keeping it out of module import speeds up cold starts.
+    """
+    import google.generativeai as genai
+    return genai
+
+
+async def check_connection(timeout: float = 5) -> str:
+    """
+    Probe Gemini by fetching the model's metadata (no tokens are generated).
+
+    Args:
+        timeout: Seconds to wait for Gemini to respond
+
+    Returns:
+        "connected", "not_configured", "error_<status>", "timeout" or "error: <reason>"
+    """
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        return "not_configured"
+
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}"
+    try:
+        response = await http_client.request("GET", url, headers={"x-goog-api-key": api_key}, timeout=timeout)
+        if response.status_code == 200:
+            return "connected"
+        return f"error_{response.status_code}"
+    except httpx.TimeoutException:
+        return "timeout"
+    except Exception as e:
+        return f"error: {str(e)[:50]}"
+
+
+PROMPT_TEMPLATE = """You are a meeting information parser. Extract the UK phone number and meeting credentials from the following meeting information.
+
+IMPORTANT RULES:
+1. Always select a UK phone number (starting with +44) if available
+2. Remove all spaces from the phone number
+3. Keep the phone number in international format starting with +
+4. For meeting credentials, preserve the original formatting exactly as shown
+
+Meeting Information:
+{meeting_blurb}"""
+
+# JSON mode: Gemini's reply is constrained to this schema, so it is always
+# bare JSON (no markdown fences) with both fields present
+INVITE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "phone_number": {"type": "string", "description": "Dial-in number, e.g. +442039563891"},
+        "meeting_credentials": {"type": "string", "description": "Exact meeting ID/PIN/Passcode text"}
+    },
+    "required": ["phone_number", "meeting_credentials"]
+}
+
+BATCH_PROMPT_TEMPLATE = """You are a meeting information parser. Below are {count} numbered meetings. For each one, extract the UK phone number and meeting credentials.
+
+IMPORTANT RULES:
+1. Always select a UK phone number (starting with +44) if available
+2. Remove all spaces from the phone number
+3. Keep the phone number in international format starting with +
+4. For meeting credentials, preserve the original formatting exactly as shown
+5. Return exactly one result per meeting, with the meeting's number as "id"; use empty strings if a meeting has no dial-in details
+6. Never mix details from different meetings
+
+{meetings}"""
+
+BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    **INVITE_SCHEMA["properties"]
+                },
+                "required": ["id", "phone_number", "meeting_credentials"]
+            }
+        }
+    },
+    "required": ["results"]
+}
+
+_model = None
+_model_lock = threading.Lock()
+
+# Caps concurrent Gemini requests from the async path; waiting for a slot
+# counts towards the request's deadline
+_gemini_slots = asyncio.BoundedSemaphore(max(1, GEMINI_MAX_CONCURRENCY))
+gemini_counters = {"requests": 0, "in_flight": 0, "waiting": 0, "timeouts": 0, "errors": 0, "batches": 0, "batched_invites": 0}
+
+
+def get_gemini_model():
+    """
+    The shared Gemini model, configured on first use (JSON mode, INVITE_SCHEMA).
+    The first call imports the SDK, so call it off the event loop.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                genai = load_gemini_sdk()
+                genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+                _model = genai.GenerativeModel(
+                    GEMINI_MODEL,
+                    generation_config={
+                        "response_mime_type": "application/json",
+                        "response_schema": INVITE_SCHEMA
+                    }
+                )
+    return _model
+
+
+def gemini_stats() -> Dict[str, Any]:
+    return {
+        **gemini_counters,
+        "max_concurrency": max(1, GEMINI_MAX_CONCURRENCY),
+        "timeout": GEMINI_TIMEOUT
+    }
+
+
+def parse_with_rules(meeting_blurb: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse meeting information with the rule-based extractor.
+
+    Returns:
+        A parse_meeting_info result with source "rules", or None if the rules
+        are disabled or not confident enough
+    """
+    if not INVITE_RULES_ENABLED:
+        return None
+    rules = parse_invite_rules(meeting_blurb)
+    if rules["confidence"] < INVITE_RULES_MIN_CONFIDENCE:
+        logger.info(f"Invite rules unsure (confidence {rules['confidence']}: {', '.join(rules['reasons'])}), asking Gemini")
+        return None
+    return {
+        "success": True,
+        "phone_number": rules["phone_number"],
+        "meeting_credentials": rules["meeting_credentials"],
+        "source": "rules",
+        "confidence": rules["confidence"]
+    }
+
+
 def parse_meeting_info(meeting_blurb: str) -> Dict[str, Any]:
     """
     Parse meeting information to extract UK phone number and meeting credentials.
@@ -21,66 +195,221 @@ def parse_meeting_info(meeting_blurb: str) -> Dict[str, Any]:
         - phone_number: UK phone number in format +44xxxxxxxxxx
         - meeting_credentials: Meeting ID/PIN/Passcode information
         - success: Boolean indicating if parsing was successful
+        - source: "rules" or "gemini"
+        - confidence: Rule-based confidence (rules only)
         - error: Error message if parsing failed
     """
+    return parse_with_rules(meeting_blurb) or parse_with_gemini(meeting_blurb)
+
+
+async def parse_meeting_info_async(meeting_blurb: str, timeout: float = GEMINI_TIMEOUT) -> Dict[str, Any]:
+    """
+    Async version of parse_meeting_info; a Gemini fallback doesn't tie up a
+    worker thread.
+
+    Args:
+        meeting_blurb: Raw meeting information text (Zoom, Google Meet, etc.)
+        timeout: Seconds allowed for the Gemini fallback, including the wait
+            for a concurrency slot
+
+    Returns:
+        Same dictionary as parse_meeting_info
+    """
+    return parse_with_rules(meeting_blurb) or await parse_with_gemini_async(meeting_blurb, timeout)
+
+
+def _gemini_result(response_text: str) -> Dict[str, Any]:
+    result = json.loads(response_text)
+    return {
+        "success": True,
+        "phone_number": result.get("phone_number", ""),
+        "meeting_credentials": result.get("meeting_credentials", ""),
+        "source": "gemini",
+        "raw_response": response_text
+    }
+
+
+def _gemini_failure(error: str) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "error": f"Failed to parse meeting info: {error}",
+        "phone_number": "",
+        "meeting_credentials": "",
+        "source": "gemini"
+    }
+
+
+def parse_with_gemini(meeting_blurb: str, timeout: float = GEMINI_TIMEOUT) -> Dict[str, Any]:
+    """
+    Parse meeting information with Gemini (blocking).
+
+    Args:
+        meeting_blurb: Raw meeting information text (Zoom, Google Meet, etc.)
+        timeout: Seconds before the request is abandoned
+
+    Returns:
+        Same dictionary as parse_meeting_info, with source "gemini"
+    """
     try:
-        # Configure Gemini
-        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+        response = get_gemini_model().generate_content(
+            PROMPT_TEMPLATE.format(meeting_blurb=meeting_blurb),
+            request_options={"timeout": timeout}
+        )
+        return _gemini_result(response.text)
+    except Exception as e:
+        return _gemini_failure(str(e))
 
-        # Use Gemini Flash 2.5
-        model = genai.GenerativeModel('gemini-2.5-flash')
 
-        # Craft the prompt
-        prompt = f"""You are a meeting information parser. Extract the UK phone number and meeting credentials from the following meeting information.
+async def _generate_async(prompt: str, timeout: float, generation_config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Run one Gemini request within a concurrency slot and a deadline.
 
-IMPORTANT RULES:
-1. Always select a UK phone number (starting with +44) if available
-2. Remove all spaces from the phone number
-3. Keep the phone number in international format starting with +
-4. For meeting credentials, preserve the original formatting exactly as shown
-5. Return ONLY valid JSON, no markdown formatting, no code blocks
+    Returns:
+        The response text
 
-Meeting Information:
-{meeting_blurb}
-
-Return a JSON object with this exact structure:
-{{
-  "phone_number": "+44xxxxxxxxxx",
-  "meeting_credentials": "exact meeting ID/PIN/Passcode text"
-}}"""
-
-        # Generate response
-        response = model.generate_content(prompt)
-
-        # Parse the JSON response
-        response_text = response.text.strip()
-
-        # Remove markdown code blocks if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-
-        # Parse JSON
-        result = json.loads(response_text)
-
-        return {
-            "success": True,
-            "phone_number": result.get("phone_number", ""),
-            "meeting_credentials": result.get("meeting_credentials", ""),
-            "raw_response": response_text
-        }
+    Raises:
+        TimeoutError: If the slot wait plus the request took longer than timeout
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    gemini_counters["requests"] += 1
+    async with asyncio.timeout(timeout):
+        model = _model or await asyncio.to_thread(get_gemini_model)
+        gemini_counters["waiting"] += 1
+        try:
+            await _gemini_slots.acquire()
+        finally:
+            gemini_counters["waiting"] -= 1
+        gemini_counters["in_flight"] += 1
+        try:
+            response = await model.generate_content_async(
+                prompt,
+                generation_config=generation_config,
+                request_options={"timeout": max(0.1, deadline - loop.time())}
+            )
+        finally:
+            gemini_counters["in_flight"] -= 1
+            _gemini_slots.release()
+    return response.text
+
+
+async def parse_with_gemini_async(meeting_blurb: str, timeout: float = GEMINI_TIMEOUT) -> Dict[str, Any]:
+    """
+    Parse meeting information with Gemini without blocking the event loop.
+    At most GEMINI_MAX_CONCURRENCY requests run at once; the rest wait for
+    a slot.
+
+    Args:
+        meeting_blurb: Raw meeting information text (Zoom, Google Meet, etc.)
+        timeout: Seconds allowed in total, including the wait for a slot
 
+    Returns:
+        Same dictionary as parse_meeting_info, with source "gemini"
+    """
+    try:
+        return _gemini_result(await _generate_async(PROMPT_TEMPLATE.format(meeting_blurb=meeting_blurb), timeout))
+    except TimeoutError:
+        gemini_counters["timeouts"] += 1
+        logger.warning(f"Gemini invite parse timed out after {timeout}s")
+        return _gemini_failure(f"Gemini timed out after {timeout}s")
     except Exception as e:
-        return {
-            "success": False,
-            "error": f"Failed to parse meeting info: {str(e)}",
-            "phone_number": "",
-            "meeting_credentials": ""
-        }
+        gemini_counters["errors"] += 1
+        return _gemini_failure(str(e))
+
+
+def _pack_batches(meeting_blurbs: List[str]) -> List[List[int]]:
+    """Group invite indexes into as few requests as the batch limits allow."""
+    batches: List[List[int]] = []
+    chars = 0
+    for i, blurb in enumerate(meeting_blurbs):
+        if not batches or len(batches[-1]) >= GEMINI_BATCH_MAX_INVITES or chars + len(blurb) > GEMINI_BATCH_MAX_CHARS:
+            batches.append([])
+            chars = 0
+        batches[-1].append(i)
+        chars += len(blurb)
+    return batches
+
+
+async def _parse_batch_with_gemini(meeting_blurbs: List[str], timeout: float) -> List[Optional[Dict[str, Any]]]:
+    """
+    Parse several invites with one Gemini request.
+
+    Returns:
+        One result per invite, or None for invites missing from the reply
+
+    Raises:
+        Exception: If the request failed or the reply isn't valid JSON
+    """
+    sections = "\n\n".join(f"=== Meeting {i} ===\n{blurb}" for i, blurb in enumerate(meeting_blurbs))
+    response_text = await _generate_async(
+        BATCH_PROMPT_TEMPLATE.format(count=len(meeting_blurbs), meetings=sections),
+        timeout,
+        generation_config={"response_mime_type": "application/json", "response_schema": BATCH_SCHEMA}
+    )
+    gemini_counters["batches"] += 1
+    gemini_counters["batched_invites"] += len(meeting_blurbs)
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(meeting_blurbs)
+    for item in json.loads(response_text).get("results", []):
+        index = item.get("id")
+        if isinstance(index, int) and 0 <= index < len(results) and results[index] is None:
+            results[index] = {
+                "success": True,
+                "phone_number": item.get("phone_number", ""),
+                "meeting_credentials": item.get("meeting_credentials", ""),
+                "source": "gemini",
+                "batched": True
+            }
+    return results
+
+
+async def parse_meeting_info_batch_async(
+    meeting_blurbs: List[str],
+    timeout: float = GEMINI_BATCH_TIMEOUT
+) -> List[Dict[str, Any]]:
+    """
+    Parse many invites (e.g. a calendar sweep) with as few Gemini requests
+    as possible.
+
+    Identical invites are parsed once and invites the rules are confident
+    about never reach Gemini. The rest are packed into requests of up to
+    GEMINI_BATCH_MAX_INVITES invites / GEMINI_BATCH_MAX_CHARS characters.
+    If a batch request fails, or its reply leaves an invite out, those
+    invites are parsed one by one, so one bad invite can't fail the others.
+
+    Args:
+        meeting_blurbs: Raw meeting information texts
+        timeout: Seconds allowed per batch request
+
+    Returns:
+        One parse_meeting_info result per input, in order
+    """
+    unique = list(dict.fromkeys(meeting_blurbs))
+    results: Dict[str, Dict[str, Any]] = {}
+    for blurb in unique:
+        parsed = parse_with_rules(blurb)
+        if parsed is not None:
+            results[blurb] = parsed
+
+    pending = [blurb for blurb in unique if blurb not in results]
+    batches = [[pending[i] for i in batch] for batch in _pack_batches(pending)]
+
+    async def run_batch(batch: List[str]) -> None:
+        try:
+            parsed = await _parse_batch_with_gemini(batch, timeout) if len(batch) > 1 else [None]
+        except Exception as e:
+            gemini_counters["timeouts" if isinstance(e, TimeoutError) else "errors"] += 1
+            logger.warning(f"Gemini batch of {len(batch)} invites failed, parsing them one by one: {str(e) or type(e).__name__}")
+            parsed = [None] * len(batch)
+        retries = [blurb for blurb, result in zip(batch, parsed) if result is None]
+        retried = await asyncio.gather(*(parse_with_gemini_async(blurb) for blurb in retries))
+        results.update(zip(retries, retried))
+        results.update((blurb, result) for blurb, result in zip(batch, parsed) if result is not None)
+
+    await asyncio.gather(*(run_batch(batch) for batch in batches))
+    if pending:
+        logger.info(f"Parsed {len(unique)} unique invites: {len(unique) - len(pending)} by rules, {len(pending)} with Gemini in {len(batches)} batch(es)")
+    return [results[blurb] for blurb in meeting_blurbs]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+"""
+Answer cache and in-flight coalescing for duplicate meeting questions.
+
+The agent often asks the same (or trivially rephrased) question several
+times during a call. Questions are keyed by call_id plus a normalized form
+of the text, so repeats are answered from memory and concurrent repeats
+share a single V7 job instead of each starting their own.
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUESTION_CACHE_TTL = float(os.getenv("QUESTION_CACHE_TTL", 3600))  # 1 hour
+QUESTION_CACHE_MAX_ENTRIES = int(os.getenv("QUESTION_CACHE_MAX_ENTRIES", 1000))
+
+# Disfluencies only; words like "well" or "ok" can change what is being asked
+_FILLER_WORDS = {"um", "uh", "er", "erm"}
+_CONTRACTIONS = {
+    "what's": "what is",
+    "who's": "who is",
+    "where's": "where is",
+    "when's": "when is",
+    "how's": "how is",
+    "it's": "it is",
+    "that's": "that is",
+    "there's": "there is",
+}
+_CONTRACTION_PATTERN = re.compile(r"\b(" + "|".join(re.escape(contraction) for contraction in _CONTRACTIONS) + r")\b")
+_NON_WORD = re.compile(r"[^\w\s]")
+
+CacheKey = Tuple[str, str]
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize question text so trivial rephrasings map to the same key.
+
+    Lowercases, expands common contractions, strips punctuation and filler
+    words, and collapses whitespace.
+    """
+    text = question.lower().replace("’", "'")
+    text = _CONTRACTION_PATTERN.sub(lambda match: _CONTRACTIONS[match.group(1)], text)
+    text = _NON_WORD.sub(" ", text)
+    return " ".join(word for word in text.split() if word not in _FILLER_WORDS)
+
+
+class QuestionAnswerCache:
+    """
+    TTL + LRU cache of answers keyed by (call_id, normalized question), with
+    a registry of in-flight fetches so concurrent duplicates share one.
+    """
+
+    def __init__(self, max_entries: int = QUESTION_CACHE_MAX_ENTRIES, ttl: float = QUESTION_CACHE_TTL):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._answers: "OrderedDict[CacheKey, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.inflight_joins = 0
+        self.fetches = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(call_id: str, question: str) -> CacheKey:
+        return (call_id, normalize_question(question))
+
+    def get(self, call_id: str, question: str) -> Optional[str]:
+        """
+        Look up a cached answer, counting a hit or a miss.
+
+        Returns:
+            The cached answer, or None if absent or expired
+        """
+        key = self.key(call_id, question)
+        entry = self._answers.get(key)
+        if entry is not None:
+            stored_at, answer = entry
+            if time.monotonic() - stored_at <= self.ttl:
+                self._answers.move_to_end(key)
+                self.hits += 1
+                return answer
+            del self._answers[key]
+
+        self.misses += 1
+        return None
+
+    def put(self, call_id: str, question: str, answer: str) -> None:
+        """Store an answer, evicting the least recently used entries if full."""
+        key = self.key(call_id, question)
+        self._answers[key] = (time.monotonic(), answer)
+        self._answers.move_to_end(key)
+        while len(self._answers) > self.max_entries:
+            self._answers.popitem(last=False)
+            self.evictions += 1
+
+    def record_db_hit(self, call_id: str, question: str, answer: str) -> None:
+        """Count a miss that was answered from db.questions and cache the answer."""
+        self.misses -= 1
+        self.db_hits += 1
+        self.put(call_id, question, answer)
+
+    def invalidate(self, call_id: str, question: Optional[str] = None) -> int:
+        """
+        Drop cached answers for a call (or a single question of a call).
+
+        Returns:
+            Number of entries removed
+        """
+        if question is not None:
+            return 1 if self._answers.pop(self.key(call_id, question), None) is not None else 0
+
+        keys = [key for key in self._answers if key[0] == call_id]
+        for key in keys:
+            del self._answers[key]
+        return len(keys)
+
+    async def fetch_once(
+        self,
+        call_id: str,
+        question: str,
+        fetch: Callable[[], Awaitable[Optional[str]]],
+        spawn: Callable[[Awaitable[Optional[str]]], "asyncio.Future"] = asyncio.ensure_future
+    ) -> Optional[str]:
+        """
+        Run `fetch` for a question unless an identical fetch is already in
+        flight, in which case wait for that one instead. Successful answers
+        are cached.
+
+        Args:
+            call_id: Call ID the question belongs to
+            question: The question text
+            fetch: Coroutine factory that produces the answer (e.g. via V7)
+            spawn: Starts the fetch as a task; pass the app's tracked task
+                starter so the shared fetch is cancelled on shutdown
+
+        Returns:
+            The answer, or None if the fetch produced none
+        """
+        key = self.key(call_id, question)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.inflight_joins += 1
+            logger.info(f"Joining in-flight answer for duplicate question on call_id {call_id}")
+            return await asyncio.shield(future)
+
+        self.fetches += 1
+        future = spawn(fetch())
+        self._inflight[key] = future
+
+        def _done(done: asyncio.Future) -> None:
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+            if not done.cancelled() and done.exception() is None and done.result():
+                self.put(call_id, question, done.result())
+
+        future.add_done_callback(_done)
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.db_hits + self.misses
+        return {
+            "entries": len(self._answers),
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.db_hits) / lookups, 3) if lookups else 0.0,
+            "inflight_joins": self.inflight_joins,
+            "v7_jobs": self.fetches,
+            "evictions": self.evictions
+        }
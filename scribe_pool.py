@@ -0,0 +1,203 @@
+"""
+Pool of pre-connected idle Scribe realtime connections.
+
+Opening a Scribe websocket (TLS + websocket handshake + auth) after Twilio's
+`start` event delays the first seconds of every meeting's transcript. The
+pool keeps a few connections open ahead of time so a new call can check one
+out immediately; a background task tops the pool back up, retires
+connections that have been idle too long or have closed, and backs off
+while Scribe is unreachable.
+
+Idle sessions are recycled every SCRIBE_POOL_MAX_IDLE seconds, and each new
+one is a paid Scribe connection. So the pool only stays warm for
+SCRIBE_POOL_WARM_FOR seconds after startup or the last call. After that it
+closes its sessions and refills on the next call (which connects directly).
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SCRIBE_POOL_SIZE = int(os.getenv("SCRIBE_POOL_SIZE", 2))
+SCRIBE_POOL_MAX_IDLE = float(os.getenv("SCRIBE_POOL_MAX_IDLE", 20))  # seconds before an idle connection is replaced
+# seconds the pool stays filled after startup / the last call (0 keeps it warm forever)
+SCRIBE_POOL_WARM_FOR = float(os.getenv("SCRIBE_POOL_WARM_FOR", 600))
+SCRIBE_POOL_CHECK_INTERVAL = float(os.getenv("SCRIBE_POOL_CHECK_INTERVAL", 2))  # seconds between health checks
+SCRIBE_POOL_MAX_BACKOFF = 60.0
+
+
+class PooledConnection:
+    """An idle connection plus what the pool knows about its health."""
+
+    def __init__(self, connection: Any):
+        self.connection = connection
+        self.created = time.monotonic()
+        self.alive = True
+
+    def mark_dead(self, *_args) -> None:
+        self.alive = False
+
+    def age(self) -> float:
+        return time.monotonic() - self.created
+
+
+class ScribeConnectionPool:
+    """
+    Keeps up to `size` idle connections made by `connect`.
+
+    `connect` is a coroutine factory returning a new connection. Connections
+    must provide async ``close()`` and may provide ``on_close(callback)`` /
+    ``on_error(callback)``, which the pool uses to notice dead idle ones.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[Any]],
+        size: int = SCRIBE_POOL_SIZE,
+        max_idle: float = SCRIBE_POOL_MAX_IDLE,
+        warm_for: float = SCRIBE_POOL_WARM_FOR,
+        check_interval: float = SCRIBE_POOL_CHECK_INTERVAL
+    ):
+        self._connect = connect
+        self.size = max(0, size)
+        self.max_idle = max_idle
+        self.warm_for = warm_for
+        self.check_interval = check_interval
+
+        self._idle: Deque[PooledConnection] = deque()
+        self._refill = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._backoff = 0.0
+        self._last_used = time.monotonic()
+
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.retired = 0
+        self.connect_failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def start(self) -> None:
+        """Start filling the pool in the background."""
+        if self.enabled and (self._task is None or self._task.done()):
+            self._last_used = time.monotonic()
+            self._task = asyncio.create_task(self._maintain())
+
+    def _warm(self) -> bool:
+        """Whether a call was recent enough to keep sessions connected."""
+        return self.warm_for <= 0 or time.monotonic() - self._last_used < self.warm_for
+
+    def _usable(self, pooled: PooledConnection) -> bool:
+        return pooled.alive and pooled.age() < self.max_idle
+
+    def acquire(self) -> Optional[Any]:
+        """
+        Check out an idle connection.
+
+        Returns:
+            A connected Scribe session, or None if the pool is empty (the
+            caller should connect directly)
+        """
+        self._last_used = time.monotonic()
+        while self._idle:
+            pooled = self._idle.popleft()
+            if self._usable(pooled):
+                self.hits += 1
+                self._refill.set()
+                return pooled.connection
+            self._retire(pooled)
+
+        if self.enabled:
+            self.misses += 1
+            self._refill.set()
+        return None
+
+    def _retire(self, pooled: PooledConnection) -> None:
+        self.retired += 1
+        asyncio.create_task(self._close(pooled.connection))
+
+    async def _close(self, connection: Any) -> None:
+        try:
+            await connection.close()
+        except Exception:
+            pass
+
+    async def _open(self) -> PooledConnection:
+        connection = await self._connect()
+        pooled = PooledConnection(connection)
+        for hook in ("on_close", "on_error"):
+            register = getattr(connection, hook, None)
+            if callable(register):
+                register(pooled.mark_dead)
+        self.created += 1
+        return pooled
+
+    async def _maintain(self) -> None:
+        while True:
+            warm = self._warm()
+            # Retire idle connections that closed or are about to be timed out,
+            # and all of them once there have been no calls for a while
+            for pooled in [p for p in self._idle if not warm or not self._usable(p)]:
+                self._idle.remove(pooled)
+                self._retire(pooled)
+
+            if not warm:
+                # Stay empty until the next checkout
+                self._backoff = 0.0
+                self._refill.clear()
+                await self._refill.wait()
+                continue
+
+            while len(self._idle) < self.size:
+                try:
+                    self._idle.append(await self._open())
+                    self._backoff = 0.0
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.connect_failures += 1
+                    self._backoff = min(SCRIBE_POOL_MAX_BACKOFF, max(self.check_interval, self._backoff * 2))
+                    logger.warning(f"Failed to pre-connect Scribe session (retrying in {self._backoff:.1f}s): {str(e)}")
+                    break
+
+            self._refill.clear()
+            if self._backoff:
+                # Scribe is unreachable; checkouts don't cut the wait short
+                await asyncio.sleep(self._backoff)
+                continue
+            try:
+                await asyncio.wait_for(self._refill.wait(), timeout=self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self) -> None:
+        """Stop refilling and close the idle connections."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        idle = list(self._idle)
+        self._idle.clear()
+        await asyncio.gather(*(self._close(pooled.connection) for pooled in idle))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "warm": self._warm(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "created": self.created,
+            "retired": self.retired,
+            "connect_failures": self.connect_failures
+        }
@@ -0,0 +1,165 @@
+"""
+Energy-based silence suppression for the Twilio -> Scribe audio path.
+
+A large part of a meeting call is silence or hold music, and forwarding it
+costs Scribe bandwidth and transcription time. Each chunk of μ-law audio is
+decoded through a 256-entry lookup table into a NumPy array and the energy
+of all its 20 ms frames is computed in one vectorized pass. A frame counts
+as speech when it is louder than both SILENCE_THRESHOLD_DBFS and a slowly
+rising noise floor plus SILENCE_FLOOR_MARGIN_DB, so sustained sound such as
+hold music stops counting as speech after a few seconds.
+
+Only speech is forwarded, padded with SILENCE_PREROLL_MS before it (so word
+onsets aren't clipped) and SILENCE_HANGOVER_MS after it. During long
+silences one frame is still sent every SILENCE_KEEPALIVE_MS so the Scribe
+session doesn't go idle.
+"""
+import logging
+import os
+from collections import deque
+from typing import Any, Deque, Dict
+
+import numpy as np
+
+from media_stream import MULAW_BYTES_PER_MS, TWILIO_FRAME_MS
+
+logger = logging.getLogger(__name__)
+
+SILENCE_SUPPRESSION = os.getenv("SILENCE_SUPPRESSION", "false").lower() == "true"
+SILENCE_THRESHOLD_DBFS = float(os.getenv("SILENCE_THRESHOLD_DBFS", -45))
+SILENCE_FLOOR_MARGIN_DB = float(os.getenv("SILENCE_FLOOR_MARGIN_DB", 10))
+SILENCE_FLOOR_RISE_DB_PER_S = float(os.getenv("SILENCE_FLOOR_RISE_DB_PER_S", 10))
+SILENCE_HANGOVER_MS = int(os.getenv("SILENCE_HANGOVER_MS", 300))
+SILENCE_PREROLL_MS = int(os.getenv("SILENCE_PREROLL_MS", 100))
+SILENCE_KEEPALIVE_MS = int(os.getenv("SILENCE_KEEPALIVE_MS", 5000))
+
+FRAME_BYTES = TWILIO_FRAME_MS * MULAW_BYTES_PER_MS
+FULL_SCALE = 32768.0
+
+
+def _mulaw_decode_table() -> np.ndarray:
+    """G.711 μ-law byte -> linear 16-bit sample."""
+    inverted = ~np.arange(256, dtype=np.uint8)
+    exponent = (inverted >> 4) & 0x07
+    mantissa = inverted & 0x0F
+    magnitude = (((mantissa.astype(np.int32) << 3) + 0x84) << exponent) - 0x84
+    return np.where(inverted & 0x80, -magnitude, magnitude).astype(np.float32)
+
+
+MULAW_TO_LINEAR = _mulaw_decode_table()
+# Squared samples, so frame energy is one table lookup and a mean
+MULAW_TO_POWER = MULAW_TO_LINEAR ** 2
+
+
+def frame_energies_dbfs(audio: bytes) -> np.ndarray:
+    """
+    RMS level (dBFS) of every whole 20 ms frame in a μ-law buffer.
+    """
+    frames = len(audio) // FRAME_BYTES
+    if not frames:
+        return np.empty(0, dtype=np.float32)
+    samples = np.frombuffer(audio, dtype=np.uint8, count=frames * FRAME_BYTES).reshape(frames, FRAME_BYTES)
+    power = MULAW_TO_POWER[samples].mean(axis=1)
+    return 10 * np.log10(np.maximum(power, 1.0) / FULL_SCALE ** 2)
+
+
+class SilenceSuppressor:
+    """
+    Per-call speech gate over μ-law audio. Feed it every chunk of the call,
+    in order; it returns the audio to forward.
+    """
+
+    def __init__(
+        self,
+        threshold_dbfs: float = SILENCE_THRESHOLD_DBFS,
+        floor_margin_db: float = SILENCE_FLOOR_MARGIN_DB,
+        floor_rise_db_per_s: float = SILENCE_FLOOR_RISE_DB_PER_S,
+        hangover_ms: int = SILENCE_HANGOVER_MS,
+        preroll_ms: int = SILENCE_PREROLL_MS,
+        keepalive_ms: int = SILENCE_KEEPALIVE_MS
+    ):
+        self.threshold_dbfs = threshold_dbfs
+        self.floor_margin_db = floor_margin_db
+        self.floor_rise_per_frame = floor_rise_db_per_s * TWILIO_FRAME_MS / 1000
+        self.hangover_frames = hangover_ms // TWILIO_FRAME_MS
+        self.keepalive_frames = keepalive_ms // TWILIO_FRAME_MS if keepalive_ms > 0 else 0
+
+        self._noise_floor = threshold_dbfs
+        self._hangover = 0
+        self._since_forwarded = 0
+        self._preroll: Deque[bytes] = deque(maxlen=max(0, preroll_ms // TWILIO_FRAME_MS))
+        self._partial = b""
+
+        self.frames = 0
+        self.forwarded_frames = 0
+        self.keepalives = 0
+        self.segments = 0
+
+    def process(self, audio: bytes) -> bytes:
+        """
+        Gate a chunk of μ-law audio.
+
+        Args:
+            audio: Raw μ-law bytes, any length; a trailing partial frame is
+                held until the next call
+
+        Returns:
+            The bytes to forward (possibly empty)
+        """
+        if self._partial:
+            audio = self._partial + audio
+        whole = len(audio) - len(audio) % FRAME_BYTES
+        self._partial = bytes(audio[whole:])
+
+        out = bytearray()
+        for i, level in enumerate(frame_energies_dbfs(audio).tolist()):
+            frame = audio[i * FRAME_BYTES:(i + 1) * FRAME_BYTES]
+            self.frames += 1
+
+            # The floor follows quiet frames down at once and loud ones up slowly
+            if level < self._noise_floor:
+                self._noise_floor = level
+            else:
+                self._noise_floor += self.floor_rise_per_frame
+
+            speech = level > self.threshold_dbfs and level > self._noise_floor + self.floor_margin_db
+            if speech:
+                if not self._hangover:
+                    self.segments += 1
+                    for held in self._preroll:
+                        out += held
+                        self.forwarded_frames += 1
+                    self._preroll.clear()
+                self._hangover = self.hangover_frames + 1
+
+            if self._hangover:
+                self._hangover -= 1
+                out += frame
+                self.forwarded_frames += 1
+                self._since_forwarded = 0
+                continue
+
+            self._since_forwarded += 1
+            if self.keepalive_frames and self._since_forwarded >= self.keepalive_frames:
+                out += frame
+                self.forwarded_frames += 1
+                self.keepalives += 1
+                self._since_forwarded = 0
+            else:
+                self._preroll.append(frame)
+
+        return bytes(out)
+
+    @property
+    def suppressed_percent(self) -> float:
+        return 100 * (1 - self.forwarded_frames / self.frames) if self.frames else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "audio_ms": self.frames * TWILIO_FRAME_MS,
+            "forwarded_ms": self.forwarded_frames * TWILIO_FRAME_MS,
+            "suppressed_percent": round(self.suppressed_percent, 1),
+            "speech_segments": self.segments,
+            "keepalives": self.keepalives,
+            "noise_floor_dbfs": round(self._noise_floor, 1)
+        }
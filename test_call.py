@@ -14,13 +14,27 @@ Or provide meeting info directly as second argument:
 import sys
 import json
 import os
+import asyncio
 from dotenv import load_dotenv
 from elevenlabs import call_elevenlabs
+from http_client import close_http_client
 from parse_meeting_info import parse_meeting_info
 
 # Load environment variables
 load_dotenv()
 
+async def place_call(phone_number: str, meeting_credentials: str, call_id: str):
+    """Make the ElevenLabs call and release the shared HTTP client afterwards."""
+    try:
+        return await call_elevenlabs(
+            phone_number=phone_number,
+            system_prompt=meeting_credentials,
+            call_id=call_id
+        )
+    finally:
+        await close_http_client()
+
+
 def test_call_with_parsing(meeting_blurb: str):
     """
     Parse meeting info and make a call.
@@ -64,11 +78,7 @@ def test_call_with_parsing(meeting_blurb: str):
 
     try:
         # Make the actual call
-        result = call_elevenlabs(
-            phone_number=phone_number,
-            system_prompt=meeting_credentials,
-            call_id="test_call_001"
-        )
+        result = asyncio.run(place_call(phone_number, meeting_credentials, "test_call_001"))
 
         print("\n📞 API Response:")
         print("-" * 60)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: cost of archiving call audio and of ranged reads.
+
+Records a synthetic call (20 ms Twilio frames, with a few gaps) into a
+scratch directory and reports:
+- append: time spent on the media loop per frame (what the call pays)
+- writer: frames per second the archiver thread decodes and maps to disk
+- read: latency of WAV exports of short ranges from the end of the call,
+  which only touch the mapped pages they copy
+
+Usage:
+    python testutils/bench_audio_archive.py
+    python testutils/bench_audio_archive.py --minutes 120
+"""
+
+import argparse
+import base64
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_archive import AudioArchiver, AudioArchiveReader  # noqa: E402
+from media_stream import MULAW_BYTES_PER_MS, TWILIO_FRAME_MS  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-call audio archive")
+    parser.add_argument("--minutes", type=float, default=60, help="Length of the synthetic call (default: 60)")
+    parser.add_argument("--reads", type=int, default=200, help="Ranged reads to time (default: 200)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    frame_bytes = TWILIO_FRAME_MS * MULAW_BYTES_PER_MS
+    payloads = [base64.b64encode(bytes(rng.randrange(256) for _ in range(frame_bytes))).decode("ascii") for _ in range(64)]
+    frames = int(args.minutes * 60 * 1000 / TWILIO_FRAME_MS)
+
+    directory = Path(tempfile.mkdtemp(prefix="audio_archive_bench_"))
+    try:
+        # Flushing is driven by hand below so append and write costs are measured separately
+        archiver = AudioArchiver(directory, flush_interval=3600)
+        recorder = archiver.open("CAbench")
+
+        timestamp = 0
+        start = time.perf_counter()
+        for i in range(frames):
+            if i and i % 30000 == 0:
+                timestamp += 500  # a dropped half second every ten minutes
+            recorder.append(payloads[i % 64], timestamp)
+            timestamp += TWILIO_FRAME_MS
+        append_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        recorder.close()
+        write_s = time.perf_counter() - start
+
+        print(f"Call: {args.minutes:.0f} min, {frames:,} frames, {recorder.length / 1e6:.1f} MB, {recorder.index_entries} index entries, {recorder.gaps} gaps")
+        print(f"append (media loop): {append_s / frames * 1e6:.2f} us/frame")
+        print(f"writer thread:       {frames / write_s:,.0f} frames/s ({write_s:.2f}s for the whole call)")
+
+        latencies = []
+        with AudioArchiveReader("CAbench", directory) as reader:
+            for _ in range(args.reads):
+                range_start = rng.randrange(0, max(1, reader.duration_ms - 10000))
+                start = time.perf_counter()
+                size = sum(len(chunk) for chunk in reader.iter_wav(range_start, range_start + 10000))
+                latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        print(f"10 s WAV export ({size:,} bytes): p50 {latencies[len(latencies) // 2]:.3f} ms, p99 {latencies[int(len(latencies) * 0.99)]:.3f} ms")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
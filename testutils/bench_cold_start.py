@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark API cold start: module import time and time to first request.
+
+For each mode (FAST_START=true and FAST_START=false) this runs, in fresh
+interpreters:
+- `import api`, timed inside the child process
+- `python main.py` on a free port, timed from process spawn until GET /
+  first returns 200
+
+Pass --max-import-ms / --max-first-request-ms to fail (exit 1) when the
+fast-start numbers regress past a budget, e.g. in CI.
+
+Uses MONGODB_URI and the integration env vars as configured; with no
+reachable MongoDB the non-fast-start mode waits out the server selection
+timeout while creating indexes, which is exactly the cost fast start avoids.
+
+Usage:
+    python testutils/bench_cold_start.py
+    python testutils/bench_cold_start.py --runs 5 --max-import-ms 800 --max-first-request-ms 3000
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import api; "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def child_env(fast_start: bool, port: int = 0):
+    env = dict(os.environ)
+    env["FAST_START"] = "true" if fast_start else "false"
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    if port:
+        env["PORT"] = str(port)
+    return env
+
+
+def measure_import(fast_start: bool) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=ROOT, env=child_env(fast_start), capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure_first_request(fast_start: bool, timeout: float) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py"],
+        cwd=ROOT, env=child_env(fast_start, port),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = start + timeout
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"main.py exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"No response from main.py within {timeout}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API import time and time to first request")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement (default: 3)")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for the first response (default: 60)")
+    parser.add_argument("--max-import-ms", type=float, default=None, help="Fail if fast-start import time exceeds this")
+    parser.add_argument("--max-first-request-ms", type=float, default=None, help="Fail if fast-start time to first request exceeds this")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'mode':>10} | {'import ms':>10} | {'first request ms':>16}")
+    print("-" * 42)
+    for fast_start in (True, False):
+        imports = [measure_import(fast_start) for _ in range(args.runs)]
+        first_requests = [measure_first_request(fast_start, args.timeout) for _ in range(args.runs)]
+        results[fast_start] = (statistics.median(imports), statistics.median(first_requests))
+        label = "fast" if fast_start else "eager"
+        print(f"{label:>10} | {results[fast_start][0]:>10.0f} | {results[fast_start][1]:>16.0f}")
+
+    import_ms, first_request_ms = results[True]
+    failures = []
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        failures.append(f"import took {import_ms:.0f}ms (budget {args.max_import_ms:.0f}ms)")
+    if args.max_first_request_ms is not None and first_request_ms > args.max_first_request_ms:
+        failures.append(f"first request took {first_request_ms:.0f}ms (budget {args.max_first_request_ms:.0f}ms)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark outbound HTTP calls: fresh connection per call vs the shared pool.
+
+Runs N sequential GETs against the local V7 stub server with:
+- `requests.get` (a new connection per call, the old behaviour)
+- a new httpx.AsyncClient per call
+- the shared pooled client from http_client.py
+
+The stub is plain HTTP on localhost, so the gap only reflects TCP setup and
+client construction; against V7/ElevenLabs over TLS it is much larger.
+
+Usage:
+    python testutils/bench_http_pooling.py
+    python testutils/bench_http_pooling.py --calls 500
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+import requests  # noqa: E402
+
+import http_client  # noqa: E402
+from v7_stub import V7StubServer  # noqa: E402
+
+
+def bench_requests(url: str, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        requests.get(url, headers={"X-API-KEY": "stub"}, timeout=5).raise_for_status()
+    return time.perf_counter() - start
+
+
+async def bench_fresh_httpx(url: str, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        async with httpx.AsyncClient(timeout=5) as client:
+            (await client.get(url, headers={"X-API-KEY": "stub"})).raise_for_status()
+    return time.perf_counter() - start
+
+
+async def bench_shared(url: str, calls: int) -> float:
+    await http_client.start_http_client()
+    try:
+        start = time.perf_counter()
+        for _ in range(calls):
+            (await http_client.request("GET", url, headers={"X-API-KEY": "stub"})).raise_for_status()
+        return time.perf_counter() - start
+    finally:
+        await http_client.close_http_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs per-call HTTP connections")
+    parser.add_argument("--calls", type=int, default=100, help="Sequential calls per client (default: 100)")
+    args = parser.parse_args()
+
+    with V7StubServer() as stub:
+        url = f"{stub.base_url}/workspaces/workspace/projects/project"
+
+        results = [
+            ("requests.get per call", bench_requests(url, args.calls)),
+            ("httpx client per call", asyncio.run(bench_fresh_httpx(url, args.calls))),
+            ("shared pooled client", asyncio.run(bench_shared(url, args.calls))),
+        ]
+
+    print(f"{args.calls} sequential GETs against {url}")
+    print(f"{'client':>24} | {'total ms':>9} | {'ms/call':>8}")
+    print("-" * 48)
+    for name, elapsed in results:
+        print(f"{name:>24} | {elapsed * 1000:>9.1f} | {elapsed / args.calls * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
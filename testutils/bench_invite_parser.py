@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: rule-based invite parsing vs Gemini on the fixture corpus.
+
+Runs every invite in testutils/invite_fixtures.json through
+- rules: invite_parser.parse_invite_rules
+- gemini: parse_meeting_info.parse_with_gemini (only when GOOGLE_API_KEY
+  is set; each invite costs one request)
+- batch: parse_meeting_info.parse_meeting_info_batch_async over the whole
+  corpus at once, Gemini only for what the rules can't answer (also only
+  with GOOGLE_API_KEY)
+and reports accuracy (phone number exact, every expected credential's
+digits present) and latency for each, plus how many invites the rules
+answer on their own at INVITE_RULES_MIN_CONFIDENCE and how accurate those
+answers are.
+
+Usage:
+    python testutils/bench_invite_parser.py
+    python testutils/bench_invite_parser.py --no-gemini --repeat 10000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from invite_parser import parse_invite_rules  # noqa: E402
+from parse_meeting_info import INVITE_RULES_MIN_CONFIDENCE, gemini_stats, parse_meeting_info_batch_async, parse_with_gemini  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "invite_fixtures.json")
+
+
+def correct(fixture, phone_number, meeting_credentials) -> bool:
+    digits = "".join(ch for ch in meeting_credentials or "" if ch.isdigit())
+    return phone_number == fixture["phone_number"] and all(cred in digits for cred in fixture["credentials"])
+
+
+def report(name, latencies_ms, right, total):
+    latencies_ms = sorted(latencies_ms)
+    p99 = latencies_ms[int(len(latencies_ms) * 0.99)]
+    print(f"{name:>7}: {right}/{total} correct, p50 {statistics.median(latencies_ms):.4f} ms, p99 {p99:.4f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rule-based invite parsing against Gemini")
+    parser.add_argument("--repeat", type=int, default=1000, help="Timed rule-based runs per invite (default: 1000)")
+    parser.add_argument("--no-gemini", action="store_true", help="Skip the Gemini path")
+    args = parser.parse_args()
+
+    with open(FIXTURES) as f:
+        fixtures = json.load(f)
+
+    latencies, right, confident, confident_right, mismatched = [], 0, 0, 0, []
+    for fixture in fixtures:
+        result = parse_invite_rules(fixture["blurb"])
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            parse_invite_rules(fixture["blurb"])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        ok = correct(fixture, result["phone_number"], result["meeting_credentials"])
+        right += ok
+        if result["confidence"] >= INVITE_RULES_MIN_CONFIDENCE:
+            confident += 1
+            confident_right += ok
+        if (result["confidence"] >= INVITE_RULES_MIN_CONFIDENCE) != fixture["rules_confident"]:
+            mismatched.append(fixture["name"])
+
+    print(f"Corpus: {len(fixtures)} invites, rules threshold {INVITE_RULES_MIN_CONFIDENCE}")
+    report("rules", latencies, right, len(fixtures))
+    print(f"         answered without Gemini: {confident}/{len(fixtures)} ({confident_right} correct)")
+    if mismatched:
+        print(f"         confidence differs from the fixture's expectation: {', '.join(mismatched)}")
+
+    if args.no_gemini or not os.getenv("GOOGLE_API_KEY"):
+        print(" gemini: skipped (set GOOGLE_API_KEY to compare)")
+        return
+
+    latencies, right = [], 0
+    for fixture in fixtures:
+        start = time.perf_counter()
+        result = parse_with_gemini(fixture["blurb"])
+        latencies.append((time.perf_counter() - start) * 1000)
+        right += result["success"] and correct(fixture, result["phone_number"], result["meeting_credentials"])
+    report("gemini", latencies, right, len(fixtures))
+
+    requests_before = gemini_stats()["requests"]
+    start = time.perf_counter()
+    results = asyncio.run(parse_meeting_info_batch_async([fixture["blurb"] for fixture in fixtures]))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    right = sum(result["success"] and correct(fixture, result["phone_number"], result["meeting_credentials"]) for fixture, result in zip(fixtures, results))
+    print(f"  batch: {right}/{len(fixtures)} correct, {elapsed_ms:.0f} ms for the corpus, {gemini_stats()['requests'] - requests_before} Gemini request(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: join_call -> dial latency with and without meeting preparation.
+
+For every invite in testutils/invite_fixtures.json, times the work a join
+does before it can send the ElevenLabs request:
+- unprepared: parse the invite (rules, or Gemini when they're unsure),
+  validate the number and build the payload
+- prepared: look the meeting up in MeetingPreparer (prepared beforehand
+  from a calendar sweep) and rebuild the payload for the join's call id
+
+Invites the rules can't answer need Gemini; they are only included when
+GOOGLE_API_KEY is set. No call is placed, so placeholder ElevenLabs
+settings are used if none are configured.
+
+Usage:
+    python testutils/bench_join_latency.py
+    python testutils/bench_join_latency.py --repeat 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import elevenlabs  # noqa: E402
+from elevenlabs import build_call_payload  # noqa: E402
+from invite_cache import InviteParseCache  # noqa: E402
+from meeting_prep import MeetingPreparer, validate_dial_in  # noqa: E402
+from parse_meeting_info import parse_meeting_info_async, parse_with_rules  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "invite_fixtures.json")
+
+
+async def unprepared_join(raw_invite: str, call_id: str):
+    parse_result = await parse_meeting_info_async(raw_invite)
+    if validate_dial_in(parse_result):
+        return None
+    return build_call_payload(parse_result["phone_number"], parse_result["meeting_credentials"], call_id)
+
+
+def summary(name: str, samples_ms):
+    samples_ms = sorted(samples_ms)
+    print(f"{name:>10}: p50 {statistics.median(samples_ms):9.3f} ms, max {samples_ms[-1]:9.3f} ms ({len(samples_ms)} joins)")
+
+
+async def run(fixtures, repeat: int):
+    preparer = MeetingPreparer(InviteParseCache())
+    records = await preparer.prepare_many([{"raw_invite": fixture["blurb"], "id": fixture["name"]} for fixture in fixtures])
+    fixtures = [fixture for fixture, record in zip(fixtures, records) if record["success"]]
+
+    before, after = [], []
+    for fixture in fixtures:
+        # Gemini-backed invites cost a request per join, so they're timed once
+        rounds = repeat if parse_with_rules(fixture["blurb"]) else 1
+        for i in range(rounds):
+            start = time.perf_counter()
+            await unprepared_join(fixture["blurb"], f"call-{i}")
+            before.append((time.perf_counter() - start) * 1000)
+
+        for i in range(repeat):
+            start = time.perf_counter()
+            payload = await preparer.payload_for_join(fixture["blurb"], f"call-{i}", fixture["name"])
+            after.append((time.perf_counter() - start) * 1000)
+            assert payload is not None
+
+    print(f"Invites: {len(fixtures)} dialable")
+    summary("unprepared", before)
+    summary("prepared", after)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark join latency with and without meeting preparation")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed joins per rule-parsed invite (default: 200)")
+    args = parser.parse_args()
+
+    for var in elevenlabs.missing_env_vars():
+        os.environ[var] = "bench-placeholder"
+
+    with open(FIXTURES) as f:
+        fixtures = json.load(f)
+    if not os.getenv("GOOGLE_API_KEY"):
+        fixtures = [fixture for fixture in fixtures if parse_with_rules(fixture["blurb"])]
+        print("GOOGLE_API_KEY not set: timing rule-parsed invites only (Gemini-backed joins take seconds)")
+
+    asyncio.run(run(fixtures, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
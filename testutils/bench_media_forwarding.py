@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark CPU per call for the Twilio -> Scribe media path in twillio_app.py.
+
+Feeds Twilio `media` events (recorded ones from a JSONL file, or generated
+20 ms μ-law frames) through:
+- legacy: base64-decode then re-encode every frame, one Scribe message each
+- passthrough: forward Twilio's payload as-is, one message per frame
+- aggregated: MediaAggregator batching frames into larger chunks
+
+Every event is parsed from JSON and every outgoing message serialized to
+JSON, as the websocket layers on both sides do. Reports CPU milliseconds
+per minute of call audio and the number of messages sent to Scribe.
+
+Usage:
+    python testutils/bench_media_forwarding.py
+    python testutils/bench_media_forwarding.py --minutes 5 --chunks 100,250
+    python testutils/bench_media_forwarding.py --events recorded_call.jsonl
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from media_stream import MULAW_BYTES_PER_MS, TWILIO_FRAME_MS, MediaAggregator  # noqa: E402
+
+SCRIBE_SAMPLE_RATE = 8000
+
+
+def generate_events(minutes: float):
+    """Twilio media events as they arrive on the websocket (JSON text)."""
+    rng = random.Random(0)
+    frame_bytes = TWILIO_FRAME_MS * MULAW_BYTES_PER_MS
+    frames = int(minutes * 60 * 1000 / TWILIO_FRAME_MS)
+    events = []
+    for i in range(frames):
+        payload = base64.b64encode(bytes(rng.randrange(256) for _ in range(frame_bytes))).decode("ascii")
+        events.append(json.dumps({
+            "event": "media",
+            "sequenceNumber": str(i + 3),
+            "media": {"track": "inbound", "chunk": str(i + 1), "timestamp": str(i * TWILIO_FRAME_MS), "payload": payload},
+            "streamSid": "MZ00000000000000000000000000000000"
+        }))
+    return events
+
+
+def load_events(path: str):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if '"media"' in line]
+
+
+def send(audio_base64: str) -> None:
+    # What the Scribe client does with each message
+    json.dumps({"audio_base_64": audio_base64, "sample_rate": SCRIBE_SAMPLE_RATE})
+
+
+def run_legacy(events):
+    messages = 0
+    for raw in events:
+        event = json.loads(raw)
+        mulaw_bytes = base64.b64decode(event["media"]["payload"])
+        send(base64.b64encode(mulaw_bytes).decode("ascii"))
+        messages += 1
+    return messages
+
+
+def run_aggregator(events, chunk_ms: int):
+    aggregator = MediaAggregator(chunk_ms)
+    for raw in events:
+        event = json.loads(raw)
+        audio_base64 = aggregator.add(event["media"]["payload"])
+        if audio_base64:
+            send(audio_base64)
+    remainder = aggregator.flush()
+    if remainder:
+        send(remainder)
+    return aggregator.chunks
+
+
+def measure(run, events, repeats: int):
+    best = None
+    messages = 0
+    for _ in range(repeats):
+        start = time.process_time()
+        messages = run(events)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CPU per call of the Twilio media path")
+    parser.add_argument("--minutes", type=float, default=2, help="Minutes of generated audio (default: 2)")
+    parser.add_argument("--events", type=str, default=None, help="JSONL file of recorded Twilio events")
+    parser.add_argument("--chunks", type=str, default="100,250", help="Aggregation sizes in ms (default: 100,250)")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per mode; the fastest is reported (default: 5)")
+    args = parser.parse_args()
+
+    events = load_events(args.events) if args.events else generate_events(args.minutes)
+    audio_minutes = len(events) * TWILIO_FRAME_MS / 60000
+    print(f"{len(events)} media events ({audio_minutes:.1f} min of audio)")
+
+    modes = [("legacy", run_legacy), ("passthrough", lambda e: run_aggregator(e, 0))]
+    for chunk_ms in [int(c) for c in args.chunks.split(",") if c]:
+        modes.append((f"aggregate {chunk_ms}ms", lambda e, c=chunk_ms: run_aggregator(e, c)))
+
+    print(f"{'mode':>16} | {'CPU ms / call-min':>17} | {'messages':>8}")
+    print("-" * 48)
+    for label, run in modes:
+        cpu, messages = measure(run, events, args.repeats)
+        print(f"{label:>16} | {cpu * 1000 / audio_minutes:>17.1f} | {messages:>8}")
+
+
+if __name__ == "__main__":
+    main()
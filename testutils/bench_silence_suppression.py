@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: silence suppression on synthetic call audio.
+
+Builds a μ-law "call" out of alternating stretches of
+- speech: noise bursts shaped like syllables, with short pauses
+- silence: line noise
+- hold music: sustained chords
+then runs it through SilenceSuppressor in Scribe-sized chunks and reports
+how much of each kind of audio was forwarded, and how many frames per
+second one core can gate.
+
+Usage:
+    python testutils/bench_silence_suppression.py
+    python testutils/bench_silence_suppression.py --minutes 30 --chunk-ms 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from media_stream import MULAW_BYTES_PER_MS, SCRIBE_CHUNK_MS, TWILIO_FRAME_MS  # noqa: E402
+from silence_suppression import FRAME_BYTES, MULAW_TO_LINEAR, SilenceSuppressor  # noqa: E402
+
+SAMPLE_RATE = 8000
+KINDS = ("speech", "silence", "music")
+
+
+def mulaw_encode(samples: np.ndarray) -> bytes:
+    """Nearest μ-law code for each linear sample (good enough for a benchmark)."""
+    order = np.argsort(MULAW_TO_LINEAR)
+    levels = MULAW_TO_LINEAR[order]
+    idx = np.clip(np.searchsorted(levels, samples), 1, len(levels) - 1)
+    nearer_low = (samples - levels[idx - 1]) < (levels[idx] - samples)
+    return order[idx - nearer_low].astype(np.uint8).tobytes()
+
+
+def level(dbfs: float) -> float:
+    return 32768 * 10 ** (dbfs / 20)
+
+
+def synthesize(kind: str, seconds: float, rng: np.random.Generator) -> np.ndarray:
+    n = int(seconds * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+    background = rng.normal(0, level(-65), n)
+    if kind == "silence":
+        return background
+    if kind == "music":
+        chord = sum(np.sin(2 * np.pi * f * t) for f in (262, 330, 392))
+        return background + chord / 3 * level(-22)
+    # Speech: ~4 syllables a second, with a pause between phrases
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 0.5
+    envelope *= (t % 3) < 2.4
+    return background + rng.normal(0, level(-22), n) * envelope
+
+
+def build_call(minutes: float, rng: np.random.Generator):
+    """μ-law audio plus the kind of every 20 ms frame."""
+    audio, labels = [], []
+    remaining = minutes * 60
+    while remaining > 0:
+        kind = rng.choice(KINDS, p=[0.4, 0.4, 0.2])
+        seconds = min(remaining, float(rng.uniform(5, 30)))
+        samples = synthesize(kind, seconds, rng)
+        frames = len(samples) // FRAME_BYTES
+        audio.append(mulaw_encode(samples[:frames * FRAME_BYTES]))
+        labels += [kind] * frames
+        remaining -= seconds
+    return b"".join(audio), labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark silence suppression")
+    parser.add_argument("--minutes", type=float, default=10, help="Length of the synthetic call (default: 10)")
+    parser.add_argument("--chunk-ms", type=int, default=max(SCRIBE_CHUNK_MS, TWILIO_FRAME_MS), help="Audio per process() call")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    audio, labels = build_call(args.minutes, rng)
+    chunk_bytes = args.chunk_ms * MULAW_BYTES_PER_MS
+    chunks = [audio[i:i + chunk_bytes] for i in range(0, len(audio), chunk_bytes)]
+
+    suppressor = SilenceSuppressor()
+    start = time.process_time()
+    forwarded = [suppressor.process(chunk) for chunk in chunks]
+    elapsed = time.process_time() - start
+
+    # The background noise makes every frame unique, so forwarded frames can
+    # be traced back to the kind of audio they came from
+    frame_kind = {audio[i * FRAME_BYTES:(i + 1) * FRAME_BYTES]: kind for i, kind in enumerate(labels)}
+    per_kind = {kind: [labels.count(kind), 0] for kind in KINDS}
+    for out in forwarded:
+        for i in range(0, len(out), FRAME_BYTES):
+            per_kind[frame_kind[out[i:i + FRAME_BYTES]]][1] += 1
+
+    stats = suppressor.stats()
+    print(f"Call: {args.minutes:.0f} min, {len(labels):,} frames, chunks of {args.chunk_ms} ms")
+    rate = suppressor.frames / elapsed
+    print(f"Throughput: {rate:,.0f} frames/s/core (~{rate / (1000 / TWILIO_FRAME_MS):,.0f} concurrent calls)")
+    print(f"Suppressed: {stats['suppressed_percent']}% of audio, {stats['speech_segments']} speech segments, {stats['keepalives']} keepalives")
+    for kind, (frames, kept) in per_kind.items():
+        if frames:
+            print(f"  {kind:>8}: {frames:>7,} frames, {100 * kept / frames:5.1f}% forwarded")
+
+
+if __name__ == "__main__":
+    main()
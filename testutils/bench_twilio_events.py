@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: Twilio media events parsed per second on one core.
+
+Compares getting from raw websocket text to the audio payload with:
+- stdlib: json.loads + event["media"]["payload"] (what receive_json did)
+- orjson: orjson.loads + the same lookups (skipped if orjson is missing)
+- media_payload: the /stream handler's path (scan the raw text for the
+  payload; other events fall back to parse_twilio_event)
+
+Each Twilio call produces 50 media events per second, so the last column
+is how many concurrent calls one core could parse for.
+
+Usage:
+    python testutils/bench_twilio_events.py
+    python testutils/bench_twilio_events.py --events 200000
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from media_stream import JSON_BACKEND, MULAW_BYTES_PER_MS, TWILIO_FRAME_MS, media_payload, parse_twilio_event  # noqa: E402
+
+FRAMES_PER_CALL_SECOND = 1000 // TWILIO_FRAME_MS
+
+
+def media_events(count: int):
+    """Media events in Twilio's compact wire format."""
+    rng = random.Random(0)
+    frame_bytes = TWILIO_FRAME_MS * MULAW_BYTES_PER_MS
+    payloads = [base64.b64encode(bytes(rng.randrange(256) for _ in range(frame_bytes))).decode("ascii") for _ in range(64)]
+    return [
+        json.dumps({
+            "event": "media",
+            "sequenceNumber": str(i + 3),
+            "media": {"track": "inbound", "chunk": str(i + 1), "timestamp": str(i * TWILIO_FRAME_MS), "payload": payloads[i % 64]},
+            "streamSid": "MZ18ad3ab5a668481ce02b83e7395059f0"
+        }, separators=(",", ":"))
+        for i in range(count)
+    ]
+
+
+def run_stdlib(events):
+    for raw in events:
+        event = json.loads(raw)
+        if event["event"] == "media":
+            event["media"]["payload"]
+
+
+def run_orjson(events):
+    import orjson
+    for raw in events:
+        event = orjson.loads(raw)
+        if event["event"] == "media":
+            event["media"]["payload"]
+
+
+def run_media_payload(events):
+    for raw in events:
+        payload = media_payload(raw)
+        if payload is None:
+            event = parse_twilio_event(raw)
+            if event["event"] == "media":
+                event["media"]["payload"]
+
+
+def measure(run, events, repeats: int) -> float:
+    best = None
+    for _ in range(repeats):
+        start = time.process_time()
+        run(events)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(events) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Twilio media event parsing")
+    parser.add_argument("--events", type=int, default=100000, help="Events per run (default: 100000)")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per parser; the fastest is reported (default: 5)")
+    args = parser.parse_args()
+
+    events = media_events(args.events)
+    parsers = [("stdlib json", run_stdlib)]
+    try:
+        import orjson  # noqa: F401
+        parsers.append(("orjson", run_orjson))
+    except ImportError:
+        print("orjson not installed; skipping")
+    parsers.append((f"media_payload ({JSON_BACKEND})", run_media_payload))
+
+    print(f"{'parser':>28} | {'events/s/core':>13} | {'calls/core':>10}")
+    print("-" * 58)
+    for label, run in parsers:
+        rate = measure(run, events, args.repeats)
+        print(f"{label:>28} | {rate:>13,.0f} | {rate / FRAMES_PER_CALL_SECOND:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
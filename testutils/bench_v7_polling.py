@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark V7 polling request volume as the number of pending questions grows.
+
+Creates N entities on the local V7 stub at once and waits for all answers
+with:
+- one fixed-interval poll loop per entity (the previous behaviour)
+- the shared V7PollScheduler from v7.py (adaptive backoff, bulk reads,
+  global request budget)
+
+Reports how many requests reached the stub and how long the last answer
+took to arrive.
+
+Usage:
+    python testutils/bench_v7_polling.py
+    python testutils/bench_v7_polling.py --questions 1,10,50 --answer-delay 6
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from v7_stub import V7StubServer  # noqa: E402
+
+
+async def fixed_interval_wait(project_id: str, entity_id: str, interval: float):
+    """The previous per-question loop: GET the entity every `interval` seconds."""
+    import http_client
+    import v7
+
+    url = f"{v7.V7_API_BASE}/workspaces/{os.getenv('V7_WORKSPACE_ID')}/projects/{project_id}/entities/{entity_id}"
+    while True:
+        response = await http_client.request("GET", url, headers={"X-API-KEY": "stub"})
+        finished, answer = v7._answer_state(response.json())
+        if finished:
+            return answer
+        await asyncio.sleep(interval)
+
+
+async def run_case(stub: V7StubServer, questions: int, use_scheduler: bool, interval: float):
+    import http_client
+    import v7
+
+    await http_client.start_http_client()
+    try:
+        entities = [await v7.create_question_entity("bench", f"question {i}") for i in range(questions)]
+        requests_before = stub.requests_served
+        start = time.perf_counter()
+
+        if use_scheduler:
+            waits = [v7.wait_for_answer(e["project_id"], e["id"]) for e in entities]
+        else:
+            waits = [fixed_interval_wait(e["project_id"], e["id"], interval) for e in entities]
+        answers = await asyncio.gather(*waits)
+
+        elapsed = time.perf_counter() - start
+        polls = stub.requests_served - requests_before
+        assert all(answers), "every question should be answered"
+        return polls, elapsed
+    finally:
+        await v7.stop_poll_scheduler()
+        await http_client.close_http_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark V7 polling request volume")
+    parser.add_argument("--questions", type=str, default="1,10,50,100", help="Comma-separated pending question counts")
+    parser.add_argument("--answer-delay", type=float, default=4.0, help="Seconds the stub takes to answer (default: 4)")
+    parser.add_argument("--interval", type=float, default=2.0, help="Fixed poll interval of the old loop (default: 2)")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    with V7StubServer(answer_delay=args.answer_delay) as stub:
+        os.environ["V7_API_BASE"] = stub.base_url
+        os.environ.setdefault("V7_WORKSPACE_ID", "workspace")
+        os.environ.setdefault("V7_PROJECT_ID", "project")
+        os.environ.setdefault("V7_API_KEY", "stub-key")
+
+        print(f"Answers take {args.answer_delay}s; old loop polls every {args.interval}s")
+        print(f"{'questions':>9} | {'fixed polls':>11} | {'fixed last s':>12} | {'sched polls':>11} | {'sched last s':>12}")
+        print("-" * 68)
+        for questions in [int(n) for n in args.questions.split(",") if n]:
+            fixed_polls, fixed_elapsed = asyncio.run(run_case(stub, questions, False, args.interval))
+            sched_polls, sched_elapsed = asyncio.run(run_case(stub, questions, True, args.interval))
+            print(f"{questions:>9} | {fixed_polls:>11} | {fixed_elapsed:>12.1f} | {sched_polls:>11} | {sched_elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
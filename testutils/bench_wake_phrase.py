@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: wake-phrase detection latency per transcript update.
+
+Replays a synthetic meeting as Scribe would deliver it (a partial per new
+word, then the committed segment) and times each update through
+- WakePhraseDetector: incremental automaton over the new tokens only
+- rescan: normalizing and searching the whole transcript so far, which is
+  what matching without state would cost
+
+The rescan cost grows with the length of the meeting; the detector's
+doesn't.
+
+Usage:
+    python testutils/bench_wake_phrase.py
+    python testutils/bench_wake_phrase.py --words 50000 --phrases 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wake_phrase import WakePhraseDetector, normalize  # noqa: E402
+
+VOCABULARY = (
+    "the a we should ship this next week can you check numbers for q3 revenue okay "
+    "so I think that makes sense let's move on to roadmap hiring budget design review "
+    "lara laura hey hello thanks everyone sounds good agenda item follow up"
+).split()
+
+
+def meeting_updates(words: int, rng: random.Random, wake_every: int):
+    """(kind, text) updates: partials word by word, then the committed segment."""
+    updates = []
+    spoken = 0
+    while spoken < words:
+        segment = []
+        for _ in range(rng.randint(6, 20)):
+            if rng.randrange(wake_every) == 0:
+                segment += ["hey", "Lara,"]
+            else:
+                segment.append(rng.choice(VOCABULARY))
+            updates.append(("partial", " ".join(segment)))
+        updates.append(("committed", " ".join(segment) + "."))
+        spoken += len(segment)
+    return updates
+
+
+class Rescan:
+    """Stateless baseline: search the whole transcript on every update."""
+
+    def __init__(self, phrases):
+        self.phrases = [" ".join(normalize(p)) for p in phrases]
+        self.committed_text = ""
+        self.seen = set()
+
+    def _scan(self, text):
+        tokens = " " + " ".join(normalize(text)) + " "
+        found = []
+        for phrase in self.phrases:
+            start = tokens.find(f" {phrase} ")
+            while start != -1:
+                if (phrase, start) not in self.seen:
+                    self.seen.add((phrase, start))
+                    found.append(phrase)
+                start = tokens.find(f" {phrase} ", start + 1)
+        return found
+
+    def partial(self, text):
+        return self._scan(self.committed_text + " " + text)
+
+    def committed(self, text):
+        self.committed_text += " " + text
+        return self._scan(self.committed_text)
+
+
+def replay(matcher, updates):
+    latencies = []
+    detections = 0
+    for kind, text in updates:
+        start = time.perf_counter()
+        detections += len(getattr(matcher, kind)(text))
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies, detections
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark wake-phrase detection")
+    parser.add_argument("--words", type=int, default=10000, help="Words in the meeting (default: 10000, ~1h)")
+    parser.add_argument("--phrases", type=int, default=5, help="Wake phrases per call (default: 5)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    updates = meeting_updates(args.words, rng, wake_every=400)
+    phrases = ["hey lara"] + [f"ok {rng.choice(VOCABULARY)} {rng.choice(VOCABULARY)}" for _ in range(args.phrases - 1)]
+
+    print(f"{len(updates):,} updates, {args.words:,} words, {args.phrases} phrases")
+    for label, matcher in (("detector", WakePhraseDetector(phrases)), ("rescan", Rescan(phrases))):
+        latencies, detections = replay(matcher, updates)
+        tail = sorted(latencies[-len(latencies) // 10:])
+        latencies.sort()
+        print(
+            f"{label:>9}: p50 {latencies[len(latencies) // 2]:8.1f} us, p99 {latencies[int(len(latencies) * 0.99)]:8.1f} us, "
+            f"last 10% of meeting p50 {tail[len(tail) // 2]:8.1f} us, {detections} detections"
+        )
+
+
+if __name__ == "__main__":
+    main()
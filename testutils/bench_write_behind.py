@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark task/insight insert throughput with and without write-behind.
+
+Fires N concurrent inserts (as a burst of /tasks calls would) into a scratch
+database with:
+- call_history.insert_once, one round trip per document (the default path)
+- WriteBehindBuffer in durable mode (callers wait for their batch)
+- WriteBehindBuffer in non-durable mode (callers return once buffered)
+
+Reports documents per second, caller-visible latency and how many batches
+the buffer wrote.
+
+Requires a reachable MongoDB (MONGODB_URI, default mongodb://localhost:27017).
+The scratch database is dropped afterwards.
+
+Usage:
+    python testutils/bench_write_behind.py
+    python testutils/bench_write_behind.py --documents 100,1000,5000 --flush-ms 5
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+import call_history  # noqa: E402
+from write_behind import WriteBehindBuffer  # noqa: E402
+
+SCRATCH_DB = "vikings_write_behind_bench"
+
+
+def task_document(i: int):
+    return {
+        "call_id": f"call_{i % 10}",
+        "task": f"Follow up on item {i}",
+        "created_at": datetime.now().isoformat()
+    }
+
+
+async def timed_insert(insert, i: int, latencies):
+    start = time.perf_counter()
+    await insert(task_document(i))
+    latencies.append(time.perf_counter() - start)
+
+
+async def run_case(db, documents: int, mode: str, flush_ms: float, max_batch: int):
+    await db.tasks.delete_many({})
+    buffer = None
+    if mode == "insert_once":
+        async def insert(document):
+            return await call_history.insert_once(db.tasks, document)
+    else:
+        buffer = WriteBehindBuffer(
+            enabled=True,
+            durable=(mode == "durable"),
+            flush_interval_ms=flush_ms,
+            max_batch=max_batch
+        )
+
+        async def insert(document):
+            return await buffer.insert(db.tasks, document)
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(timed_insert(insert, i, latencies) for i in range(documents)))
+    if buffer:
+        await buffer.close()
+    elapsed = time.perf_counter() - start
+
+    stored = await db.tasks.count_documents({})
+    assert stored == documents, f"{mode}: expected {documents} documents, found {stored}"
+    batches = buffer.batches if buffer else documents
+    p50 = statistics.median(latencies) * 1000
+    p99 = sorted(latencies)[int(len(latencies) * 0.99) - 1] * 1000 if len(latencies) > 1 else p50
+    return documents / elapsed, p50, p99, batches
+
+
+async def run_benchmark(counts, flush_ms: float, max_batch: int):
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    db = client[SCRATCH_DB]
+    try:
+        await client.drop_database(SCRATCH_DB)
+        await call_history.ensure_indexes(db)
+
+        print(f"flush every {flush_ms}ms or {max_batch} documents")
+        print(f"{'documents':>9} | {'mode':>11} | {'docs/s':>9} | {'p50 ms':>8} | {'p99 ms':>8} | {'writes':>6}")
+        print("-" * 66)
+        for documents in counts:
+            for mode in ("insert_once", "durable", "non_durable"):
+                rate, p50, p99, batches = await run_case(db, documents, mode, flush_ms, max_batch)
+                print(f"{documents:>9} | {mode:>11} | {rate:>9.0f} | {p50:>8.2f} | {p99:>8.2f} | {batches:>6}")
+    finally:
+        await client.drop_database(SCRATCH_DB)
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark write-behind insert batching")
+    parser.add_argument("--documents", type=str, default="100,1000,5000", help="Comma-separated burst sizes")
+    parser.add_argument("--flush-ms", type=float, default=5, help="Flush interval in milliseconds (default: 5)")
+    parser.add_argument("--max-batch", type=int, default=100, help="Documents per insert_many (default: 100)")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    counts = [int(n) for n in args.documents.split(",") if n]
+    asyncio.run(run_benchmark(counts, args.flush_ms, args.max_batch))
+
+
+if __name__ == "__main__":
+    main()
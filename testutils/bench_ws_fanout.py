@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark websocket broadcast cost as unrelated connections grow.
+
+Compares the old flat-list broadcast (every event goes to every socket)
+with the call_id subscription registry in websocket_hub.py. Each run has
+a fixed number of sockets subscribed to the target call and a growing
+number of sockets subscribed to other calls.
+
+A second table shows how long the producing handler waits when one
+subscriber of the call is stalled: the old path awaits every send in
+turn, while the registry only enqueues.
+
+Usage:
+    python testutils/bench_ws_fanout.py
+    python testutils/bench_ws_fanout.py --events 500 --interested 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from websocket_hub import SubscriptionRegistry  # noqa: E402
+
+
+class FakeWebSocket:
+    """Minimal stand-in for a Starlette WebSocket that counts sends."""
+
+    def __init__(self, delay: float = 0.0):
+        self.sent = 0
+        self.delay = delay
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent += 1
+
+    async def close(self):
+        pass
+
+
+async def wait_for_sends(sockets, expected: int):
+    """Wait until the writer tasks have delivered the expected messages."""
+    while sum(ws.sent for ws in sockets) < expected:
+        await asyncio.sleep(0)
+
+
+async def broadcast_flat(connections, message):
+    """The previous implementation: serialize once, send to every socket."""
+    message_json = json.dumps(message)
+    for websocket in connections[:]:
+        await websocket.send_text(message_json)
+
+
+async def run(events: int, interested: int, unrelated_counts):
+    target_call = "call_target"
+    message = {"type": "task_proposed", "taskId": "task_1", "ts": 0, "summary": "x", "payload": {}}
+
+    print(f"{'unrelated':>10} | {'flat us/event':>14} | {'registry us/event':>18} | {'flat sends':>11} | {'registry sends':>15}")
+    print("-" * 82)
+
+    for unrelated in unrelated_counts:
+        interested_sockets = [FakeWebSocket() for _ in range(interested)]
+        unrelated_sockets = [FakeWebSocket() for _ in range(unrelated)]
+
+        flat = interested_sockets + unrelated_sockets
+        registry = SubscriptionRegistry(max_queue=events)
+        subscriptions = [(target_call, ws) for ws in interested_sockets]
+        subscriptions += [(f"call_{i % max(1, unrelated // 2)}", ws) for i, ws in enumerate(unrelated_sockets)]
+        for call_id, ws in subscriptions:
+            registry.subscribe(call_id, ws)
+        # Let every writer task start and park before timing
+        await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        for _ in range(events):
+            await broadcast_flat(flat, message)
+        flat_elapsed = time.perf_counter() - start
+        flat_sends = sum(ws.sent for ws in flat)
+
+        for ws in flat:
+            ws.sent = 0
+
+        start = time.perf_counter()
+        for _ in range(events):
+            registry.broadcast(target_call, message)
+        await wait_for_sends(interested_sockets, events * interested)
+        registry_elapsed = time.perf_counter() - start
+        registry_sends = sum(ws.sent for ws in flat)
+
+        print(
+            f"{unrelated:>10} | {flat_elapsed / events * 1e6:>14.1f} | "
+            f"{registry_elapsed / events * 1e6:>18.1f} | {flat_sends:>11} | {registry_sends:>15}"
+        )
+
+        for call_id, ws in subscriptions:
+            registry.unsubscribe(call_id, ws)
+
+
+async def run_slow_consumer(events: int, stall: float):
+    target_call = "call_target"
+    message = {"type": "task_proposed", "taskId": "task_1", "ts": 0, "summary": "x", "payload": {}}
+
+    print()
+    print(f"Handler wait per event with one client stalled for {stall * 1000:.0f} ms per send")
+    print(f"{'path':>10} | {'handler ms/event':>17}")
+    print("-" * 32)
+
+    sockets = [FakeWebSocket(), FakeWebSocket(delay=stall), FakeWebSocket()]
+    start = time.perf_counter()
+    for _ in range(events):
+        await broadcast_flat(sockets, message)
+    print(f"{'flat':>10} | {(time.perf_counter() - start) / events * 1000:>17.3f}")
+
+    registry = SubscriptionRegistry(max_queue=events)
+    for ws in sockets:
+        registry.subscribe(target_call, ws)
+    start = time.perf_counter()
+    for _ in range(events):
+        registry.broadcast(target_call, message)
+        await asyncio.sleep(0)
+    print(f"{'registry':>10} | {(time.perf_counter() - start) / events * 1000:>17.3f}")
+    for ws in sockets:
+        registry.unsubscribe(target_call, ws)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark websocket broadcast fan-out")
+    parser.add_argument("--events", type=int, default=200, help="Events broadcast per run (default: 200)")
+    parser.add_argument("--interested", type=int, default=2, help="Sockets subscribed to the target call (default: 2)")
+    parser.add_argument(
+        "--unrelated",
+        type=str,
+        default="0,10,100,1000,5000",
+        help="Comma-separated unrelated connection counts (default: 0,10,100,1000,5000)"
+    )
+    parser.add_argument("--stall", type=float, default=0.05, help="Send delay of the stalled client in seconds (default: 0.05)")
+    args = parser.parse_args()
+
+    # Keep per-broadcast logging out of the timings
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    unrelated_counts = [int(n) for n in args.unrelated.split(",") if n]
+    asyncio.run(run(args.events, args.interested, unrelated_counts))
+    asyncio.run(run_slow_consumer(min(args.events, 20), args.stall))
+
+
+if __name__ == "__main__":
+    main()
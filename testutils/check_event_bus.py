@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Cross-worker delivery check for the event bus.
+
+Subscribes a websocket to a fresh call_id on one API instance, POSTs
+transcript events for that call to another instance, and checks every event
+arrives. Run two instances sharing a MongoDB replica set with
+EVENT_BUS=mongo, e.g.:
+
+    EVENT_BUS=mongo uvicorn api:app --port 8080 &
+    EVENT_BUS=mongo uvicorn api:app --port 8081 &
+    python testutils/check_event_bus.py --subscribe http://localhost:8080 --publish http://localhost:8081
+
+With EVENT_BUS=local the same run fails (nothing crosses instances), which
+is a quick way to confirm the check itself works.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from uuid import uuid4
+
+import httpx
+from websockets.client import connect
+
+
+async def run(subscribe_url: str, publish_url: str, events: int, timeout: float) -> bool:
+    call_id = f"bus_check_{uuid4().hex[:8]}"
+    ws_url = subscribe_url.replace("http", "ws", 1).rstrip("/") + "/ws"
+
+    async with connect(ws_url) as websocket:
+        await websocket.send(json.dumps({"call_id": call_id}))
+        status = json.loads(await asyncio.wait_for(websocket.recv(), timeout=10))
+        if status.get("status") != "connected":
+            print(f"Subscription failed: {status}")
+            return False
+
+        # Let the subscribing worker's change stream settle before publishing
+        await asyncio.sleep(0.5)
+
+        sent_at = {}
+        async with httpx.AsyncClient(base_url=publish_url) as client:
+            for i in range(events):
+                segment_id = f"{call_id}_{i}"
+                sent_at[segment_id] = time.perf_counter()
+                response = await client.post("/transcripts", json={"call_id": call_id, "id": segment_id, "text": f"event {i}"})
+                response.raise_for_status()
+
+        latencies = []
+        try:
+            async with asyncio.timeout(timeout):
+                while len(latencies) < events:
+                    message = json.loads(await websocket.recv())
+                    if message.get("type") == "transcript" and message.get("id") in sent_at:
+                        latencies.append((time.perf_counter() - sent_at.pop(message["id"])) * 1000)
+        except TimeoutError:
+            pass
+
+    print(f"Delivered {len(latencies)}/{events} events across instances")
+    if latencies:
+        latencies.sort()
+        print(f"Latency ms: p50 {latencies[len(latencies) // 2]:.1f}, max {latencies[-1]:.1f}")
+    return len(latencies) == events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check event delivery between two API instances")
+    parser.add_argument("--subscribe", default="http://localhost:8080", help="Instance the websocket connects to")
+    parser.add_argument("--publish", default="http://localhost:8081", help="Instance the events are POSTed to")
+    parser.add_argument("--events", type=int, default=20, help="Events to publish (default: 20)")
+    parser.add_argument("--timeout", type=float, default=10, help="Seconds to wait for delivery (default: 10)")
+    args = parser.parse_args()
+
+    ok = asyncio.run(run(args.subscribe, args.publish, args.events, args.timeout))
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
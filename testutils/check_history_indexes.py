@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Explain-plan check: call history reads must never scan a whole collection.
+
+Seeds a scratch database with tasks, questions and insights for many calls,
+creates the API's indexes, then explains every query the history API and
+the duplicate-question lookup issue. Fails if any winning plan contains a
+COLLSCAN (or an in-memory SORT for the history pages).
+
+Requires a reachable MongoDB (MONGODB_URI, default mongodb://localhost:27017).
+The scratch database is dropped afterwards.
+
+Usage:
+    python testutils/check_history_indexes.py
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+import call_history  # noqa: E402
+
+SCRATCH_DB = "vikings_history_explain_check"
+
+
+def plan_stages(plan):
+    """Yield every stage name in an explain plan tree."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from plan_stages(item)
+
+
+async def seed(db):
+    base = datetime(2025, 11, 15, 14, 0, 0)
+    for collection, (_, text_field) in call_history.HISTORY_COLLECTIONS.items():
+        documents = []
+        for call in range(20):
+            for i in range(50):
+                document = {
+                    "call_id": f"call_{call}",
+                    text_field: f"{text_field} {i}",
+                    "created_at": (base + timedelta(seconds=i)).isoformat()
+                }
+                if collection == "questions":
+                    document["question_normalized"] = f"question {i % 5}"
+                    document["answer"] = "answer" if i % 2 else None
+                documents.append(document)
+        await db[collection].insert_many(documents)
+
+
+async def explain(cursor):
+    plan = await cursor.explain()
+    return list(plan_stages(plan.get("queryPlanner", {}).get("winningPlan", {})))
+
+
+async def run_check() -> bool:
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    db = client[SCRATCH_DB]
+    ok = True
+    try:
+        await client.drop_database(SCRATCH_DB)
+        await seed(db)
+        await call_history.ensure_indexes(db)
+
+        first_page = await call_history.fetch_history(db, "call_3", limit=10)
+        cursor = first_page["next_cursor"]
+        assert cursor, "seed data should span several pages"
+
+        checks = []
+        for collection in call_history.HISTORY_COLLECTIONS:
+            for label, page_cursor in (("first page", None), ("cursor page", cursor)):
+                query = call_history.history_query("call_3", page_cursor)
+                find = db[collection].find(query).sort(call_history.HISTORY_SORT).limit(11)
+                checks.append((f"{collection} history {label}", find, True))
+
+        duplicate_lookup = db.questions.find(
+            {
+                "call_id": "call_3",
+                "question_normalized": "question 1",
+                "answer": {"$ne": None},
+                "created_at": {"$gte": "2025-11-15T00:00:00"}
+            }
+        ).sort([("created_at", -1)]).limit(1)
+        checks.append(("questions duplicate lookup", duplicate_lookup, False))
+
+        for label, find, forbid_sort in checks:
+            stages = await explain(find)
+            bad = "COLLSCAN" in stages or (forbid_sort and "SORT" in stages)
+            print(f"{'FAIL' if bad else 'ok':>4}  {label}: {' -> '.join(stages)}")
+            ok = ok and not bad
+    finally:
+        await client.drop_database(SCRATCH_DB)
+        client.close()
+    return ok
+
+
+def main():
+    ok = asyncio.run(run_check())
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Regression check: a pending V7 question must not block the API.
+
+Starts a local V7 stub that takes a few seconds to answer, runs the API
+in-process against it, posts a question and then verifies that:
+
+1. POST /questions returns immediately (without the answer)
+2. Other requests (GET /, POST /tasks) are served while the answer is pending
+3. The answer arrives later over /ws as an `answer_ready` event
+
+Requires a reachable MongoDB (MONGODB_URI, default mongodb://localhost:27017).
+
+Usage:
+    python testutils/check_questions_nonblocking.py
+    python testutils/check_questions_nonblocking.py --answer-delay 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from v7_stub import V7StubServer  # noqa: E402
+
+API_PORT = 8765
+FAST_RESPONSE_SECONDS = 0.5
+
+
+def start_api(port: int):
+    """Run the FastAPI app with uvicorn in a background thread."""
+    import uvicorn
+    from api import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def timed_request(method: str, url: str, **kwargs):
+    import requests
+
+    start = time.perf_counter()
+    response = await asyncio.to_thread(requests.request, method, url, timeout=10, **kwargs)
+    return response, time.perf_counter() - start
+
+
+async def run_check(answer_delay: float) -> bool:
+    from websockets.client import connect
+
+    base_url = f"http://127.0.0.1:{API_PORT}"
+    call_id = f"nonblocking_{int(time.time())}"
+    ok = True
+
+    async with connect(f"ws://127.0.0.1:{API_PORT}/ws") as websocket:
+        await websocket.send(json.dumps({"call_id": call_id}))
+        print(f"Connected: {await websocket.recv()}")
+
+        question_start = time.perf_counter()
+        response, elapsed = await timed_request(
+            "POST", f"{base_url}/questions", json={"call_id": call_id, "question": "Is the loop free?"}
+        )
+        body = response.json()
+        print(f"POST /questions -> {response.status_code} in {elapsed * 1000:.0f} ms (answer={body.get('answer')!r})")
+        if response.status_code != 200 or elapsed > FAST_RESPONSE_SECONDS or body.get("answer"):
+            print("FAIL: /questions did not return immediately")
+            ok = False
+
+        # Hammer other endpoints while the answer is still pending
+        slowest = 0.0
+        served = 0
+        while time.perf_counter() - question_start < answer_delay * 0.8:
+            response, elapsed = await timed_request("GET", f"{base_url}/")
+            slowest = max(slowest, elapsed)
+            served += response.status_code == 200
+            response, elapsed = await timed_request(
+                "POST", f"{base_url}/tasks", json={"call_id": call_id, "task": "Keep serving"}
+            )
+            slowest = max(slowest, elapsed)
+            served += response.status_code == 200
+        print(f"Served {served} requests while the question was pending (slowest {slowest * 1000:.0f} ms)")
+        if slowest > FAST_RESPONSE_SECONDS or served == 0:
+            print("FAIL: requests were blocked while the question was pending")
+            ok = False
+
+        # The answer should now arrive over the websocket
+        deadline = time.perf_counter() + answer_delay + 10
+        answer = None
+        while time.perf_counter() < deadline and answer is None:
+            try:
+                message = json.loads(await asyncio.wait_for(websocket.recv(), timeout=1))
+            except asyncio.TimeoutError:
+                continue
+            if message.get("type") == "answer_ready":
+                answer = message
+        if answer:
+            print(f"answer_ready after {time.perf_counter() - question_start:.1f}s: {answer.get('text')!r}")
+        else:
+            print("FAIL: no answer_ready event received")
+            ok = False
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that pending V7 questions do not block the API")
+    parser.add_argument("--answer-delay", type=float, default=3.0, help="Seconds the V7 stub takes to answer (default: 3)")
+    args = parser.parse_args()
+
+    with V7StubServer(answer_delay=args.answer_delay) as stub:
+        os.environ["V7_API_BASE"] = stub.base_url
+        os.environ.setdefault("V7_WORKSPACE_ID", "workspace")
+        os.environ.setdefault("V7_PROJECT_ID", "project")
+        os.environ.setdefault("V7_API_KEY", "stub-key")
+        os.environ["V7_POLL_MAX_INTERVAL"] = "1"
+
+        server = start_api(API_PORT)
+        try:
+            ok = asyncio.run(run_check(args.answer_delay))
+        finally:
+            server.should_exit = True
+
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
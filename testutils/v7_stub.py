@@ -0,0 +1,122 @@
+"""
+Local stand-in for the V7 Go entities API, for manual checks and benchmarks.
+
+Entities report `answer.status == "running"` until `answer_delay` seconds
+after they were created, then `complete` with a canned answer. Listing a
+project's entities returns the most recent ones (`limit`, default 100).
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from urllib.parse import parse_qs
+
+
+class V7StubServer:
+    """
+    Threaded HTTP server implementing the subset of V7 the backend uses.
+
+    Usage:
+        with V7StubServer(answer_delay=3) as stub:
+            os.environ["V7_API_BASE"] = stub.base_url
+    """
+
+    def __init__(self, answer_delay: float = 3.0, host: str = "127.0.0.1", port: int = 0):
+        self.answer_delay = answer_delay
+        self.entities = {}
+        self.requests_served = 0
+        self._ids = count(1)
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one segment so keep-alive clients
+            # don't stall on delayed ACKs
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests_served += 1
+                path, _, query = self.path.partition("?")
+                parts = path.strip("/").split("/")
+                # /workspaces/{w}/projects/{p}/entities?limit=N (most recent first)
+                if len(parts) == 5 and parts[4] == "entities":
+                    limit = int(parse_qs(query).get("limit", ["100"])[0])
+                    recent = sorted(stub.entities.values(), key=lambda e: e["created"], reverse=True)
+                    self._send_json(200, {"data": [stub._entity_body(e) for e in recent[:limit]]})
+                    return
+                # /workspaces/{w}/projects/{p}/entities/{id}
+                if len(parts) == 6 and parts[4] == "entities":
+                    entity = stub.entities.get(parts[5])
+                    if entity is None:
+                        self._send_json(404, {"error": "not found"})
+                        return
+                    self._send_json(200, stub._entity_body(entity))
+                    return
+                # /workspaces/{w}/projects/{p}
+                self._send_json(200, {"id": parts[-1] if parts else ""})
+
+            def do_POST(self):
+                with stub._lock:
+                    stub.requests_served += 1
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                parts = self.path.strip("/").split("/")
+                entity_id = f"entity_{next(stub._ids)}"
+                entity = {
+                    "id": entity_id,
+                    "project_id": parts[3] if len(parts) > 3 else "project",
+                    "fields": payload.get("fields", {}),
+                    "created": time.time()
+                }
+                stub.entities[entity_id] = entity
+                self._send_json(200, {"id": entity_id, "project_id": entity["project_id"]})
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    def _entity_body(self, entity):
+        fields = dict(entity["fields"])
+        if time.time() - entity["created"] >= self.answer_delay:
+            question = fields.get("question_text", "")
+            fields["answer"] = {"status": "complete", "tool_value": {"value": f"Stub answer to: {question}"}}
+        else:
+            fields["answer"] = {"status": "running"}
+        return {"id": entity["id"], "project_id": entity["project_id"], "fields": fields}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
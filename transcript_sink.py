@@ -0,0 +1,271 @@
+"""
+Buffered per-call transcript storage for the Twilio/Scribe bridge.
+
+Committed transcript segments are appended to an in-memory buffer on the
+event loop (cheap) and written out by a single worker thread shared by all
+calls, once a call has buffered TRANSCRIPT_FLUSH_BYTES or its oldest
+segment is TRANSCRIPT_FLUSH_INTERVAL seconds old, and when the call ends.
+
+Where transcripts go is pluggable (TRANSCRIPT_SINK):
+- file: one text file per call in TRANSCRIPTION_DIR (previous behaviour)
+- mongo: one document per call in the `transcripts` collection
+- both
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_SINK = os.getenv("TRANSCRIPT_SINK", "file")
+TRANSCRIPTION_DIR = Path(os.getenv("TRANSCRIPTION_DIR", "transcriptions"))
+TRANSCRIPT_FLUSH_BYTES = int(os.getenv("TRANSCRIPT_FLUSH_BYTES", 4096))
+TRANSCRIPT_FLUSH_INTERVAL = float(os.getenv("TRANSCRIPT_FLUSH_INTERVAL", 2))  # seconds
+
+SINK_KINDS = ("file", "mongo", "both")
+
+
+class FileTranscriptBackend:
+    """Writes each call's transcript to TRANSCRIPTION_DIR/<call_sid>.txt."""
+
+    def __init__(self, directory: Path = TRANSCRIPTION_DIR):
+        self.directory = directory
+
+    def _path(self, call_sid: str) -> Path:
+        return self.directory / f"{call_sid}.txt"
+
+    def open(self, call_sid: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._path(call_sid).write_text("", encoding="utf-8")
+
+    def write(self, call_sid: str, segments: List[Dict[str, Any]]) -> None:
+        with self._path(call_sid).open("a", encoding="utf-8") as f:
+            f.write("".join(segment["text"] + " " for segment in segments))
+
+
+class MongoTranscriptBackend:
+    """
+    Appends segments to one document per call in the `transcripts` collection.
+
+    Runs on the flusher thread, so it uses a synchronous pymongo client.
+    One instance is shared by every call (see TranscriptFlusher.backend),
+    so the client, its pool and the index check are set up once.
+    """
+
+    def __init__(self, mongodb_uri: Optional[str] = None):
+        self.mongodb_uri = mongodb_uri or os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+        self._client = None
+        self._collection = None
+        self._lock = threading.Lock()
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            with self._lock:
+                if self._collection is None:
+                    from pymongo import MongoClient
+                    self._client = MongoClient(self.mongodb_uri)
+                    collection = self._client.vikings.transcripts
+                    collection.create_index("call_sid", unique=True, name="call_sid_unique")
+                    self._collection = collection
+        return self._collection
+
+    def open(self, call_sid: str) -> None:
+        self.collection.update_one(
+            {"call_sid": call_sid},
+            {"$setOnInsert": {"call_sid": call_sid, "segments": [], "created_at": datetime.now().isoformat()}},
+            upsert=True
+        )
+
+    def write(self, call_sid: str, segments: List[Dict[str, Any]]) -> None:
+        self.collection.update_one(
+            {"call_sid": call_sid},
+            {
+                "$push": {"segments": {"$each": segments}},
+                "$set": {"updated_at": datetime.now().isoformat()}
+            },
+            upsert=True
+        )
+
+
+class CompositeTranscriptBackend:
+    """Writes to several backends; a failure in one doesn't stop the others."""
+
+    def __init__(self, backends: List[Any]):
+        self.backends = backends
+
+    def _each(self, method: str, *args) -> None:
+        for backend in self.backends:
+            try:
+                getattr(backend, method)(*args)
+            except Exception as e:
+                logger.error(f"{type(backend).__name__}.{method} failed: {str(e)}")
+
+    def open(self, call_sid: str) -> None:
+        self._each("open", call_sid)
+
+    def write(self, call_sid: str, segments: List[Dict[str, Any]]) -> None:
+        self._each("write", call_sid, segments)
+
+
+def create_backend(kind: str = TRANSCRIPT_SINK):
+    """
+    Build the transcript backend for a TRANSCRIPT_SINK value.
+
+    Raises:
+        ValueError: If kind is not file, mongo or both
+    """
+    if kind == "file":
+        return FileTranscriptBackend()
+    if kind == "mongo":
+        return MongoTranscriptBackend()
+    if kind == "both":
+        return CompositeTranscriptBackend([FileTranscriptBackend(), MongoTranscriptBackend()])
+    raise ValueError(f"Unknown TRANSCRIPT_SINK {kind!r}; expected one of {', '.join(SINK_KINDS)}")
+
+
+class TranscriptWriter:
+    """
+    In-memory transcript buffer for one call. `write` is safe to call from
+    the event loop; all I/O happens on the flusher thread (or in `close`).
+    """
+
+    def __init__(self, call_sid: str, backend, flusher: "TranscriptFlusher"):
+        self.call_sid = call_sid
+        self.backend = backend
+        self._flusher = flusher
+        self._lock = threading.Lock()
+        # Keeps a flush from the flusher thread and the final one in close() in order
+        self._io_lock = threading.Lock()
+        self._segments: List[Dict[str, Any]] = []
+        self._buffered_bytes = 0
+        self._oldest: Optional[float] = None
+        self._opened = False
+
+        self.segments_written = 0
+        self.flushes = 0
+
+    def write(self, text: str) -> None:
+        """Buffer a committed transcript segment."""
+        with self._lock:
+            self._segments.append({"text": text, "ts": int(time.time() * 1000)})
+            self._buffered_bytes += len(text)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = self._buffered_bytes >= self._flusher.flush_bytes
+        if full:
+            self._flusher.wake()
+
+    def due(self, now: float) -> bool:
+        with self._lock:
+            if not self._segments:
+                return False
+            return (self._buffered_bytes >= self._flusher.flush_bytes
+                    or now - self._oldest >= self._flusher.flush_interval)
+
+    def flush(self) -> None:
+        """Write buffered segments to the backend (blocking)."""
+        with self._io_lock:
+            with self._lock:
+                segments, self._segments = self._segments, []
+                self._buffered_bytes = 0
+                self._oldest = None
+
+            try:
+                if not self._opened:
+                    self.backend.open(self.call_sid)
+                    self._opened = True
+                if segments:
+                    self.backend.write(self.call_sid, segments)
+                    self.segments_written += len(segments)
+                    self.flushes += 1
+            except Exception as e:
+                logger.error(f"Failed to write {len(segments)} transcript segment(s) for {self.call_sid}: {str(e)}")
+
+    def close(self) -> None:
+        """Flush what's left and stop tracking the call (blocking; run it off the event loop)."""
+        self._flusher.unregister(self)
+        self.flush()
+        logger.info(f"Transcript for {self.call_sid} closed ({self.segments_written} segments in {self.flushes} writes)")
+
+
+class TranscriptFlusher:
+    """
+    One daemon thread that flushes every open TranscriptWriter when it's due.
+    """
+
+    def __init__(self, flush_bytes: int = TRANSCRIPT_FLUSH_BYTES, flush_interval: float = TRANSCRIPT_FLUSH_INTERVAL):
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self._writers: Dict[int, TranscriptWriter] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._backend = None
+
+    def backend(self):
+        """The TRANSCRIPT_SINK backend, created on first use and shared by every call."""
+        with self._lock:
+            if self._backend is None:
+                self._backend = create_backend()
+            return self._backend
+
+    def open(self, call_sid: str, backend=None) -> TranscriptWriter:
+        """
+        Start buffering a call's transcript.
+
+        Args:
+            call_sid: Twilio call SID the transcript belongs to
+            backend: Where to write it; defaults to the shared backend()
+
+        Returns:
+            The call's TranscriptWriter
+        """
+        writer = TranscriptWriter(call_sid, backend or self.backend(), self)
+        with self._lock:
+            self._writers[id(writer)] = writer
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="transcript-flusher", daemon=True)
+                self._thread.start()
+        return writer
+
+    def unregister(self, writer: TranscriptWriter) -> None:
+        with self._lock:
+            self._writers.pop(id(writer), None)
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            now = time.monotonic()
+            with self._lock:
+                writers = list(self._writers.values())
+            for writer in writers:
+                if writer.due(now):
+                    writer.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            writers = list(self._writers.values())
+        return {
+            "open_transcripts": len(writers),
+            "buffered_segments": sum(len(writer._segments) for writer in writers)
+        }
+
+
+_flusher: Optional[TranscriptFlusher] = None
+
+
+def get_flusher() -> TranscriptFlusher:
+    """Return the process-wide transcript flusher."""
+    global _flusher
+    if _flusher is None:
+        _flusher = TranscriptFlusher()
+    return _flusher
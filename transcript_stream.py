@@ -0,0 +1,184 @@
+"""
+Live transcript publishing from the Twilio media stream to the API.
+
+Scribe emits a partial transcript for nearly every audio chunk. Sending
+each one to the call's /ws subscribers would flood the Electron client, so
+partials are coalesced per speaker: only the latest partial goes out, at
+most once every TRANSCRIPT_PARTIAL_INTERVAL_MS. A committed segment is sent
+immediately under the same segment id, replacing the pending partial.
+A partial in which a wake phrase was just detected skips the throttle.
+
+Events are POSTed in order to the API's /transcripts endpoint
+(TRANSCRIPT_PUBLISH_URL), which broadcasts them as `transcript` events.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Set
+
+import http_client
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_PUBLISH_URL = os.getenv("TRANSCRIPT_PUBLISH_URL")  # e.g. http://localhost:8080/transcripts
+TRANSCRIPT_PARTIAL_INTERVAL_MS = float(os.getenv("TRANSCRIPT_PARTIAL_INTERVAL_MS", 250))
+TRANSCRIPT_SPEAKER = os.getenv("TRANSCRIPT_SPEAKER", "Meeting")
+TRANSCRIPT_PUBLISH_QUEUE_SIZE = 100
+
+
+class TranscriptPublisher:
+    """
+    Throttles, coalesces and publishes one call's live transcript.
+
+    `partial` and `committed` are plain callbacks for the Scribe connection
+    and must be called on the event loop.
+    """
+
+    def __init__(
+        self,
+        call_id: str,
+        publish_url: Optional[str] = TRANSCRIPT_PUBLISH_URL,
+        partial_interval_ms: float = TRANSCRIPT_PARTIAL_INTERVAL_MS
+    ):
+        self.call_id = call_id
+        self.publish_url = publish_url
+        self.partial_interval = partial_interval_ms / 1000
+
+        # speaker -> latest unsent partial text
+        self._pending_partials: Dict[str, str] = {}
+        # speaker -> segment number (partials and their committed text share an id)
+        self._segments: Dict[str, int] = {}
+        self._last_partial_sent: Dict[str, float] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        # speakers whose current segment contains a wake phrase
+        self._wake_segments: Set[str] = set()
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=TRANSCRIPT_PUBLISH_QUEUE_SIZE)
+        self._sender: Optional[asyncio.Task] = None
+
+        self.partials_received = 0
+        self.partials_sent = 0
+        self.committed_sent = 0
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.publish_url)
+
+    def _segment_id(self, speaker: str) -> str:
+        return f"{self.call_id}_{speaker}_{self._segments.get(speaker, 0)}"
+
+    def partial(self, text: str, speaker: str = TRANSCRIPT_SPEAKER, wake_phrase: Optional[str] = None) -> None:
+        """
+        Record a partial transcript; it's sent once the throttle window allows.
+
+        Args:
+            text: Partial text of the speaker's current segment
+            speaker: Speaker label
+            wake_phrase: Wake phrase first detected in this partial; the
+                partial is then sent at once and flagged
+        """
+        if not self.enabled:
+            return
+        self.partials_received += 1
+        self._pending_partials[speaker] = text
+        if wake_phrase:
+            self._wake_segments.add(speaker)
+            timer = self._timers.pop(speaker, None)
+            if timer:
+                timer.cancel()
+            self._send_partial(speaker, wake_phrase)
+            return
+        if speaker in self._timers:
+            return
+
+        wait = self._last_partial_sent.get(speaker, 0) + self.partial_interval - time.monotonic()
+        if wait <= 0:
+            self._send_partial(speaker)
+        else:
+            self._timers[speaker] = asyncio.get_running_loop().call_later(wait, self._send_partial, speaker)
+
+    def _send_partial(self, speaker: str, wake_phrase: Optional[str] = None) -> None:
+        self._timers.pop(speaker, None)
+        text = self._pending_partials.pop(speaker, None)
+        if text is None:
+            return
+        self._last_partial_sent[speaker] = time.monotonic()
+        self.partials_sent += 1
+        self._publish(self._event(speaker, text, partial=True, wake_phrase=wake_phrase))
+
+    def committed(self, text: str, speaker: str = TRANSCRIPT_SPEAKER, wake_phrase: Optional[str] = None) -> None:
+        """Send a committed segment now, replacing any pending partial."""
+        if not self.enabled:
+            return
+        timer = self._timers.pop(speaker, None)
+        if timer:
+            timer.cancel()
+        self._pending_partials.pop(speaker, None)
+        if wake_phrase:
+            self._wake_segments.add(speaker)
+
+        self.committed_sent += 1
+        self._publish(self._event(speaker, text, partial=False, wake_phrase=wake_phrase))
+        self._segments[speaker] = self._segments.get(speaker, 0) + 1
+        self._wake_segments.discard(speaker)
+
+    def _event(self, speaker: str, text: str, partial: bool, wake_phrase: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "call_id": self.call_id,
+            "id": self._segment_id(speaker),
+            "ts": int(time.time() * 1000),
+            "text": text,
+            "partial": partial,
+            "speaker": speaker,
+            # The segment contains a wake phrase; wake_phrase is only set on
+            # the event where it was first detected
+            "wake": speaker in self._wake_segments,
+            "wake_phrase": wake_phrase
+        }
+
+    def _publish(self, event: Dict[str, Any]) -> None:
+        if self._queue.full():
+            # Drop the oldest queued event rather than stall the media loop
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+        if self._sender is None or self._sender.done():
+            self._sender = asyncio.create_task(self._send_loop())
+
+    async def _send_loop(self) -> None:
+        # One sender per call keeps events in order (a partial never lands after its commit)
+        while True:
+            event = await self._queue.get()
+            try:
+                response = await http_client.request("POST", self.publish_url, json=event, timeout=5)
+                if response.status_code >= 400:
+                    logger.warning(f"Transcript publish for {self.call_id} failed: HTTP {response.status_code}")
+            except Exception as e:
+                logger.warning(f"Transcript publish for {self.call_id} failed: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def close(self, timeout: float = 5) -> None:
+        """Send the last pending partials and whatever is queued, then stop."""
+        for speaker in list(self._timers):
+            self._timers.pop(speaker).cancel()
+        for speaker in list(self._pending_partials):
+            self._send_partial(speaker)
+
+        if self._sender:
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._queue.join()
+            except TimeoutError:
+                logger.warning(f"Gave up publishing {self._queue.qsize()} transcript event(s) for {self.call_id}")
+            self._sender.cancel()
+            self._sender = None
+
+        if self.enabled:
+            logger.info(
+                f"Transcript stream for {self.call_id} closed: {self.partials_sent}/{self.partials_received} partials "
+                f"and {self.committed_sent} committed segments published, {self.dropped} dropped"
+            )
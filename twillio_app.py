@@ -3,42 +3,137 @@ pip install elevenlabs asyncio base64 uuid4 logging fastapi websockets twilio
 """
 
 import asyncio
-import base64
+import hmac
 import logging
 import os
-from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 from uuid import uuid4
 
-from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Header, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, StreamingResponse
 from twilio.twiml.voice_response import Connect, Stream, VoiceResponse
 from elevenlabs.speech_to_text.realtime import Scribe, AudioFormat
 
+import http_client
+from audio_archive import AUDIO_ARCHIVE_ENABLED, AudioArchiveReader, get_archiver
+from media_stream import MediaAggregator, ScribeAudioSender, media_payload, media_timestamp, parse_twilio_event
+from scribe_pool import ScribeConnectionPool
+from silence_suppression import SILENCE_SUPPRESSION, SilenceSuppressor
+from transcript_sink import TranscriptWriter, get_flusher
+from transcript_stream import TranscriptPublisher
+from wake_phrase import WakePhraseDetector, parse_phrases
+
 
 logger = logging.getLogger('uvicorn.error')
 
 api = FastAPI()
 
-TRANSCRIPTION_DIR = Path(os.getenv("TRANSCRIPTION_DIR", "transcriptions"))
 TRANSCRIPTION_MODEL_ID = os.getenv("ELEVENLABS_SCRIBE_MODEL_ID", "scribe_v2_realtime")
 TRANSCRIPTION_LANGUAGE_CODE = os.getenv("ELEVENLABS_LANGUAGE_CODE", "en")
 SCRIBE_SAMPLE_RATE = 8000
+SCRIBE_DRAIN_TIMEOUT = float(os.getenv("SCRIBE_DRAIN_TIMEOUT", 5))  # seconds to flush queued audio at stop
+# Token required to download archived meeting audio; /recordings is disabled without it
+RECORDINGS_TOKEN = os.getenv("RECORDINGS_TOKEN")
+
+# Audio senders of the calls currently streaming, by call SID
+active_streams: Dict[str, ScribeAudioSender] = {}
+# Silence suppressors of those calls (SILENCE_SUPPRESSION), by call SID
+active_suppressors: Dict[str, SilenceSuppressor] = {}
+
+
+async def connect_scribe() -> Scribe:
+    """Open a new Scribe realtime session (TLS + websocket handshake + auth)."""
+    return await Scribe.connect(
+        os.getenv("ELEVENLABS_API_KEY"),
+        model_id=TRANSCRIPTION_MODEL_ID,
+        audio_format=AudioFormat.ULAW_8000,
+        language_code=TRANSCRIPTION_LANGUAGE_CODE,
+    )
+
+
+# Pre-connected sessions so a new call doesn't wait on the Scribe handshake
+scribe_pool = ScribeConnectionPool(connect_scribe)
+
+
+@api.on_event("startup")
+async def start_scribe_pool():
+    """Start pre-connecting Scribe sessions"""
+    if os.getenv("ELEVENLABS_API_KEY"):
+        scribe_pool.start()
+
+
+@api.on_event("shutdown")
+async def shutdown_http_client():
+    """Close idle Scribe sessions and the pooled HTTP client used to publish live transcripts"""
+    await scribe_pool.stop()
+    await http_client.close_http_client()
+
+
+@api.get("/streams/stats")
+async def stream_stats():
+    """Per-call Scribe audio queue depth, lag and drop counters, plus the connection pool"""
+    return {
+        "streams": len(active_streams),
+        "per_call": [
+            {**sender.stats(), "silence": active_suppressors[call_sid].stats() if call_sid in active_suppressors else None}
+            for call_sid, sender in active_streams.items()
+        ],
+        "scribe_pool": scribe_pool.stats(),
+        "audio_archive": get_archiver().stats() if AUDIO_ARCHIVE_ENABLED else None
+    }
+
+
+@api.get("/recordings/{call_sid}")
+def get_recording(
+    call_sid: str,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
+    x_recordings_token: Optional[str] = Header(None)
+):
+    """
+    Export a call's archived audio (or the part between two stream
+    timestamps, in ms) as an 8 kHz μ-law WAV. Works while the call is
+    still being recorded.
 
+    Meeting audio is sensitive, so the request must carry the
+    RECORDINGS_TOKEN in an X-Recordings-Token header.
+    """
+    if not RECORDINGS_TOKEN or not x_recordings_token or not hmac.compare_digest(x_recordings_token, RECORDINGS_TOKEN):
+        logger.warning(f"Rejected recording download for {call_sid}: invalid token")
+        raise HTTPException(status_code=403, detail="A valid X-Recordings-Token is required")
 
-def _prepare_transcription_file(call_sid: str) -> Path:
-    TRANSCRIPTION_DIR.mkdir(parents=True, exist_ok=True)
-    file_path = TRANSCRIPTION_DIR / f"{call_sid}.txt"
+    recorder = get_archiver().recording(call_sid)
     try:
-        file_path.write_text("", encoding="utf-8")
-    except Exception as exc:
-        logger.warning(f"Unable to initialize transcription file {file_path}: {exc}")
-    return file_path
-
-
-async def create_scribe_connection(call_sid: str) -> Optional[Scribe]:
+        reader = AudioArchiveReader(call_sid, length=recorder.length if recorder else None)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid call SID")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"No recording for {call_sid}")
+
+    def wav_chunks():
+        with reader:
+            yield from reader.iter_wav(start_ms, end_ms)
+
+    return StreamingResponse(
+        wav_chunks(),
+        media_type="audio/wav",
+        headers={"Content-Disposition": f'attachment; filename="{call_sid}.wav"'}
+    )
+
+
+async def create_scribe_connection(
+    call_sid: str,
+    transcript: TranscriptWriter,
+    publisher: TranscriptPublisher,
+    wake_detector: WakePhraseDetector
+) -> Optional[Scribe]:
     """
     Initialize a Scribe realtime connection for a given call.
+
+    Committed segments are buffered in `transcript` and written out by the
+    transcript flusher thread, never on the event loop. Partial and
+    committed segments are also streamed live through `publisher`, and
+    checked for wake phrases as they arrive.
     """
     api_key = os.getenv("ELEVENLABS_API_KEY")
 
@@ -46,23 +141,19 @@ async def create_scribe_connection(call_sid: str) -> Optional[Scribe]:
         logger.error("ELEVENLABS_API_KEY not set; skipping transcription.")
         return None
 
-    transcription_file = _prepare_transcription_file(call_sid)
-
-    try:
-        connection = await Scribe.connect(
-            api_key,
-            model_id=TRANSCRIPTION_MODEL_ID,
-            audio_format=AudioFormat.ULAW_8000,
-            language_code=TRANSCRIPTION_LANGUAGE_CODE,
-        )
-    except Exception as exc:
-        logger.exception(f"Failed to connect to ElevenLabs Scribe: {exc}")
-        return None
+    connection = scribe_pool.acquire()
+    if connection is None:
+        try:
+            connection = await connect_scribe()
+        except Exception as exc:
+            logger.exception(f"Failed to connect to ElevenLabs Scribe: {exc}")
+            return None
 
     def on_partial_transcript(data):
         text = data.get("text")
         if text:
             logger.debug(f"Partial transcript ({call_sid}): {text}")
+            publisher.partial(text, wake_phrase=first_wake_phrase(wake_detector.partial(text)))
 
     def on_committed_transcript(data):
         text = data.get("text")
@@ -70,11 +161,15 @@ async def create_scribe_connection(call_sid: str) -> Optional[Scribe]:
             return
 
         logger.info(f"Committed transcript ({call_sid}): {text}")
-        try:
-            with transcription_file.open("a", encoding="utf-8") as f:
-                f.write(text + " ")
-        except Exception as file_exc:
-            logger.error(f"Error writing transcription file {transcription_file}: {file_exc}")
+        transcript.write(text)
+        publisher.committed(text, wake_phrase=first_wake_phrase(wake_detector.committed(text)))
+
+    def first_wake_phrase(phrases):
+        # Overlapping phrases ("hey lara" / "lara") can match the same words; report the first, longest one
+        if not phrases:
+            return None
+        logger.info(f"Wake phrase detected ({call_sid}): {phrases[0]}")
+        return phrases[0]
 
     def on_error(error):
         logger.error(f"Scribe connection error ({call_sid}): {error}")
@@ -89,6 +184,19 @@ async def create_scribe_connection(call_sid: str) -> Optional[Scribe]:
 
     return connection
 
+
+async def send_audio(scribe_connection: Scribe, audio_base64: str) -> None:
+    """Send a chunk of base64 μ-law audio to Scribe."""
+    try:
+        await scribe_connection.send(
+            {
+                "audio_base_64": audio_base64,
+                "sample_rate": SCRIBE_SAMPLE_RATE,
+            }
+        )
+    except Exception as exc:
+        logger.exception(f"Failed to send audio chunk to Scribe: {exc}")
+
 # @api.post("/voice")
 # def create_call(req: Request):
 #     """Generate TwiML to connect a call to a Twilio Media Stream"""
@@ -125,15 +233,45 @@ async def twilio_websocket(ws: WebSocket):
     stream_sid = start_event["streamSid"]
     user_id = uuid4().hex  # Fake user ID for this example
 
-    scribe_connection = await create_scribe_connection(call_sid)
+    # The agent passes the API's call_id as a stream parameter; fall back to the Twilio call SID
+    call_id = start_event["start"].get("customParameters", {}).get("call_id") or call_sid
+
+    transcript = get_flusher().open(call_sid)
+    publisher = TranscriptPublisher(call_id)
+    # Per-call wake phrases come in as a comma-separated stream parameter
+    wake_phrases = start_event["start"].get("customParameters", {}).get("wake_phrases")
+    wake_detector = WakePhraseDetector(parse_phrases(wake_phrases) if wake_phrases else None)
+    scribe_connection = await create_scribe_connection(call_sid, transcript, publisher, wake_detector)
+    # Twilio's payload is already base64 μ-law, which is what Scribe expects;
+    # with SILENCE_SUPPRESSION only speech (plus keepalives) is forwarded
+    suppressor = SilenceSuppressor() if SILENCE_SUPPRESSION else None
+    aggregator = MediaAggregator(suppressor=suppressor)
+    # Optional raw audio archive; frames are written by a background thread
+    recorder = get_archiver().open(call_sid) if AUDIO_ARCHIVE_ENABLED else None
+
+    # Reads from Twilio only enqueue; a separate task sends to Scribe, so a
+    # slow Scribe never stalls the media stream
+    sender = None
+    if scribe_connection:
+        sender = ScribeAudioSender(call_sid, lambda audio: send_audio(scribe_connection, audio))
+        sender.start()
+        active_streams[call_sid] = sender
+        if suppressor:
+            active_suppressors[call_sid] = suppressor
 
     async def websocket_loop():
         """
         Handle incoming WebSocket messages to Agent.
         """
         while True:
-            event = await ws.receive_json()
-            event_type = event["event"]
+            raw = await ws.receive_text()
+            # Media frames skip JSON decoding entirely; everything else uses orjson when available
+            payload = media_payload(raw)
+            if payload is not None:
+                event_type, event = "media", None
+            else:
+                event = parse_twilio_event(raw)
+                event_type = event["event"]
 
             if event_type == "stop":
                 logger.debug(f"Call ended by Twilio. Stream SID: {stream_sid}")
@@ -153,21 +291,16 @@ async def twilio_websocket(ws: WebSocket):
                 continue
 
             elif event_type == "media":
-                payload = event["media"]["payload"]
-                mulaw_bytes = base64.b64decode(payload)
-                if scribe_connection:
-                    audio_base64 = base64.b64encode(mulaw_bytes).decode("ascii")
-                    try:
-                        await scribe_connection.send(
-                            {
-                                "audio_base_64": audio_base64,
-                                "sample_rate": SCRIBE_SAMPLE_RATE,
-                            }
-                        )
-                    except Exception as exc:
-                        logger.exception(f"Failed to send audio chunk to Scribe: {exc}")
-                else:
+                if payload is None:
+                    payload = event["media"]["payload"]
+                if recorder:
+                    recorder.append(payload, media_timestamp(raw))
+                if not sender:
                     logger.debug("Scribe connection unavailable; dropping media chunk.")
+                    continue
+                audio_base64 = aggregator.add(payload)
+                if audio_base64:
+                    sender.enqueue(audio_base64)
 
     try:
         await websocket_loop()
@@ -177,6 +310,15 @@ async def twilio_websocket(ws: WebSocket):
         logger.exception(f"Unexpected Error: {ex}")
     finally:
         if scribe_connection:
+            remainder = aggregator.flush()
+            if remainder:
+                sender.enqueue(remainder)
+            await sender.drain(timeout=SCRIBE_DRAIN_TIMEOUT)
+            active_streams.pop(call_sid, None)
+            active_suppressors.pop(call_sid, None)
+            logger.info(f"Forwarded {aggregator.frames} media frames to Scribe in {aggregator.chunks} messages ({call_sid}): {sender.stats()}")
+            if suppressor:
+                logger.info(f"Silence suppression ({call_sid}): {suppressor.stats()}")
             try:
                 await scribe_connection.commit()
             except Exception as exc:
@@ -185,6 +327,17 @@ async def twilio_websocket(ws: WebSocket):
                 await scribe_connection.close()
             except Exception as exc:
                 logger.warning(f"Error while closing Scribe connection: {exc}")
+        await publisher.close()
+        if recorder:
+            try:
+                await asyncio.to_thread(recorder.close)
+            except Exception as exc:
+                logger.warning(f"Error while closing audio archive: {exc}")
+        # Final transcript flush happens off the event loop
+        try:
+            await asyncio.to_thread(transcript.close)
+        except Exception as exc:
+            logger.warning(f"Error while closing transcript: {exc}")
         try:
             await ws.close()
         except Exception as ex:
@@ -0,0 +1,407 @@
+"""
+V7 Go integration for answering meeting questions.
+
+All calls are async and go through the shared pooled HTTP client, so they
+can run in the background without blocking the event loop while an answer
+is being generated.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+import http_client
+
+logger = logging.getLogger(__name__)
+
+V7_API_BASE = os.getenv("V7_API_BASE", "https://go.v7labs.com/api")
+
+REQUIRED_ENV_VARS = [
+    "V7_WORKSPACE_ID",
+    "V7_PROJECT_ID",
+    "V7_API_KEY"
+]
+
+
+def missing_env_vars() -> List[str]:
+    """Return the V7 environment variables that are not set."""
+    return [var for var in REQUIRED_ENV_VARS if not os.getenv(var)]
+
+
+async def check_connection(timeout: float = 5) -> str:
+    """
+    Probe the configured V7 project.
+
+    Args:
+        timeout: Seconds to wait for V7 to respond
+
+    Returns:
+        "connected", "error_<status>", "timeout" or "error: <reason>"
+    """
+    workspace_id = os.getenv("V7_WORKSPACE_ID")
+    project_id = os.getenv("V7_PROJECT_ID")
+    api_key = os.getenv("V7_API_KEY")
+
+    test_url = f"{V7_API_BASE}/workspaces/{workspace_id}/projects/{project_id}"
+    headers = {"X-API-KEY": api_key}
+    try:
+        response = await http_client.request("GET", test_url, headers=headers, timeout=timeout)
+        if response.status_code == 200:
+            return "connected"
+        return f"error_{response.status_code}"
+    except httpx.TimeoutException:
+        return "timeout"
+    except Exception as e:
+        return f"error: {str(e)[:50]}"
+
+
+async def create_question_entity(call_id: str, question: str) -> Dict[str, Any]:
+    """
+    Create a V7 entity for a question so V7 starts generating the answer.
+
+    Args:
+        call_id: Call ID the question belongs to
+        question: The question text
+
+    Returns:
+        The created entity as returned by V7 (includes `id` and `project_id`)
+    """
+    workspace_id = os.getenv("V7_WORKSPACE_ID")
+    project_id = os.getenv("V7_PROJECT_ID")
+    api_key = os.getenv("V7_API_KEY")
+
+    create_url = f"{V7_API_BASE}/workspaces/{workspace_id}/projects/{project_id}/entities"
+    headers = {"X-API-KEY": api_key}
+    payload = {
+        "fields": {
+            "call_id": call_id,
+            "question_text": question
+        }
+    }
+
+    response = await http_client.request("POST", create_url, json=payload, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+
+def _answer_state(entity: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+    """
+    Inspect an entity's answer field.
+
+    Returns:
+        (finished, answer): finished is True once the answer is complete or
+        errored; answer is the answer text when it completed successfully
+    """
+    fields = entity.get('fields', {})
+    answer_field = fields.get('answer') or {}
+    answer_status = answer_field.get('status', 'idle')
+
+    if answer_status == 'complete':
+        tool_value = answer_field.get('tool_value') or {}
+        return True, tool_value.get('value')
+
+    if answer_field.get('error_message'):
+        logger.error(f"Answer field for entity {entity.get('id')} has error: {answer_field.get('error_message')}")
+        return True, None
+
+    return False, None
+
+
+# List-endpoint answers meaning bulk reads aren't supported at all (as
+# opposed to a transient failure, which only pauses them)
+BULK_UNSUPPORTED_STATUSES = (404, 405)
+
+
+class _PendingEntity:
+    __slots__ = ("project_id", "entity_id", "future", "started_at", "next_poll_at", "interval", "polls")
+
+    def __init__(self, project_id: str, entity_id: str, future: asyncio.Future, now: float, interval: float):
+        self.project_id = project_id
+        self.entity_id = entity_id
+        self.future = future
+        self.started_at = now
+        self.next_poll_at = now + interval
+        self.interval = interval
+        self.polls = 0
+
+
+class V7PollScheduler:
+    """
+    Single poller for every outstanding V7 entity.
+
+    Each entity is polled fast at first and then backs off geometrically up
+    to a maximum interval. Entities of the same project that are due
+    together are read with one list request, and all reads share a global
+    request budget, so V7 traffic stays flat as the number of pending
+    questions grows. Waiters get an asyncio future resolved with the answer
+    (or None on error/timeout).
+    """
+
+    def __init__(self):
+        self.initial_interval = float(os.getenv("V7_POLL_INITIAL_INTERVAL", 0.5))
+        self.max_interval = float(os.getenv("V7_POLL_MAX_INTERVAL", 10))
+        self.backoff = float(os.getenv("V7_POLL_BACKOFF", 1.5))
+        self.max_poll_time = float(os.getenv("V7_MAX_POLL_TIME", 300))  # 5 minutes
+        self.max_requests_per_second = float(os.getenv("V7_POLL_MAX_RPS", 5))
+        self.bulk_page_size = int(os.getenv("V7_POLL_BULK_PAGE_SIZE", 100))
+        self.bulk_max_page_size = int(os.getenv("V7_POLL_BULK_MAX_PAGE_SIZE", 1000))
+        self.bulk_enabled = os.getenv("V7_POLL_BULK", "true").lower() == "true"
+        self.bulk_retry_max = float(os.getenv("V7_POLL_BULK_RETRY_MAX", 120))
+
+        self._pending: Dict[str, _PendingEntity] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # Token bucket for the global request budget
+        self._tokens = max(1.0, self.max_requests_per_second)
+        self._tokens_updated = time.monotonic()
+
+        # Bulk reads are paused until this time after a transient failure
+        self._bulk_failures = 0
+        self._bulk_retry_at = 0.0
+
+        self.requests_made = 0
+        self.bulk_requests = 0
+        self.resolved = 0
+        self.timed_out = 0
+
+    def start(self) -> None:
+        """Start the polling loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling and release every waiter with None."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for pending in self._pending.values():
+            if not pending.future.done():
+                pending.future.set_result(None)
+        self._pending.clear()
+
+    def watch(self, project_id: str, entity_id: str) -> asyncio.Future:
+        """
+        Start tracking an entity.
+
+        Returns:
+            A future resolved with the answer text, or None on error/timeout
+        """
+        existing = self._pending.get(entity_id)
+        if existing is not None:
+            return existing.future
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[entity_id] = _PendingEntity(project_id, entity_id, future, time.monotonic(), self.initial_interval)
+        self.start()
+        self._wakeup.set()
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "requests": self.requests_made,
+            "bulk_requests": self.bulk_requests,
+            "resolved": self.resolved,
+            "timed_out": self.timed_out,
+            "max_requests_per_second": self.max_requests_per_second,
+            "bulk_enabled": self.bulk_enabled,
+            "bulk_paused_for": round(max(0.0, self._bulk_retry_at - time.monotonic()), 1)
+        }
+
+    def _take_token(self) -> bool:
+        now = time.monotonic()
+        capacity = max(1.0, self.max_requests_per_second)
+        self._tokens = min(capacity, self._tokens + (now - self._tokens_updated) * self.max_requests_per_second)
+        self._tokens_updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def _resolve(self, pending: _PendingEntity, answer: Optional[str]) -> None:
+        self._pending.pop(pending.entity_id, None)
+        if not pending.future.done():
+            pending.future.set_result(answer)
+        self.resolved += 1
+
+    def _reschedule(self, pending: _PendingEntity, now: float) -> None:
+        pending.polls += 1
+        pending.interval = min(self.max_interval, pending.interval * self.backoff)
+        pending.next_poll_at = now + pending.interval
+
+    def _apply(self, pending: _PendingEntity, entity: Dict[str, Any], now: float) -> None:
+        finished, answer = _answer_state(entity)
+        if finished:
+            logger.info(f"V7 entity {pending.entity_id} finished after {now - pending.started_at:.1f}s ({pending.polls + 1} polls)")
+            self._resolve(pending, answer)
+        else:
+            self._reschedule(pending, now)
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+
+            # Expire entities that have been pending for too long
+            for pending in list(self._pending.values()):
+                if now - pending.started_at > self.max_poll_time:
+                    logger.warning(f"Polling timeout after {self.max_poll_time} seconds for entity {pending.entity_id}")
+                    self.timed_out += 1
+                    self._resolve(pending, None)
+
+            due = sorted(
+                (p for p in self._pending.values() if p.next_poll_at <= now),
+                key=lambda p: p.next_poll_at
+            )
+            if due:
+                await self._poll(due)
+
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            next_due = min(p.next_poll_at for p in self._pending.values())
+            delay = max(0.0, next_due - time.monotonic())
+            if delay == 0 and self._tokens < 1:
+                # Out of budget: wait for the next token
+                delay = (1 - self._tokens) / max(self.max_requests_per_second, 0.001)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, due: List[_PendingEntity]) -> None:
+        by_project: Dict[str, List[_PendingEntity]] = {}
+        for pending in due:
+            by_project.setdefault(pending.project_id, []).append(pending)
+
+        for project_id, entities in by_project.items():
+            remaining = entities
+            if self.bulk_enabled and len(entities) > 1 and time.monotonic() >= self._bulk_retry_at:
+                if not self._take_token():
+                    return
+                remaining = await self._poll_bulk(project_id, entities)
+
+            for pending in remaining:
+                if not self._take_token():
+                    return
+                await self._poll_one(pending)
+
+    async def _poll_bulk(self, project_id: str, entities: List[_PendingEntity]) -> List[_PendingEntity]:
+        """
+        Read a page of the project's most recent entities in one request.
+
+        Returns:
+            The entities that were not found in the page and still need an
+            individual read
+        """
+        workspace_id = os.getenv("V7_WORKSPACE_ID")
+        list_url = f"{V7_API_BASE}/workspaces/{workspace_id}/projects/{project_id}/entities"
+        headers = {"accept": "application/json", "X-API-KEY": os.getenv("V7_API_KEY")}
+
+        try:
+            self.requests_made += 1
+            self.bulk_requests += 1
+            # Pending entities are among the project's most recent ones, so a
+            # page a bit larger than the pending count usually covers them all
+            project_pending = sum(1 for p in self._pending.values() if p.project_id == project_id)
+            limit = min(self.bulk_max_page_size, max(self.bulk_page_size, 2 * project_pending))
+            response = await http_client.request("GET", list_url, headers=headers, params={"limit": limit})
+            response.raise_for_status()
+            body = response.json()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in BULK_UNSUPPORTED_STATUSES:
+                logger.warning(f"V7 bulk entity reads unsupported ({e.response.status_code}), using per-entity reads from now on")
+                self.bulk_enabled = False
+            else:
+                self._pause_bulk(str(e))
+            return entities
+        except Exception as e:
+            self._pause_bulk(str(e))
+            return entities
+        self._bulk_failures = 0
+
+        if isinstance(body, dict):
+            items = body.get("data") or body.get("entities") or body.get("items") or []
+        else:
+            items = body
+        by_id = {item.get("id"): item for item in items if isinstance(item, dict)}
+
+        now = time.monotonic()
+        remaining = []
+        for pending in entities:
+            entity = by_id.get(pending.entity_id)
+            if entity is None:
+                remaining.append(pending)
+            else:
+                self._apply(pending, entity, now)
+        return remaining
+
+    def _pause_bulk(self, reason: str) -> None:
+        """Fall back to per-entity reads for a while after a transient bulk failure, backing off on repeats."""
+        self._bulk_failures += 1
+        delay = min(self.bulk_retry_max, self.max_interval * 2 ** (self._bulk_failures - 1))
+        self._bulk_retry_at = time.monotonic() + delay
+        logger.warning(f"V7 bulk entity read failed, using per-entity reads for {delay:.0f}s: {reason}")
+
+    async def _poll_one(self, pending: _PendingEntity) -> None:
+        workspace_id = os.getenv("V7_WORKSPACE_ID")
+        get_url = f"{V7_API_BASE}/workspaces/{workspace_id}/projects/{pending.project_id}/entities/{pending.entity_id}"
+        get_headers = {
+            "accept": "application/json",
+            "X-API-KEY": os.getenv("V7_API_KEY")
+        }
+
+        try:
+            self.requests_made += 1
+            response = await http_client.request("GET", get_url, headers=get_headers)
+            response.raise_for_status()
+            entity = response.json()
+        except Exception as e:
+            logger.warning(f"Polling V7 entity {pending.entity_id} failed: {str(e)}")
+            self._reschedule(pending, time.monotonic())
+            return
+
+        self._apply(pending, entity, time.monotonic())
+
+
+_poll_scheduler: Optional[V7PollScheduler] = None
+
+
+def get_poll_scheduler() -> V7PollScheduler:
+    """Return the process-wide poll scheduler, creating it on first use."""
+    global _poll_scheduler
+    if _poll_scheduler is None:
+        _poll_scheduler = V7PollScheduler()
+    return _poll_scheduler
+
+
+async def stop_poll_scheduler() -> None:
+    """Stop the poll scheduler; called on application shutdown."""
+    global _poll_scheduler
+    if _poll_scheduler is not None:
+        await _poll_scheduler.stop()
+        _poll_scheduler = None
+
+
+async def wait_for_answer(project_id: str, entity_id: str) -> Optional[str]:
+    """
+    Wait for a V7 entity's answer via the shared poll scheduler.
+
+    Args:
+        project_id: Project ID returned when the entity was created
+        entity_id: Entity ID returned when the entity was created
+
+    Returns:
+        The answer text, or None on timeout, V7 error or an empty answer
+    """
+    return await asyncio.shield(get_poll_scheduler().watch(project_id, entity_id))
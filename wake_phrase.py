@@ -0,0 +1,194 @@
+"""
+Streaming wake-phrase detection over Scribe transcripts.
+
+Wake phrases are matched on normalized tokens (casefolded words, punctuation
+dropped) with an Aho-Corasick automaton, so any number of phrases is found
+in one pass and every token is looked at once:
+
+- committed segments are final; their tokens advance the call's automaton
+  state, which carries over to the next segment (a phrase may span two)
+- partials of the current segment only feed the tokens that weren't fed by
+  the previous partial; the last token, which may still be half a word, is
+  matched speculatively without advancing the state
+
+A phrase is reported once per position, so the partial that first contains
+it triggers the detection and the committed text doesn't repeat it.
+"""
+import logging
+import os
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+WAKE_PHRASES = os.getenv("WAKE_PHRASES", "hey lara")  # comma-separated defaults
+
+_TOKEN_PATTERN = re.compile(r"[\w']+")
+
+
+def normalize(text: str) -> List[str]:
+    """Casefolded word tokens, without punctuation or apostrophes."""
+    return [token.replace("'", "") for token in _TOKEN_PATTERN.findall(text.casefold())]
+
+
+def parse_phrases(value: Optional[str]) -> List[str]:
+    """Split a comma-separated phrase list (e.g. WAKE_PHRASES) into phrases."""
+    return [phrase.strip() for phrase in (value or "").split(",") if normalize(phrase)]
+
+
+class PhraseAutomaton:
+    """
+    Aho-Corasick automaton over token sequences.
+
+    Node 0 is the root. `step` follows goto/fail links for one token and
+    returns the new state; `matches(state)` lists the phrases ending there.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, int]]] = [[]]
+
+        for phrase in phrases:
+            tokens = normalize(phrase)
+            if not tokens:
+                continue
+            node = 0
+            for token in tokens:
+                nxt = self._goto[node].get(token)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][token] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = nxt
+            self._output[node].append((phrase, len(tokens)))
+
+        # Breadth-first fail links; outputs inherit those of their fail node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def step(self, state: int, token: str) -> int:
+        while state and token not in self._goto[state]:
+            state = self._fail[state]
+        return self._goto[state].get(token, 0)
+
+    def matches(self, state: int) -> List[Tuple[str, int]]:
+        """(phrase, token count) pairs for every phrase ending in this state."""
+        return self._output[state]
+
+
+@lru_cache(maxsize=256)
+def get_automaton(phrases: FrozenSet[str]) -> PhraseAutomaton:
+    """Automaton for a set of phrases, shared by calls that use the same ones."""
+    return PhraseAutomaton(sorted(phrases))
+
+
+class WakePhraseDetector:
+    """
+    Incremental wake-phrase matcher for one call's transcript.
+
+    Feed it every partial and committed Scribe transcript in order; each
+    call returns the phrases detected for the first time.
+    """
+
+    def __init__(self, phrases: Optional[Iterable[str]] = None):
+        phrases = list(phrases) if phrases is not None else parse_phrases(WAKE_PHRASES)
+        self.phrases = sorted(set(phrases))
+        self.automaton = get_automaton(frozenset(self.phrases))
+
+        # State after the last committed token, and how many tokens that is
+        self._committed_state = 0
+        self._committed_tokens = 0
+        # Stable (all but the last) tokens of the current segment fed so far
+        self._segment_tokens: List[str] = []
+        self._segment_state = 0
+        # (phrase, absolute end position) already reported
+        self._reported: Set[Tuple[str, int]] = set()
+
+        self.detections = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.phrases)
+
+    def _feed(self, tokens: List[str], start: int) -> List[str]:
+        """Advance the segment state over tokens[start:], reporting new matches."""
+        found = []
+        for i in range(start, len(tokens)):
+            self._segment_state = self.automaton.step(self._segment_state, tokens[i])
+            found += self._report(self._segment_state, self._committed_tokens + i + 1)
+        return found
+
+    def _report(self, state: int, position: int) -> List[str]:
+        found = []
+        for phrase, _ in self.automaton.matches(state):
+            key = (phrase, position)
+            if key not in self._reported:
+                self._reported.add(key)
+                self.detections += 1
+                found.append(phrase)
+        return found
+
+    def partial(self, text: str) -> List[str]:
+        """
+        Match a partial transcript of the current segment.
+
+        Returns:
+            Wake phrases seen for the first time
+        """
+        if not self.enabled:
+            return []
+        tokens = normalize(text)
+        stable = tokens[:-1]
+
+        # Partials normally extend the previous one; if Scribe revised an
+        # earlier word, replay the segment from the committed state
+        fed = len(self._segment_tokens)
+        if stable[:fed] != self._segment_tokens:
+            self._segment_tokens = []
+            self._segment_state = self._committed_state
+            fed = 0
+
+        found = self._feed(stable, fed)
+        self._segment_tokens = stable
+
+        if tokens:
+            # The last word may still be growing ("la" -> "lara"); peek without advancing
+            speculative = self.automaton.step(self._segment_state, tokens[-1])
+            found += self._report(speculative, self._committed_tokens + len(tokens))
+        return found
+
+    def committed(self, text: str) -> List[str]:
+        """
+        Match a committed segment and make it the base for the next one.
+
+        Returns:
+            Wake phrases seen for the first time
+        """
+        if not self.enabled:
+            return []
+        tokens = normalize(text)
+        fed = len(self._segment_tokens)
+        if tokens[:fed] != self._segment_tokens:
+            self._segment_state = self._committed_state
+            fed = 0
+        found = self._feed(tokens, fed)
+
+        self._committed_state = self._segment_state
+        self._committed_tokens += len(tokens)
+        self._segment_tokens = []
+        # Everything reported so far is now behind the committed position
+        self._reported.clear()
+        return found
@@ -0,0 +1,360 @@
+"""
+Subscription registry and broadcaster for /ws clients, keyed by call_id.
+
+Events for a call are only delivered to the sockets that subscribed to that
+call_id (plus any "all calls" admin subscribers), so the cost of a broadcast
+is proportional to the number of interested clients rather than the total
+number of open connections.
+
+Each connection owns a bounded outbound queue drained by its own writer
+task. Broadcasting only enqueues, so a stalled client can never delay the
+HTTP handler that produced the event or the other subscribers.
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Special call_id used by admin clients that want events for every call
+ALL_CALLS = "*"
+
+# Overflow policies for a full outbound queue
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+DISCONNECT = "disconnect"
+OVERFLOW_POLICIES = (DROP_OLDEST, COALESCE, DISCONNECT)
+
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", 256))
+WS_OVERFLOW_POLICY = os.getenv("WS_OVERFLOW_POLICY", DROP_OLDEST)
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", 10))
+
+
+def _coalesce_key(message: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """
+    Identify messages that supersede each other (e.g. successive updates of
+    the same transcript segment). Messages without an id never coalesce.
+    """
+    message_id = message.get("id") or message.get("taskId") or message.get("answerId")
+    if not message_id:
+        return None
+    return (message.get("type"), message_id)
+
+
+class ClientConnection:
+    """
+    A subscribed websocket with its own bounded send queue and writer task.
+
+    Websockets only need to provide async ``send_text(str)`` and ``close()``.
+    """
+
+    def __init__(
+        self,
+        websocket: Any,
+        call_id: str,
+        max_queue: int = WS_SEND_QUEUE_SIZE,
+        overflow_policy: str = WS_OVERFLOW_POLICY,
+        send_timeout: float = WS_SEND_TIMEOUT,
+        on_close: Optional[Callable[["ClientConnection"], None]] = None
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow_policy!r}; expected one of {OVERFLOW_POLICIES}")
+
+        self.websocket = websocket
+        self.call_id = call_id
+        self.max_queue = max(1, max_queue)
+        self.overflow_policy = overflow_policy
+        self.send_timeout = send_timeout
+        self._on_close = on_close
+
+        # Entries are mutable [key, text] pairs so coalescing can replace in place
+        self._queue: Deque[List[Any]] = deque()
+        self._pending_by_key: Dict[Tuple[str, str], List[Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+        self.closed = False
+
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    def start(self) -> None:
+        """Start the writer task on the running event loop."""
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._writer())
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def enqueue(self, message: Dict[str, Any], message_json: Optional[str] = None) -> bool:
+        """
+        Queue a message for this client without waiting for it to be sent.
+
+        Args:
+            message: Event payload (used for coalescing)
+            message_json: Pre-serialized payload, to share one encoding across subscribers
+
+        Returns:
+            True if the message was queued, False if it was dropped
+        """
+        if self.closed:
+            return False
+
+        if message_json is None:
+            message_json = json.dumps(message)
+
+        key = _coalesce_key(message)
+        if self.overflow_policy == COALESCE and key is not None:
+            pending = self._pending_by_key.get(key)
+            if pending is not None:
+                pending[1] = message_json
+                self.coalesced += 1
+                return True
+
+        if len(self._queue) >= self.max_queue:
+            if self.overflow_policy == DISCONNECT:
+                logger.warning(f"Send queue full for call_id {self.call_id}; disconnecting slow client")
+                self.dropped += 1
+                self._close_soon()
+                return False
+
+            oldest = self._queue.popleft()
+            if oldest[0] is not None and self._pending_by_key.get(oldest[0]) is oldest:
+                del self._pending_by_key[oldest[0]]
+            self.dropped += 1
+
+        entry = [key, message_json]
+        self._queue.append(entry)
+        if key is not None:
+            self._pending_by_key[key] = entry
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._wakeup.set()
+        return True
+
+    async def _writer(self) -> None:
+        """Drain the queue into the websocket, one message at a time."""
+        try:
+            while True:
+                while not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+
+                entry = self._queue.popleft()
+                key, message_json = entry
+                if key is not None and self._pending_by_key.get(key) is entry:
+                    del self._pending_by_key[key]
+
+                async with asyncio.timeout(self.send_timeout):
+                    await self.websocket.send_text(message_json)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"Websocket send timed out after {self.send_timeout}s for call_id {self.call_id}; disconnecting")
+            self._close_soon()
+        except Exception as e:
+            logger.error(f"Failed to send to websocket for call_id {self.call_id}: {str(e)}")
+            self._close_soon()
+
+    def _close_soon(self) -> None:
+        """Mark the connection closed and close the socket in the background."""
+        if self.closed:
+            return
+        self.closed = True
+        self.dropped += len(self._queue)
+        self._queue.clear()
+        self._pending_by_key.clear()
+
+        if self._on_close:
+            self._on_close(self)
+
+        if self._writer_task and self._writer_task is not asyncio.current_task():
+            self._writer_task.cancel()
+        asyncio.create_task(self._close_websocket())
+
+    async def _close_websocket(self) -> None:
+        try:
+            await self.websocket.close()
+        except Exception:
+            pass
+
+    def stop(self) -> None:
+        """Stop the writer task; used when the client disconnects by itself."""
+        self.closed = True
+        self._queue.clear()
+        self._pending_by_key.clear()
+        if self._writer_task:
+            self._writer_task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "call_id": self.call_id,
+            "queue_depth": self.depth,
+            "max_queue_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced
+        }
+
+
+class SubscriptionRegistry:
+    """
+    Maps call_id -> set of subscribed client connections.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = WS_SEND_QUEUE_SIZE,
+        overflow_policy: str = WS_OVERFLOW_POLICY,
+        send_timeout: float = WS_SEND_TIMEOUT
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow_policy!r}; expected one of {OVERFLOW_POLICIES}")
+
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+        self.send_timeout = send_timeout
+
+        self._subscribers: Dict[str, Set[ClientConnection]] = {}
+        self._connections: Dict[Tuple[str, int], ClientConnection] = {}
+
+        # Totals for connections that are already gone
+        self._closed_sent = 0
+        self._closed_dropped = 0
+        self._closed_coalesced = 0
+        self.slow_disconnects = 0
+
+    def subscribe(self, call_id: str, websocket: Any) -> ClientConnection:
+        """
+        Register a websocket for events of a call and start its writer task.
+
+        Args:
+            call_id: Call ID to subscribe to, or ALL_CALLS for every call
+            websocket: The websocket connection
+
+        Returns:
+            The ClientConnection used to queue messages for this websocket
+        """
+        existing = self._connections.get((call_id, id(websocket)))
+        if existing is not None:
+            return existing
+
+        connection = ClientConnection(
+            websocket,
+            call_id,
+            max_queue=self.max_queue,
+            overflow_policy=self.overflow_policy,
+            send_timeout=self.send_timeout,
+            on_close=self._on_connection_closed
+        )
+        self._connections[(call_id, id(websocket))] = connection
+        self._subscribers.setdefault(call_id, set()).add(connection)
+        connection.start()
+        return connection
+
+    def unsubscribe(self, call_id: str, websocket: Any) -> bool:
+        """
+        Remove a websocket from a call's subscribers and stop its writer.
+
+        Returns:
+            True if the websocket was subscribed, False otherwise
+        """
+        connection = self._connections.get((call_id, id(websocket)))
+        if connection is None:
+            return False
+
+        connection.stop()
+        self._remove(connection)
+        return True
+
+    def _on_connection_closed(self, connection: ClientConnection) -> None:
+        """Called by a connection that was disconnected for being too slow or broken."""
+        self.slow_disconnects += 1
+        self._remove(connection)
+        logger.info(f"Removed disconnected websocket. Remaining connections: {len(self)}")
+
+    def _remove(self, connection: ClientConnection) -> None:
+        if self._connections.pop((connection.call_id, id(connection.websocket)), None) is None:
+            return
+
+        self._closed_sent += connection.sent
+        self._closed_dropped += connection.dropped
+        self._closed_coalesced += connection.coalesced
+
+        connections = self._subscribers.get(connection.call_id)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self._subscribers[connection.call_id]
+
+    def subscribers(self, call_id: str) -> List[ClientConnection]:
+        """
+        Return the connections interested in a call (call subscribers + admins).
+        """
+        targets = list(self._subscribers.get(call_id, ()))
+        if call_id != ALL_CALLS:
+            targets.extend(self._subscribers.get(ALL_CALLS, ()))
+        return targets
+
+    def subscriber_count(self, call_id: str) -> int:
+        """Number of sockets subscribed to a single call_id."""
+        return len(self._subscribers.get(call_id, ()))
+
+    def call_ids(self) -> List[str]:
+        """Call IDs that currently have at least one subscriber."""
+        return list(self._subscribers.keys())
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def broadcast(self, call_id: str, message: Dict[str, Any]) -> int:
+        """
+        Queue a message for every websocket subscribed to a call.
+
+        This never waits on the network; each connection's writer task
+        delivers the message in the background.
+
+        Args:
+            call_id: Call ID the event belongs to
+            message: JSON-serializable event payload
+
+        Returns:
+            Number of connections the message was queued for
+        """
+        targets = self.subscribers(call_id)
+        if not targets:
+            # Live partial captions arrive several times a second; don't warn for each one
+            log = logger.debug if message.get("partial") else logger.warning
+            log(f"No websocket subscribers for call_id {call_id}; dropping {message.get('type')} event")
+            return 0
+
+        message_json = json.dumps(message)
+        logger.info(f"Broadcasting {message.get('type')} message to {len(targets)} websocket(s) for call_id {call_id}")
+
+        queued = 0
+        for connection in targets:
+            if connection.enqueue(message, message_json):
+                queued += 1
+        return queued
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and drop counters across all connections."""
+        connections = list(self._connections.values())
+        return {
+            "connections": len(connections),
+            "calls": len(self._subscribers),
+            "overflow_policy": self.overflow_policy,
+            "max_queue": self.max_queue,
+            "queued": sum(c.depth for c in connections),
+            "max_queue_depth": max((c.max_depth for c in connections), default=0),
+            "sent": self._closed_sent + sum(c.sent for c in connections),
+            "dropped": self._closed_dropped + sum(c.dropped for c in connections),
+            "coalesced": self._closed_coalesced + sum(c.coalesced for c in connections),
+            "slow_disconnects": self.slow_disconnects,
+            "per_connection": [c.stats() for c in connections]
+        }
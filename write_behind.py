@@ -0,0 +1,185 @@
+"""
+Optional write-behind micro-batching for MongoDB inserts.
+
+Bursts of /tasks and /insights calls each paid a full `insert_one` round
+trip. With write-behind enabled, documents get their `_id` client-side and
+are buffered in memory, then written with one unordered `insert_many` per
+collection every few milliseconds or once a batch fills up.
+
+Durability switch (WRITE_BEHIND_DURABLE):
+- true (default): the request still waits until its batch is written, but
+  shares the round trip with every other document in the batch
+- false: the request returns as soon as the document is buffered; a crash
+  or a failed flush can lose buffered documents
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true"
+WRITE_BEHIND_DURABLE = os.getenv("WRITE_BEHIND_DURABLE", "true").lower() == "true"
+WRITE_BEHIND_FLUSH_MS = float(os.getenv("WRITE_BEHIND_FLUSH_MS", 5))
+WRITE_BEHIND_MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", 100))
+
+# MongoDB duplicate key error; the document is already stored
+DUPLICATE_KEY_ERROR = 11000
+
+
+class WriteBehindBuffer:
+    """
+    Buffers documents per collection and flushes them with `insert_many`.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = WRITE_BEHIND_ENABLED,
+        durable: bool = WRITE_BEHIND_DURABLE,
+        flush_interval_ms: float = WRITE_BEHIND_FLUSH_MS,
+        max_batch: int = WRITE_BEHIND_MAX_BATCH
+    ):
+        self.enabled = enabled
+        self.durable = durable
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max(1, max_batch)
+
+        # collection name -> (collection, [(document, future)])
+        self._buffers: Dict[str, Tuple[Any, List[Tuple[Dict[str, Any], asyncio.Future]]]] = {}
+        self._pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self.flushed = 0
+        self.batches = 0
+        self.failed = 0
+
+    async def insert(self, collection, document: Dict[str, Any]) -> Any:
+        """
+        Buffer a document for insertion.
+
+        Args:
+            collection: Motor collection to insert into
+            document: Document to insert; `_id` is assigned here if missing
+
+        Returns:
+            The document id (an ObjectId unless given). In durable mode this returns once the batch
+            containing the document has been written.
+
+        Raises:
+            Exception: In durable mode, if the batch write failed
+        """
+        if self._closed:
+            result = await collection.insert_one(document)
+            return result.inserted_id
+
+        if "_id" not in document:
+            # Imported here so loading this module doesn't pull in pymongo
+            from bson import ObjectId
+            document["_id"] = ObjectId()
+        future = asyncio.get_running_loop().create_future()
+
+        _, entries = self._buffers.setdefault(collection.name, (collection, []))
+        entries.append((document, future))
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._pending.set()
+        if len(entries) >= self.max_batch:
+            self._full.set()
+
+        if self.durable:
+            await future
+        return document["_id"]
+
+    async def _run(self) -> None:
+        # Exits between batches once closed, so a batch is never cut off mid-write
+        while not self._closed:
+            await self._pending.wait()
+            # Give the batch a few milliseconds to fill up, unless it already has
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._pending.clear()
+            self._full.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write every buffered document now."""
+        buffers, self._buffers = self._buffers, {}
+        for name, (collection, entries) in buffers.items():
+            for start in range(0, len(entries), self.max_batch):
+                await self._write_batch(name, collection, entries[start:start + self.max_batch])
+
+    async def _write_batch(self, name: str, collection, entries: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        from pymongo.errors import BulkWriteError
+
+        documents = [document for document, _ in entries]
+        failed_indexes: Dict[int, str] = {}
+        try:
+            await collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                # A duplicate _id / idempotency key means the document is already stored
+                if error.get("code") != DUPLICATE_KEY_ERROR:
+                    failed_indexes[error["index"]] = error.get("errmsg", "write error")
+        except Exception as e:
+            failed_indexes = {index: str(e) for index in range(len(entries))}
+
+        self.batches += 1
+        self.flushed += len(entries) - len(failed_indexes)
+        self.failed += len(failed_indexes)
+        if failed_indexes:
+            logger.error(f"Write-behind flush to {name} failed for {len(failed_indexes)} of {len(entries)} document(s): {next(iter(failed_indexes.values()))}")
+
+        for index, (_, future) in enumerate(entries):
+            if future.done():
+                continue
+            if index in failed_indexes:
+                future.set_exception(RuntimeError(f"Failed to write document to {name}: {failed_indexes[index]}"))
+                # Nobody awaits the future in non-durable mode; don't warn about it
+                if not self.durable:
+                    future.exception()
+            else:
+                future.set_result(None)
+
+    async def close(self) -> None:
+        """
+        Stop the flush loop and write everything still buffered; called on
+        shutdown. The loop finishes the batch it is writing first.
+        """
+        self._closed = True
+        if self._task:
+            # Wake the loop so it flushes what it has and exits
+            self._pending.set()
+            self._full.set()
+            try:
+                await self._task
+            except Exception as e:
+                logger.error(f"Write-behind flush loop failed: {str(e)}")
+            self._task = None
+
+        leftover = [future for _, entries in self._buffers.values() for _, future in entries]
+        try:
+            await self.flush()
+        finally:
+            for future in leftover:
+                if not future.done():
+                    future.set_exception(RuntimeError("Write-behind buffer closed before the document was written"))
+                    if not self.durable:
+                        future.exception()
+        logger.info(f"Write-behind buffer flushed on shutdown ({self.flushed} documents written, {self.failed} failed)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "durable": self.durable,
+            "pending": sum(len(entries) for _, entries in self._buffers.values()),
+            "written": self.flushed,
+            "failed": self.failed,
+            "batches": self.batches,
+            "avg_batch_size": round(self.flushed / self.batches, 1) if self.batches else 0.0
+        }